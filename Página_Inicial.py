@@ -0,0 +1,43 @@
+# Dashboard de Lançamento de Notas - ponto de entrada (streamlit run Página_Inicial.py)
+#
+# Monta a navegação entre as páginas (pasta paginas/). Os dados, o backend de consultas e os
+# filtros do menu lateral são preparados aqui, uma vez por execução, pela camada compartilhada
+# (dados_painel.py), e valem para a página aberta: trocar de página reaproveita a base e os
+# índices já em memória e mantém o recorte selecionado.
+import streamlit as st
+
+import dados_painel
+from envio import iniciar_medicao, medicao_ativa, registrar_no_log
+
+# Bytes enviados ao navegador em cada execução, por tipo de elemento (com MEDIR_ENVIO=1)
+medicao = iniciar_medicao() if medicao_ativa() else None
+if medicao is not None:
+    st.session_state.medicao_envio = medicao  # (lida pelo benchmarks/bench_envio.py)
+
+# CONFIGURAÇÕES DA PÁGINA
+st.set_page_config(page_title="Lançamento de Notas",
+                   layout="wide",
+                   page_icon="📈")
+
+dados_painel.iniciar_execucao()
+
+pagina = st.navigation([
+    st.Page('paginas/lancamento.py', title="Lançamento", icon="📈", default=True),
+    st.Page('paginas/rendimento.py', title="Rendimento", icon="📊"),
+    st.Page('paginas/escolas_atipicas.py', title="Escolas Atípicas", icon="🚩"),
+    st.Page('paginas/ausentes_do_censo.py', title="Ausentes do Censo", icon="📋"),
+])
+
+dados_painel.barra_filtros()
+
+# O resumo da medição vai para o log mesmo quando a página termina com st.stop() (depois do
+# st.stop(), nenhum elemento é desenhado; o resumo no menu lateral só aparece nas demais execuções)
+try:
+    pagina.run()
+finally:
+    if medicao is not None:
+        registrar_no_log(medicao, pagina.title)
+
+if medicao is not None:
+    with st.sidebar.expander(f"📦 Enviado nesta execução: {medicao.total / 1024:,.1f} kB"):
+        st.dataframe(medicao.resumo(), hide_index=True)
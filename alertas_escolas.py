@@ -0,0 +1,154 @@
+# Alertas de escolas com muitas notas não lançadas (execução sem o dashboard)
+#
+# Calcula, para todas as escolas do estado de uma vez, os mesmos percentuais de notas não lançadas
+# da tabela "Escolas com maiores percentuais de notas não lançadas" do dashboard, compara cada
+# bimestre com o limite configurado (por bimestre e por DIREC) e grava, para cada DIREC, a lista
+# ordenada das escolas acima do limite, para o acompanhamento semanal.
+#
+# Uso:
+#     python alertas_escolas.py --limite 10 --bimestres 1 2 3
+#     python alertas_escolas.py --config limites.json --formato xlsx
+#
+# Exemplo de limites.json (o mais específico vale: DIREC e bimestre > DIREC > bimestre > padrão):
+#     {"padrao": 10,
+#      "bimestres": {"4": 30},
+#      "direcs": {"01ª DIREC - NATAL": {"padrao": 8, "bimestres": {"4": 25}}}}
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from consultas import BIMESTRES, ranking_escolas, totais_por_escola
+from exportacao import FORMATOS, gravar, nome_arquivo
+from publicacao_dados import ARQUIVO_ESCOLA, ler_df_escola
+
+PASTA_SAIDA_PADRAO = os.path.join('dados_tratados', 'alertas')
+LIMITE_PADRAO = 10.0
+
+
+def limites_por_escola(tabela, config, bimestre):
+    """
+    Limite (%) de cada escola em um bimestre (1 a 4), conforme a configuração.
+
+    Prioridade: limite da DIREC no bimestre > padrão da DIREC > limite do bimestre > padrão.
+    """
+    geral = config.get('bimestres', {}).get(str(bimestre), config.get('padrao', LIMITE_PADRAO))
+    por_direc = {}
+    for direc, conf_direc in config.get('direcs', {}).items():
+        limite = conf_direc.get('bimestres', {}).get(str(bimestre), conf_direc.get('padrao'))
+        if limite is not None:
+            por_direc[direc] = limite
+    return tabela['DIREC'].astype(str).map(por_direc).fillna(geral).astype(float)
+
+
+def sinalizar_escolas(df, config, bimestres=(1, 2, 3, 4)):
+    """
+    Escolas com percentual de notas não lançadas acima do limite em algum dos bimestres.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        df_escola (ver `publicacao_dados.ler_df_escola`).
+    config : dict
+        Limites (%), no formato descrito no início do módulo.
+    bimestres : sequence of int
+        Bimestres verificados.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Todas as escolas, com as colunas do ranking do dashboard, 'Bimestres acima do limite',
+        'Maior % acima do limite' e 'Acima do limite' (bool).
+    """
+    tabela = ranking_escolas(totais_por_escola(df, 'Todas', 'Todos', 'Todas'))
+
+    colunas = [f'% Notas Não Lançadas - {n}º Bimestre' for n in bimestres]
+    percentuais = tabela[colunas].to_numpy()
+    limites = np.column_stack([limites_por_escola(tabela, config, n) for n in bimestres])
+    acima = percentuais > limites
+
+    # Rótulo dos bimestres acima do limite (ex.: "1º, 3º") e maior percentual entre eles
+    rotulos = pd.Series('', index=tabela.index)
+    for i, n in enumerate(bimestres):
+        rotulos += np.where(acima[:, i], f'{n}º, ', '')
+
+    tabela['Bimestres acima do limite'] = rotulos.str.rstrip(', ')
+    maior = np.where(acima, percentuais, -np.inf).max(axis=1, initial=-np.inf)
+    tabela['Maior % acima do limite'] = np.where(np.isfinite(maior), maior, np.nan)
+    tabela['Acima do limite'] = acima.any(axis=1)
+    return tabela
+
+
+def gravar_relatorios(tabela, pasta_saida, formato='csv', bimestres=(1, 2, 3, 4)):
+    """
+    Grava um relatório por DIREC (escolas acima do limite, da maior para a menor) e um resumo.
+
+    Todas as DIRECs recebem um arquivo, mesmo sem escolas acima do limite, para que não fique
+    um relatório antigo no lugar de uma lista que ficou vazia.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Resumo: DIREC, Escolas, Escolas acima do limite e Arquivo.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    extensao = FORMATOS[formato][1]
+    colunas = (['Posição', 'Município', 'Escola']
+               + [f'% Notas Não Lançadas - {n}º Bimestre' for n in bimestres]
+               + ['Bimestres acima do limite', 'Maior % acima do limite'])
+
+    sinalizadas = tabela[tabela['Acima do limite']].sort_values(
+        ['DIREC', 'Maior % acima do limite', 'Escola'], ascending=[True, False, True])
+    sinalizadas = sinalizadas.assign(Posição=sinalizadas.groupby('DIREC', observed=True).cumcount() + 1)
+    por_direc = dict(list(sinalizadas.groupby('DIREC', observed=True)))
+
+    resumo = []
+    for direc in sorted(tabela['DIREC'].dropna().astype(str).unique()):
+        relatorio = por_direc.get(direc, sinalizadas.iloc[:0])[colunas]
+        arquivo = os.path.join(pasta_saida, nome_arquivo('alertas', direc) + extensao)
+        gravar(relatorio, arquivo, formato)
+        resumo.append({'DIREC': direc,
+                       'Escolas': int((tabela['DIREC'].astype(str) == direc).sum()),
+                       'Escolas acima do limite': len(relatorio),
+                       'Arquivo': os.path.basename(arquivo)})
+
+    resumo = pd.DataFrame(resumo)
+    gravar(resumo, os.path.join(pasta_saida, 'resumo_alertas' + extensao), formato)
+    return resumo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Lista, por DIREC, as escolas com percentual de notas não lançadas acima do limite.")
+    parser.add_argument('--dados', default=ARQUIVO_ESCOLA, help="Arquivo df_escola.parquet.")
+    parser.add_argument('--saida', default=PASTA_SAIDA_PADRAO, help="Pasta dos relatórios.")
+    parser.add_argument('--limite', type=float, default=None,
+                        help=f"Limite padrão (%%) de notas não lançadas (padrão: {LIMITE_PADRAO:g}).")
+    parser.add_argument('--config', default=None,
+                        help="Arquivo JSON com limites por bimestre e por DIREC (ver o início do módulo).")
+    parser.add_argument('--bimestres', type=int, nargs='+', choices=range(1, len(BIMESTRES) + 1),
+                        default=list(range(1, len(BIMESTRES) + 1)), help="Bimestres verificados.")
+    parser.add_argument('--formato', choices=list(FORMATOS), default='csv', help="Formato dos relatórios.")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        with open(args.config, encoding='utf8') as f:
+            config = json.load(f)
+    if args.limite is not None:
+        config['padrao'] = args.limite
+
+    inicio = time.perf_counter()
+    tabela = sinalizar_escolas(ler_df_escola(args.dados), config, args.bimestres)
+    resumo = gravar_relatorios(tabela, args.saida, args.formato, args.bimestres)
+
+    print(resumo.to_string(index=False))
+    print(f"\n{int(tabela['Acima do limite'].sum())} de {len(tabela)} escolas acima do limite; "
+          f"relatórios em {args.saida} ({time.perf_counter() - inicio:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# Escolas atípicas: percentual de notas não lançadas muito acima do das escolas vizinhas
+#
+# O ranking de escolas ordena pelo percentual bruto, que põe no topo escolas pequenas com poucos
+# registros (3 de 3 notas faltando = 100%) e esconde escolas grandes que estão bem piores que as
+# vizinhas. Aqui cada escola é comparada, em cada bimestre, com uma referência:
+#   - as demais escolas do município (somadas), se tiverem ao menos MINIMO_REFERENCIA registros;
+#   - senão, as demais escolas da DIREC, com o mesmo mínimo; e, por fim, as demais escolas do estado.
+# O percentual da escola entra com o intervalo de confiança de Wilson (95%), que é largo para
+# poucos registros: a pontuação ("Excesso") é quanto o limite inferior do intervalo fica acima do
+# limite da referência, em pontos percentuais. O limite da referência é o seu percentual ou, se
+# nem o estado tiver MINIMO_REFERENCIA registros nas demais escolas, o limite superior do intervalo
+# de Wilson da própria referência (que também é incerta). Uma escola é atípica quando o Excesso é
+# positivo, ou seja, quando a diferença não se explica pelo tamanho da escola nem da referência.
+#
+# O cálculo é vetorizado (uma passada por nível) e feito uma vez por versão dos dados, junto com a
+# publicação (publicacao_dados.py); a página "Escolas atípicas" só filtra o resultado.
+import numpy as np
+import pandas as pd
+
+from consultas import BIMESTRES, COLUNAS_CONTAGEM, formatar_escola
+
+MINIMO_REFERENCIA = 200  # registros das demais escolas do município (ou da DIREC) para usá-las como referência
+Z_CONFIANCA = 1.96       # intervalo de confiança de 95%
+
+
+def intervalo_wilson(sucessos, total, z=Z_CONFIANCA):
+    """
+    Intervalo de confiança de Wilson para a proporção sucessos / total (arrays).
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Limites inferior e superior (NaN onde total é 0).
+    """
+    sucessos = np.asarray(sucessos, dtype='float64')
+    total = np.asarray(total, dtype='float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = sucessos / total
+        denominador = 1 + z**2 / total
+        centro = (p + z**2 / (2 * total)) / denominador
+        margem = z * np.sqrt(p * (1 - p) / total + z**2 / (4 * total**2)) / denominador
+    return centro - margem, centro + margem
+
+
+def _demais(somas, chave, coluna):
+    # Soma das demais escolas do mesmo grupo (o total do grupo menos a própria escola)
+    return somas.groupby(chave, observed=True)[coluna].transform('sum') - somas[coluna]
+
+
+def pontuar_escolas(df):
+    """
+    Compara cada escola, em cada bimestre, com as demais escolas do município, da DIREC ou do estado.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        df_escola (uma linha por escola e série, com as contagens de COLUNAS_CONTAGEM).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por escola e bimestre com registros, ordenada por bimestre e por Excesso (da
+        maior para a menor pontuação). Colunas: DIREC, MUNICÍPIO, Escola, BIMESTRE, Notas Não
+        Lançadas, Total de Registros, % Não Lançadas, IC 95% Mín., IC 95% Máx., Referência,
+        % Referência, Limite da Referência, Excesso (p.p.), Notas Acima do Esperado e Atípica.
+    """
+    somas = df.groupby(['DIREC', 'MUNICÍPIO', 'ESCOLA', 'INEP ESCOLA'], observed=True)[COLUNAS_CONTAGEM].sum()
+    somas = somas.reset_index()
+
+    partes = []
+    for b in BIMESTRES:
+        nao_lancadas = somas[f'{b}_Notas Nao Lancadas'].to_numpy('float64')
+        total = nao_lancadas + somas[f'{b}_Notas Lancadas'].to_numpy('float64')
+        base = somas.assign(_x=nao_lancadas, _n=total)
+
+        # Referência: município, DIREC ou estado (sempre sem a própria escola)
+        x_mun, n_mun = _demais(base, 'MUNICÍPIO', '_x').to_numpy(), _demais(base, 'MUNICÍPIO', '_n').to_numpy()
+        x_dir, n_dir = _demais(base, 'DIREC', '_x').to_numpy(), _demais(base, 'DIREC', '_n').to_numpy()
+        x_est, n_est = nao_lancadas.sum() - nao_lancadas, total.sum() - total
+        usa_mun = n_mun >= MINIMO_REFERENCIA
+        usa_dir = ~usa_mun & (n_dir >= MINIMO_REFERENCIA)
+        x_ref = np.select([usa_mun, usa_dir], [x_mun, x_dir], x_est)
+        n_ref = np.select([usa_mun, usa_dir], [n_mun, n_dir], n_est)
+        referencia = np.select([usa_mun, usa_dir], ['Município', 'DIREC'], 'Estado')
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p = nao_lancadas / total
+            p_ref = x_ref / n_ref
+        minimo, maximo = intervalo_wilson(nao_lancadas, total)
+        # referência pequena (só no estado, com poucos registros): vale o seu limite superior
+        limite_ref = np.where(n_ref >= MINIMO_REFERENCIA, p_ref, intervalo_wilson(x_ref, n_ref)[1])
+
+        partes.append(pd.DataFrame({
+            'DIREC': somas['DIREC'],
+            'MUNICÍPIO': somas['MUNICÍPIO'],
+            'Escola': formatar_escola(somas['ESCOLA'], somas['INEP ESCOLA']),
+            'INEP ESCOLA': somas['INEP ESCOLA'].astype(str),
+            'BIMESTRE': b,
+            'Notas Não Lançadas': nao_lancadas.astype('int64'),
+            'Total de Registros': total.astype('int64'),
+            '% Não Lançadas': p * 100,
+            'IC 95% Mín.': minimo * 100,
+            'IC 95% Máx.': maximo * 100,
+            'Referência': referencia,
+            '% Referência': p_ref * 100,
+            'Limite da Referência': limite_ref * 100,
+            'Excesso (p.p.)': (minimo - limite_ref) * 100,
+            'Notas Acima do Esperado': nao_lancadas - total * p_ref,
+        })[total > 0])
+
+    pontuacao = pd.concat(partes, ignore_index=True)
+    pontuacao['Atípica'] = pontuacao['Excesso (p.p.)'] > 0
+    colunas_decimais = ['% Não Lançadas', 'IC 95% Mín.', 'IC 95% Máx.', '% Referência', 'Limite da Referência',
+                        'Excesso (p.p.)', 'Notas Acima do Esperado']
+    pontuacao[colunas_decimais] = pontuacao[colunas_decimais].round(1)
+    for coluna in ['DIREC', 'MUNICÍPIO', 'BIMESTRE', 'Referência']:
+        pontuacao[coluna] = pontuacao[coluna].astype('category')
+
+    ordem = np.lexsort((-pontuacao['Excesso (p.p.)'].to_numpy(), pontuacao['BIMESTRE'].cat.codes.to_numpy()))
+    return pontuacao.iloc[ordem].reset_index(drop=True)
+
+
+def escolas_atipicas(pontuacao, bimestre, direc='Todas', municipio='Todos', inep=None, somente_atipicas=True):
+    """
+    Linhas de `pontuar_escolas` do bimestre e do recorte, da maior para a menor pontuação.
+
+    ('Todas' / 'Todos' / None para não filtrar.)
+    """
+    mascara = np.ones(len(pontuacao), dtype=bool)
+    mascara &= (pontuacao['BIMESTRE'] == bimestre).to_numpy()
+    if direc != 'Todas':
+        mascara &= (pontuacao['DIREC'] == direc).to_numpy()
+    if municipio != 'Todos':
+        mascara &= (pontuacao['MUNICÍPIO'] == municipio).to_numpy()
+    if inep:
+        mascara &= (pontuacao['INEP ESCOLA'] == str(inep)).to_numpy()
+    if somente_atipicas:
+        mascara &= pontuacao['Atípica'].to_numpy()
+    return pontuacao[mascara]
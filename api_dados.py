@@ -0,0 +1,379 @@
+# API HTTP de leitura dos dados agregados (sem o Streamlit)
+#
+# Serve, para outros sistemas e planilhas, os mesmos agregados filtrados da página de lançamento,
+# em JSON ou Arrow IPC (stream), sem passar por uma execução do dashboard. Roda ao lado do
+# dashboard, como um processo próprio, e acompanha as publicações do df_escola.parquet com o
+# mesmo monitor (publicacao_dados.py).
+#
+# Rotas (GET ou HEAD; filtros opcionais direc, municipio e inep na query string, como na URL do
+# dashboard):
+#   /versao    versão dos dados em uso
+#   /resumo    notas lançadas e não lançadas por bimestre (consultas.resumo_lancamento)
+#   /direc     tabela por DIREC de um bimestre (?bimestre=1 a 4, padrão 1; consultas.tabela_direc)
+#   /ranking   escolas com os percentuais de notas não lançadas (?ordenar_por=1 a 4 para ordenar
+#              pelo bimestre, do maior para o menor; ?top_k=N para só as N primeiras)
+#
+# O formato é escolhido com ?formato=json|arrow ou pelo cabeçalho Accept
+# (application/vnd.apache.arrow.stream); o padrão é JSON (lista de registros). Um parâmetro de
+# outra rota (ex.: /resumo?bimestre=2) é recusado com 400; parâmetros desconhecidos são ignorados.
+#
+# Cada resposta é calculada uma vez por versão dos dados e guardada pronta (em bytes) em um cache
+# em memória; as seguintes só copiam os bytes. As respostas levam o cabeçalho X-Versao-Dados e um
+# ETag (hash do conteúdo): com If-None-Match, um cliente que já tem os dados recebe 304, sem corpo.
+#
+# Uso:
+#     python api_dados.py --porta 8502
+#     curl 'http://localhost:8502/ranking?direc=01ª%20DIREC%20-%20NATAL&ordenar_por=1&top_k=20'
+#     curl -H 'Accept: application/vnd.apache.arrow.stream' http://localhost:8502/resumo > resumo.arrow
+import argparse
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+import consultas
+from busca_escolas import escola_por_inep
+from consultas import BIMESTRES, ranking_escolas, tabela_direc
+from preaquecimento import CacheVisoes, calcular_visao
+from publicacao_dados import ARQUIVO_ESCOLA, MonitorDados
+
+ENDERECO_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8502
+LIMITE_MEMORIA_RESPOSTAS = 64 * 1024**2  # bytes, para todas as respostas em cache
+
+TIPO_JSON = 'application/json; charset=utf-8'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+
+# Parâmetros que mudam a resposta: os filtros, aceitos em todas as rotas, e os de cada rota
+# (os demais são ignorados e não entram na chave do cache)
+FILTROS = ('direc', 'municipio', 'inep')
+PARAMETROS_ROTA = {'/resumo': (), '/direc': ('bimestre',), '/ranking': ('ordenar_por', 'top_k')}
+PARAMETROS = FILTROS + ('bimestre', 'ordenar_por', 'top_k')
+
+logger = logging.getLogger(__name__)
+
+Resposta = namedtuple('Resposta', ['corpo', 'tipo', 'etag', 'versao'])
+
+
+class ErroConsulta(Exception):
+    """Parâmetro inválido ou recurso inexistente, com o status HTTP da resposta."""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _parametro(consulta, nome, padrao=None):
+    valores = consulta.get(nome)
+    return valores[-1] if valores else padrao
+
+
+def _bimestre(consulta, nome, padrao=None):
+    valor = _parametro(consulta, nome, padrao)
+    if valor is None:
+        return None
+    if valor not in [str(n) for n in range(1, len(BIMESTRES) + 1)]:
+        raise ErroConsulta(HTTPStatus.BAD_REQUEST, f"{nome} deve ser um número de 1 a {len(BIMESTRES)}")
+    return int(valor)
+
+
+def _top_k(consulta):
+    top_k = _parametro(consulta, 'top_k')
+    if top_k is None:
+        return None
+    if not top_k.isdigit() or int(top_k) == 0:
+        raise ErroConsulta(HTTPStatus.BAD_REQUEST, "top_k deve ser um inteiro positivo")
+    return int(top_k)
+
+
+def parametros_da_consulta(rota, consulta):
+    """
+    Parâmetros da rota, validados e com os valores padrão.
+
+    São eles (e não a query string) que formam a chave do cache de respostas: consultas que dão
+    a mesma resposta (ex.: /direc e /direc?bimestre=1) têm a mesma chave, e parâmetros
+    desconhecidos não criam novas entradas.
+
+    Raises
+    ------
+    ErroConsulta
+        400 para um valor inválido ou um parâmetro de outra rota (ex.: /resumo?bimestre=2).
+    """
+    de_outra_rota = [nome for nome in PARAMETROS
+                     if nome in consulta and nome not in FILTROS + PARAMETROS_ROTA[rota]]
+    if de_outra_rota:
+        raise ErroConsulta(HTTPStatus.BAD_REQUEST,
+                           f"parâmetro {', '.join(de_outra_rota)} não se aplica à rota {rota}")
+
+    # Com o INEP, a DIREC e o município são os da própria escola
+    inep = (_parametro(consulta, 'inep') or '').strip()
+    if inep:
+        parametros = {'inep': inep}
+    else:
+        parametros = {'direc': _parametro(consulta, 'direc', 'Todas'),
+                      'municipio': _parametro(consulta, 'municipio', 'Todos')}
+    if rota == '/direc':
+        parametros['bimestre'] = _bimestre(consulta, 'bimestre', '1')
+    if rota == '/ranking':
+        parametros['ordenar_por'] = _bimestre(consulta, 'ordenar_por')
+        parametros['top_k'] = _top_k(consulta)
+    return parametros
+
+
+def filtros_da_consulta(conjunto, parametros):
+    """
+    (DIREC, município, escola) a partir dos parâmetros direc, municipio e inep.
+
+    Com o INEP, a DIREC e o município são os da própria escola (como nos links do dashboard).
+
+    Raises
+    ------
+    ErroConsulta
+        404 se a escola, a DIREC ou o município não existirem nesta versão dos dados.
+    """
+    inep = parametros.get('inep')
+    if inep:
+        escola = escola_por_inep(conjunto.indice, inep)
+        if escola is None:
+            raise ErroConsulta(HTTPStatus.NOT_FOUND, f"escola com INEP {inep} não encontrada")
+        return escola['DIREC'], escola['MUNICÍPIO'], escola['ESCOLA_FORMATADA']
+
+    df = conjunto.df
+    direc = parametros['direc']
+    municipio = parametros['municipio']
+    if direc != 'Todas':
+        df = df[df['DIREC'] == direc]
+        if df.empty:
+            raise ErroConsulta(HTTPStatus.NOT_FOUND, f"DIREC {direc} não encontrada")
+    if municipio != 'Todos' and not (df['MUNICÍPIO'] == municipio).any():
+        raise ErroConsulta(HTTPStatus.NOT_FOUND, f"município {municipio} não encontrado")
+    return direc, municipio, 'Todas'
+
+
+def tabela_resumo(visao, parametros):
+    return visao.resumo
+
+
+def tabela_por_direc(visao, parametros):
+    return tabela_direc(visao.direc[BIMESTRES[parametros['bimestre'] - 1]])
+
+
+def tabela_ranking(visao, parametros):
+    ordenar_por = parametros['ordenar_por']
+    coluna = None if ordenar_por is None else f'% Notas Não Lançadas - {ordenar_por}º Bimestre'
+    return ranking_escolas(visao.totais_escolas, ordenar_por=coluna, top_k=parametros['top_k'])
+
+
+ROTAS = {'/resumo': tabela_resumo, '/direc': tabela_por_direc, '/ranking': tabela_ranking}
+
+
+def serializar(df, formato):
+    """Corpo da resposta: lista de registros em JSON ou tabela em Arrow IPC (stream), sem o índice."""
+    if formato == 'arrow':
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        saida = pa.BufferOutputStream()
+        with ipc.new_stream(saida, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        return saida.getvalue().to_pybytes(), TIPO_ARROW
+    return df.to_json(orient='records', force_ascii=False).encode('utf8'), TIPO_JSON
+
+
+class CacheRespostas:
+    """
+    Respostas prontas (bytes), por versão dos dados, rota, parâmetros e formato, com limite de memória.
+
+    Quando o limite é atingido, as respostas usadas há mais tempo são descartadas.
+    """
+
+    def __init__(self, limite_memoria=LIMITE_MEMORIA_RESPOSTAS):
+        self.limite_memoria = limite_memoria
+        self.memoria = 0
+        self.acertos = 0
+        self.faltas = 0
+        self._respostas = OrderedDict()  # chave -> Resposta, da menos à mais recente
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._respostas)
+
+    def obter(self, chave):
+        with self._lock:
+            resposta = self._respostas.get(chave)
+            if resposta is None:
+                self.faltas += 1
+                return None
+            self.acertos += 1
+            self._respostas.move_to_end(chave)
+            return resposta
+
+    def guardar(self, chave, resposta):
+        with self._lock:
+            if chave in self._respostas:
+                self.memoria -= len(self._respostas.pop(chave).corpo)
+            self._respostas[chave] = resposta
+            self.memoria += len(resposta.corpo)
+            while self.memoria > self.limite_memoria and len(self._respostas) > 1:
+                self.memoria -= len(self._respostas.popitem(last=False)[1].corpo)
+
+    def descartar_versoes_antigas(self, versao):
+        """Remove as respostas de outras versões dos dados."""
+        with self._lock:
+            for chave in [chave for chave in self._respostas if chave[0] != versao]:
+                self.memoria -= len(self._respostas.pop(chave).corpo)
+
+
+class ServidorApi(ThreadingHTTPServer):
+    """
+    Servidor HTTP da API (uma thread por conexão).
+
+    Parameters
+    ----------
+    endereco : tuple of (str, int)
+        Endereço e porta (porta 0 para uma porta livre qualquer).
+    monitor : MonitorDados
+        Monitor do df_escola.parquet; a cada nova versão publicada, os caches da versão anterior
+        são descartados.
+    limite_memoria : int
+        Memória máxima (bytes) das respostas em cache.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, endereco, monitor, limite_memoria=LIMITE_MEMORIA_RESPOSTAS):
+        super().__init__(endereco, ManipuladorApi)
+        self.monitor = monitor
+        self.visoes = CacheVisoes()
+        self.respostas = CacheRespostas(limite_memoria)
+        monitor.inscrever(self._nova_versao)
+
+    def _nova_versao(self, conjunto):
+        self.visoes.descartar_versoes_antigas(conjunto.versao)
+        self.respostas.descartar_versoes_antigas(conjunto.versao)
+
+    def responder(self, rota, consulta, formato):
+        """
+        Resposta da rota, do cache ou calculada agora (com a versão dos dados em uso no momento).
+
+        Raises
+        ------
+        ErroConsulta
+            Rota inexistente (404) ou parâmetros inválidos.
+        """
+        conjunto = self.monitor.atual  # a mesma versão do início ao fim da requisição
+        if rota == '/versao':
+            corpo = json.dumps({'versao': conjunto.versao, 'escolas': len(conjunto.indice.escolas),
+                                'respostas_em_cache': len(self.respostas)}).encode('utf8')
+            return Resposta(corpo, TIPO_JSON, _etag(corpo), conjunto.versao)
+        if rota not in ROTAS:
+            raise ErroConsulta(HTTPStatus.NOT_FOUND, f"rota {rota} não existe (rotas: /versao, {', '.join(ROTAS)})")
+
+        parametros = parametros_da_consulta(rota, consulta)
+        chave = (conjunto.versao, rota, tuple(parametros.items()), formato)
+        resposta = self.respostas.obter(chave)
+        if resposta is not None:
+            return resposta
+
+        filtros = filtros_da_consulta(conjunto, parametros)
+        visao = self.visoes.obter(conjunto.versao, filtros, partial(calcular_visao, consultas, conjunto.df))
+        corpo, tipo = serializar(ROTAS[rota](visao, parametros), formato)
+        resposta = Resposta(corpo, tipo, _etag(corpo), conjunto.versao)
+        self.respostas.guardar(chave, resposta)
+        return resposta
+
+
+def _etag(corpo):
+    return '"' + hashlib.sha1(corpo).hexdigest()[:20] + '"'
+
+
+class ManipuladorApi(BaseHTTPRequestHandler):
+    server_version = 'ApiDadosRN/1.0'
+    protocol_version = 'HTTP/1.1'  # conexões mantidas abertas entre as requisições de um cliente
+    disable_nagle_algorithm = True  # o corpo vai logo atrás dos cabeçalhos, sem esperar o ACK do cliente
+
+    def do_GET(self):
+        self._responder(com_corpo=True)
+
+    def do_HEAD(self):
+        self._responder(com_corpo=False)
+
+    def _formato(self, consulta):
+        formato = _parametro(consulta, 'formato')
+        if formato is None:
+            return 'arrow' if TIPO_ARROW in self.headers.get('Accept', '') else 'json'
+        if formato not in ('json', 'arrow'):
+            raise ErroConsulta(HTTPStatus.BAD_REQUEST, "formato deve ser json ou arrow")
+        return formato
+
+    def _responder(self, com_corpo):
+        url = urlsplit(self.path)
+        consulta = parse_qs(url.query)
+        try:
+            resposta = self.server.responder(url.path.rstrip('/') or '/', consulta, self._formato(consulta))
+        except ErroConsulta as erro:
+            corpo = json.dumps({'erro': str(erro)}, ensure_ascii=False).encode('utf8')
+            self._enviar(erro.status, corpo if com_corpo else b'', TIPO_JSON, len(corpo))
+            return
+        except Exception:
+            logger.exception("Falha ao responder %s", self.path)
+            corpo = json.dumps({'erro': 'erro interno'}).encode('utf8')
+            self._enviar(HTTPStatus.INTERNAL_SERVER_ERROR, corpo if com_corpo else b'', TIPO_JSON, len(corpo))
+            return
+
+        cabecalhos = {'ETag': resposta.etag, 'X-Versao-Dados': str(resposta.versao),
+                      'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+        etags_cliente = [etag.strip() for etag in self.headers.get('If-None-Match', '').split(',')]
+        if resposta.etag in etags_cliente or '*' in etags_cliente:
+            self._enviar(HTTPStatus.NOT_MODIFIED, b'', None, None, cabecalhos)
+            return
+        self._enviar(HTTPStatus.OK, resposta.corpo if com_corpo else b'', resposta.tipo, len(resposta.corpo),
+                     cabecalhos)
+
+    def _enviar(self, status, corpo, tipo, tamanho, cabecalhos=None):
+        self.send_response(status)
+        if tipo is not None:
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(tamanho))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        # Uma linha por requisição só no nível DEBUG (os clientes automáticos fazem milhares)
+        logger.debug("%s - %s", self.address_string(), formato % args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP (JSON/Arrow) de leitura dos dados agregados.")
+    parser.add_argument('--dados', default=ARQUIVO_ESCOLA, help="Arquivo df_escola.parquet.")
+    parser.add_argument('--endereco', default=ENDERECO_PADRAO,
+                        help=f"Endereço em que o servidor escuta (padrão: {ENDERECO_PADRAO}, só a máquina local).")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help="Porta do servidor.")
+    parser.add_argument('--limite-memoria', type=int, default=LIMITE_MEMORIA_RESPOSTAS // 1024**2,
+                        help="Memória máxima (MB) das respostas em cache.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    monitor = MonitorDados(args.dados).iniciar()
+    servidor = ServidorApi((args.endereco, args.porta), monitor, args.limite_memoria * 1024**2)
+    logger.info("API em http://%s:%d (versão dos dados %s)", *servidor.server_address[:2], monitor.atual.versao)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        monitor.parar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# Base de estudantes por componente curricular, usada no detalhamento por escola
+#
+# O processamento grava um arquivo Arrow IPC (sem compressão, para permitir memory-map)
+# ordenado por INEP ESCOLA, e um índice pequeno com a faixa de linhas de cada escola.
+# O dashboard abre o arquivo via memory-map e lê somente a faixa da escola selecionada,
+# sem carregar a base estadual inteira na memória.
+import os
+import secrets
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+ARQUIVO_BASE = os.path.join('dados_tratados', 'df_alunos.arrow')
+ARQUIVO_INDICE = os.path.join('dados_tratados', 'df_alunos_indice.parquet')
+
+COLUNAS_NOTAS = [
+    'NOTA 1º BIMESTRE',
+    'NOTA 2º BIMESTRE',
+    'NOTA 3º BIMESTRE',
+    'NOTA 4º BIMESTRE'
+]
+
+COLUNAS_ESCOLA = ['DIREC', 'MUNICÍPIO', 'ESCOLA', 'INEP ESCOLA']
+
+# Colunas categóricas gravadas como dictionary (cada valor distinto é guardado uma única vez)
+COLUNAS_CATEGORICAS = ['SÉRIE', 'TURMA', 'COMPONENTE CURRICULAR']
+
+TAMANHO_LOTE = 65536
+
+
+def normalizar_cpf(cpf):
+    """Mantém só os dígitos do CPF e completa com zeros à esquerda (11 dígitos)."""
+    return cpf.astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
+
+
+def anonimizar_cpf(cpf, chave=None):
+    """
+    Transforma os CPFs em um hash de 64 bits com chave.
+
+    A chave (16 caracteres) vem da variável de ambiente CHAVE_CPF. Se ela não estiver
+    definida, é gerada uma chave aleatória, e os hashes só são comparáveis dentro da
+    mesma execução do processamento.
+
+    Parameters
+    ----------
+    cpf : pandas.Series
+        CPFs, com ou sem pontuação.
+    chave : str, optional
+        Chave de 16 caracteres usada no hash.
+
+    Returns
+    -------
+    numpy.ndarray
+        Hashes em uint64, um por linha.
+    """
+    if chave is None:
+        chave = os.environ.get('CHAVE_CPF') or secrets.token_hex(8)
+    if len(chave.encode('utf8')) != 16:
+        raise ValueError("A chave de anonimização do CPF precisa ter 16 bytes.")
+
+    return pd.util.hash_array(normalizar_cpf(cpf).to_numpy(dtype=object), hash_key=chave)
+
+
+def salvar_base_alunos(df, caminho_base=ARQUIVO_BASE, caminho_indice=ARQUIVO_INDICE):
+    """
+    Grava a base anonimizada de estudantes por componente, ordenada por INEP ESCOLA.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Base tratada (uma linha por estudante e componente curricular), com as colunas
+        de escola, SÉRIE, TURMA, COMPONENTE CURRICULAR, CPF PESSOA e notas bimestrais.
+    caminho_base : str
+        Arquivo Arrow IPC de saída.
+    caminho_indice : str
+        Arquivo .parquet de saída com a faixa de linhas de cada escola.
+
+    Returns
+    -------
+    pandas.DataFrame
+        O índice gravado (uma linha por escola).
+    """
+    base = pd.DataFrame({
+        'INEP ESCOLA': pd.to_numeric(df['INEP ESCOLA'], errors='coerce').fillna(0).astype('uint32'),
+        'CPF_HASH': anonimizar_cpf(df['CPF PESSOA'])
+    }, index=df.index)
+
+    for col in COLUNAS_CATEGORICAS:
+        base[col] = df[col].astype(str).astype('category') if col in df.columns else pd.Categorical([''] * len(df))
+
+    for col in COLUNAS_NOTAS:
+        base[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+
+    # Ordenar por escola (e dentro dela por série, turma e componente) para que cada escola
+    # ocupe uma faixa contínua de linhas
+    ordem = ['INEP ESCOLA'] + COLUNAS_CATEGORICAS
+    base = base.sort_values(ordem, kind='stable').reset_index(drop=True)
+    base = base[['INEP ESCOLA'] + COLUNAS_CATEGORICAS + ['CPF_HASH'] + COLUNAS_NOTAS]
+
+    # Índice: início e quantidade de linhas de cada escola
+    inep = base['INEP ESCOLA'].to_numpy()
+    inicios = np.flatnonzero(np.r_[True, inep[1:] != inep[:-1]]) if len(inep) else np.array([], dtype='int64')
+    quantidades = np.diff(np.r_[inicios, len(inep)])
+
+    escolas = df[COLUNAS_ESCOLA].drop_duplicates('INEP ESCOLA').copy()
+    escolas['INEP ESCOLA'] = pd.to_numeric(escolas['INEP ESCOLA'], errors='coerce').fillna(0).astype('uint32')
+    indice = pd.DataFrame({
+        'INEP ESCOLA': inep[inicios],
+        'INICIO': inicios.astype('int64'),
+        'LINHAS': quantidades.astype('int64')
+    }).merge(escolas, on='INEP ESCOLA', how='left')
+
+    # Gravar sem compressão: é o que permite a leitura zero-copy via memory-map. Os dois arquivos
+    # são gravados ao lado e só então trocados (os.replace), um logo após o outro: as sessões que
+    # têm a base aberta por memory-map nunca veem um arquivo pela metade.
+    tabela = pa.Table.from_pandas(base, preserve_index=False)
+    os.makedirs(os.path.dirname(caminho_base) or '.', exist_ok=True)
+    with ipc.new_file(caminho_base + '.tmp', tabela.schema) as escritor:
+        escritor.write_table(tabela, max_chunksize=TAMANHO_LOTE)
+    indice.to_parquet(caminho_indice + '.tmp', index=False)
+
+    os.replace(caminho_base + '.tmp', caminho_base)
+    os.replace(caminho_indice + '.tmp', caminho_indice)
+    return indice
+
+
+def carregar_indice(caminho_indice=ARQUIVO_INDICE):
+    """Lê o índice de escolas da base de estudantes."""
+    indice = pd.read_parquet(caminho_indice)
+    indice['INEP ESCOLA'] = indice['INEP ESCOLA'].astype(str)
+    return indice.set_index('INEP ESCOLA')
+
+
+def carregar_escola(inep, indice, caminho_base=ARQUIVO_BASE):
+    """
+    Lê da base de estudantes apenas as linhas de uma escola.
+
+    O arquivo é aberto por memory-map: só as páginas da faixa da escola são de fato lidas
+    do disco, e apenas essa faixa é convertida para DataFrame.
+
+    Parameters
+    ----------
+    inep : str
+        Código INEP da escola.
+    indice : pandas.DataFrame
+        Índice retornado por `carregar_indice`.
+    caminho_base : str
+        Arquivo Arrow IPC da base de estudantes.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Linhas da escola (vazio se a escola não estiver na base ou se o índice não for o dessa base).
+    """
+    inep = str(inep).strip()
+    if inep not in indice.index:
+        return _base_vazia()
+
+    inicio = int(indice.at[inep, 'INICIO'])
+    linhas = int(indice.at[inep, 'LINHAS'])
+
+    with pa.memory_map(caminho_base, 'r') as fonte:
+        tabela = ipc.open_file(fonte).read_all()  # zero-copy: nada é copiado para a memória aqui
+        faixa = tabela.slice(inicio, linhas)
+        # Entre as trocas da base e do índice, o índice lido pode ser o da extração anterior:
+        # a faixa só é usada se for mesmo da escola
+        ineps = faixa.column('INEP ESCOLA')
+        if len(faixa) != linhas or str(ineps[0]) != inep or str(ineps[-1]) != inep:
+            return _base_vazia()
+        df_escola = faixa.to_pandas()
+
+    return df_escola
+
+
+def _base_vazia():
+    return pd.DataFrame(columns=['INEP ESCOLA'] + COLUNAS_CATEGORICAS + ['CPF_HASH'] + COLUNAS_NOTAS)
+
+
+def resumir_por_turma(df_alunos, coluna_nota):
+    """
+    Conta notas lançadas e não lançadas por série, turma e componente para um bimestre.
+
+    Parameters
+    ----------
+    df_alunos : pandas.DataFrame
+        Linhas de uma escola (saída de `carregar_escola`).
+    coluna_nota : str
+        Coluna do bimestre (ex.: 'NOTA 2º BIMESTRE').
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por série/turma/componente, ordenada pelo percentual de notas não lançadas.
+    """
+    resumo = (
+        df_alunos.assign(_lancada=df_alunos[coluna_nota].notna())
+        .groupby(COLUNAS_CATEGORICAS, observed=True)['_lancada']
+        .agg(['sum', 'size'])
+        .reset_index()
+        .rename(columns={'sum': 'Notas Lançadas', 'size': 'Total de Registros'})
+    )
+    resumo['Notas Não Lançadas'] = resumo['Total de Registros'] - resumo['Notas Lançadas']
+    resumo['% Não Lançadas'] = (resumo['Notas Não Lançadas'] / resumo['Total de Registros'] * 100).round(1)
+    resumo = resumo[resumo['Notas Não Lançadas'] > 0]
+    return resumo.sort_values(['% Não Lançadas', 'Notas Não Lançadas'], ascending=False)
@@ -0,0 +1,192 @@
+# Estudantes enviados ao Censo Escolar que não estão no SIGEduc
+#
+# O processamento grava a lista em um .parquet ordenado por DIREC, município e INEP ESCOLA, em
+# row groups pequenos: as estatísticas (mínimo e máximo) de cada row group funcionam como índice,
+# e uma consulta filtrada por DIREC, município ou escola só lê os blocos que podem conter o
+# recorte. O dashboard consulta o arquivo com DuckDB, e a filtragem, a busca e a paginação
+# acontecem no servidor: só as linhas da página exibida chegam ao navegador.
+#
+# Por privacidade, o CPF é gravado mascarado (***.456.789-**); a lista completa continua no
+# arquivo df_censo_ausentes exportado pelo processamento.
+import os
+
+import pandas as pd
+
+from busca_escolas import normalizar
+from exportacao import gravar_parquet
+
+ARQUIVO_AUSENTES = os.path.join('dados_tratados', 'ausentes_censo.parquet')
+
+# Possíveis nomes das colunas de INEP e de nome do estudante no arquivo do Censo
+COLUNAS_INEP_CENSO = ['INEP ESCOLA', 'INEP', 'CO_ENTIDADE', 'CÓDIGO INEP']
+COLUNAS_NOME_CENSO = ['NOME', 'NOME DO ALUNO', 'NOME ALUNO', 'ESTUDANTE', 'ALUNO']
+
+COLUNAS_ESCOLA = ['DIREC', 'MUNICÍPIO', 'INEP ESCOLA', 'ESCOLA']
+NAO_IDENTIFICADA = 'Não identificada'
+
+LINHAS_POR_BLOCO = 2_000
+
+# Colunas de controle, usadas nas consultas e não exibidas
+COLUNA_BUSCA = '_BUSCA'
+
+
+def mascarar_cpf(cpf):
+    """CPF com só os dígitos centrais visíveis (***.456.789-**)."""
+    digitos = cpf.astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
+    return '***.' + digitos.str[3:6] + '.' + digitos.str[6:9] + '-**'
+
+
+def _primeira_coluna(df, candidatas):
+    return next((coluna for coluna in candidatas if coluna in df.columns), None)
+
+
+def preparar_ausentes(df_censo_ausentes, df_escola):
+    """
+    Lista de ausentes com a DIREC, o município e o nome da escola (pelo INEP) e o CPF mascarado.
+
+    Parameters
+    ----------
+    df_censo_ausentes : pandas.DataFrame
+        Linhas do arquivo do Censo cujo CPF não está no SIGEduc.
+    df_escola : pandas.DataFrame
+        Base agregada por escola, de onde vêm a DIREC, o município e o nome de cada INEP.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Ordenada por DIREC, MUNICÍPIO, INEP ESCOLA e nome. Escolas que não estão no SIGEduc ficam
+        com DIREC e município 'Não identificada'.
+    """
+    df = df_censo_ausentes.copy()
+    if 'CPF' in df.columns:
+        df['CPF'] = mascarar_cpf(df['CPF'])
+
+    coluna_inep = _primeira_coluna(df, COLUNAS_INEP_CENSO)
+    inep = (df.pop(coluna_inep).astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+            if coluna_inep else pd.Series('', index=df.index))
+    # DIREC, município e nome da escola vêm sempre do df_escola (as colunas do Censo com esses
+    # nomes são descartadas, senão o merge as duplicaria com sufixos _x / _y)
+    df = df.drop(columns=[c for c in COLUNAS_ESCOLA if c != 'INEP ESCOLA'], errors='ignore')
+
+    escolas = df_escola[COLUNAS_ESCOLA].astype(str).drop_duplicates('INEP ESCOLA')
+    escolas['INEP ESCOLA'] = escolas['INEP ESCOLA'].str.strip()
+    df = pd.DataFrame({'INEP ESCOLA': inep}).join(df).merge(escolas, on='INEP ESCOLA', how='left')
+    df[['DIREC', 'MUNICÍPIO']] = df[['DIREC', 'MUNICÍPIO']].fillna(NAO_IDENTIFICADA)
+    df['ESCOLA'] = df['ESCOLA'].fillna('')
+
+    # Texto de busca: nome do estudante, nome da escola e INEP, sem acentos
+    coluna_nome = _primeira_coluna(df, COLUNAS_NOME_CENSO)
+    nomes = df[coluna_nome].astype(str) if coluna_nome else pd.Series('', index=df.index)
+    df[COLUNA_BUSCA] = [normalizar(f"{nome} {escola} {codigo}")
+                        for nome, escola, codigo in zip(nomes, df['ESCOLA'], df['INEP ESCOLA'])]
+
+    ordem = ['DIREC', 'MUNICÍPIO', 'INEP ESCOLA'] + ([coluna_nome] if coluna_nome else [])
+    colunas = COLUNAS_ESCOLA + [c for c in df.columns if c not in COLUNAS_ESCOLA]
+    return df.sort_values(ordem, kind='stable')[colunas].reset_index(drop=True)
+
+
+def salvar_ausentes(df_censo_ausentes, df_escola, caminho=ARQUIVO_AUSENTES):
+    """Grava a lista preparada (ver `preparar_ausentes`) em row groups de LINHAS_POR_BLOCO linhas."""
+    df = preparar_ausentes(df_censo_ausentes, df_escola)
+    temporario = caminho + '.tmp'
+    gravar_parquet(df, temporario, linhas_por_bloco=LINHAS_POR_BLOCO)
+    os.replace(temporario, caminho)
+    return len(df)
+
+
+# CONSULTAS (DuckDB; `con` é uma conexão de consultas_sql.conectar, compartilhada pelas sessões:
+# cada consulta usa um cursor próprio, como em consultas_sql._executar)
+def _where(direc, municipio, inep, busca):
+    condicoes, parametros = [], []
+    if direc != 'Todas':
+        condicoes.append("DIREC = ?")
+        parametros.append(direc)
+    if municipio != 'Todos':
+        condicoes.append("\"MUNICÍPIO\" = ?")
+        parametros.append(municipio)
+    if inep:
+        condicoes.append("\"INEP ESCOLA\" = ?")
+        parametros.append(inep)
+    for termo in normalizar(busca).split():
+        condicoes.append(f"contains({COLUNA_BUSCA}, ?)")
+        parametros.append(termo)
+    where = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    return where, parametros
+
+
+def contar_ausentes(con, direc='Todas', municipio='Todos', inep=None, busca='', caminho=ARQUIVO_AUSENTES):
+    """Quantidade de estudantes ausentes no recorte e na busca."""
+    where, parametros = _where(direc, municipio, inep, busca)
+    return con.cursor().execute(f"SELECT count(*) FROM read_parquet(?) {where}",
+                                [caminho, *parametros]).fetchone()[0]
+
+
+def pagina_ausentes(con, direc='Todas', municipio='Todos', inep=None, busca='', pagina=1,
+                    tamanho_pagina=50, caminho=ARQUIVO_AUSENTES):
+    """
+    Uma página da lista de ausentes, na ordem do arquivo (DIREC, município, escola e nome).
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        Conexão aberta com consultas_sql.conectar (a consulta usa um cursor próprio).
+    direc, municipio : str
+        Filtros ('Todas' / 'Todos' para não filtrar).
+    inep : str, optional
+        Código INEP da escola.
+    busca : str
+        Palavras procuradas no nome do estudante, no nome da escola e no INEP.
+    pagina : int
+        Número da página, a partir de 1.
+    tamanho_pagina : int
+        Linhas por página.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Só as linhas da página, sem as colunas de controle.
+    """
+    where, parametros = _where(direc, municipio, inep, busca)
+    return con.cursor().execute(
+        f"SELECT * EXCLUDE ({COLUNA_BUSCA}) FROM read_parquet(?, file_row_number = true) {where} "
+        f"ORDER BY file_row_number LIMIT ? OFFSET ?",
+        [caminho, *parametros, int(tamanho_pagina), (int(pagina) - 1) * int(tamanho_pagina)]
+    ).df().drop(columns='file_row_number')
+
+
+if __name__ == '__main__':
+    # Tempo das consultas em uma lista sintética de 50 mil ausentes
+    import tempfile
+    import time
+
+    import numpy as np
+
+    from consultas_sql import conectar
+    from publicacao_dados import ler_df_escola
+
+    df_escola = ler_df_escola()
+    rng = np.random.default_rng(0)
+    n = 50_000
+    sinteticos = pd.DataFrame({
+        'CPF': rng.integers(10**9, 10**11, n).astype(str),
+        'INEP': rng.choice(df_escola['INEP ESCOLA'].unique(), n),
+        'NOME': [f"ESTUDANTE {i}" for i in range(n)],
+    })
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'ausentes.parquet')
+        inicio = time.perf_counter()
+        salvar_ausentes(sinteticos, df_escola, caminho)
+        print(f"Gravação de {n} linhas: {time.perf_counter() - inicio:.2f} s")
+
+        con = conectar()
+        direc = df_escola['DIREC'].astype(str).iloc[0]
+        for descricao, kwargs in [('sem filtro, página 1', {}),
+                                  ('sem filtro, página 500', {'pagina': 500}),
+                                  ('DIREC', {'direc': direc}),
+                                  ('busca por nome', {'busca': 'estudante 4242'})]:
+            inicio = time.perf_counter()
+            total = contar_ausentes(con, caminho=caminho, **{k: v for k, v in kwargs.items() if k != 'pagina'})
+            pagina = pagina_ausentes(con, caminho=caminho, **kwargs)
+            print(f"{descricao:<25} {total:>6} linhas, página com {len(pagina):>3} "
+                  f"em {(time.perf_counter() - inicio) * 1000:.1f} ms")
@@ -0,0 +1,88 @@
+# Benchmark da API de dados (api_dados.py)
+#
+# Sobe a API em uma porta livre sobre o df_escola.parquet e mede, com vários clientes em paralelo
+# (cada um com uma conexão mantida aberta):
+#   - requisições frias: a primeira de cada recorte (estado, DIRECs e municípios), que calcula a resposta;
+#   - requisições repetidas: as mesmas, já no cache de respostas;
+#   - requisições condicionais (If-None-Match) respondidas com 304, sem corpo.
+#
+# Uso:
+#     python benchmarks/bench_api.py --clientes 8 --repeticoes 20
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+PASTA_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_PROJETO)
+
+from api_dados import ServidorApi  # noqa: E402
+from publicacao_dados import ARQUIVO_ESCOLA, MonitorDados  # noqa: E402
+
+
+def caminhos(df):
+    """Ranking (top 20 do 1º bimestre) do estado, de cada DIREC e de cada município."""
+    recortes = [{}] + [{'direc': d} for d in sorted(df['DIREC'].unique())]
+    recortes += [{'direc': d, 'municipio': m}
+                 for d, m in df[['DIREC', 'MUNICÍPIO']].drop_duplicates().itertuples(index=False)]
+    return ['/ranking?' + urlencode({**recorte, 'ordenar_por': 1, 'top_k': 20}) for recorte in recortes]
+
+
+def requisitar(porta, lista, etags=None):
+    """Faz as requisições da lista em uma conexão; devolve {caminho: ETag}."""
+    conexao = http.client.HTTPConnection('127.0.0.1', porta)
+    vistos = {}
+    for caminho in lista:
+        cabecalhos = {'If-None-Match': etags[caminho]} if etags else {}
+        conexao.request('GET', caminho, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        resposta.read()
+        if resposta.status not in (200, 304):
+            raise SystemExit(f"{caminho}: status {resposta.status}")
+        vistos[caminho] = resposta.getheader('ETag')
+    conexao.close()
+    return vistos
+
+
+def medir(porta, listas, etags=None):
+    """Executa as listas em paralelo (uma por cliente); devolve (requisições, segundos)."""
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(len(listas)) as executor:
+        list(executor.map(lambda lista: requisitar(porta, lista, etags), listas))
+    return sum(len(lista) for lista in listas), time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requisições por segundo da API de dados (frias, em cache e 304).")
+    parser.add_argument('--dados', default=os.path.join(PASTA_PROJETO, ARQUIVO_ESCOLA), help="Arquivo df_escola.parquet.")
+    parser.add_argument('--clientes', type=int, default=8, help="Clientes em paralelo.")
+    parser.add_argument('--repeticoes', type=int, default=20, help="Vezes que cada cliente repete os recortes.")
+    args = parser.parse_args()
+
+    monitor = MonitorDados(args.dados)
+    servidor = ServidorApi(('127.0.0.1', 0), monitor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    porta = servidor.server_address[1]
+
+    lista = caminhos(monitor.atual.df)
+    print(f"{len(lista)} recortes, {args.clientes} clientes\n")
+
+    inicio = time.perf_counter()
+    etags = requisitar(porta, lista)
+    frias = time.perf_counter() - inicio
+    print(f"{'Frias (cálculo de cada recorte)':<40} {len(lista) / frias:>10.0f} req/s  ({frias / len(lista) * 1000:.1f} ms cada)")
+
+    for rotulo, etags_cliente in [('Repetidas (cache de respostas)', None), ('Condicionais (304)', etags)]:
+        n, segundos = medir(porta, [lista * args.repeticoes] * args.clientes, etags_cliente)
+        print(f"{rotulo:<40} {n / segundos:>10.0f} req/s  ({segundos / n * 1e6:.0f} µs cada)")
+
+    print(f"\nRespostas em cache: {len(servidor.respostas)} ({servidor.respostas.memoria / 1024:.0f} kB)")
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
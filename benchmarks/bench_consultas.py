@@ -0,0 +1,103 @@
+# Benchmark dos backends de consulta (pandas x SQL/DuckDB)
+#
+# Gera uma base sintética replicando o df_escola N vezes (com códigos INEP distintos em cada
+# réplica), executa as mesmas consultas do dashboard nos dois backends para várias combinações
+# de filtros e mede o tempo de cada um. A paridade dos resultados é conferida pelos testes
+# (tests/test_paridade_sql.py).
+#
+# Uso:
+#     python benchmarks/bench_consultas.py --escala 50 --repeticoes 5
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import consultas  # noqa: E402
+import consultas_sql  # noqa: E402
+
+ARQUIVO_ORIGEM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'dados_tratados', 'df_escola.parquet')
+
+
+def gerar_base_sintetica(escala, caminho):
+    """Replica o df_escola `escala` vezes e grava em `caminho` (.parquet)."""
+    df = pd.read_parquet(ARQUIVO_ORIGEM)
+    replicas = []
+    for i in range(escala):
+        replica = df.copy()
+        replica['INEP ESCOLA'] = replica['INEP ESCOLA'].astype('int64') + i * 100_000_000
+        replicas.append(replica)
+    pd.concat(replicas, ignore_index=True).to_parquet(caminho, index=False)
+
+
+def carregar_como_app(caminho):
+    """Lê a base com as mesmas normalizações de publicacao_dados.ler_df_escola()."""
+    df = pd.read_parquet(caminho)
+    df['INEP ESCOLA'] = df['INEP ESCOLA'].astype(str).str.strip()
+    df['ESCOLA'] = df['ESCOLA'].astype(str).str.strip()
+    df['ESCOLA_FORMATADA'] = df['ESCOLA'] + " (cód. Inep: " + df['INEP ESCOLA'] + ")"
+    return df
+
+
+def combinacoes_filtros(df):
+    """Filtros testados: estado, uma DIREC, um município e uma escola."""
+    linha = df.iloc[len(df) // 2]
+    return [
+        ('Todas', 'Todos', 'Todas'),
+        (linha['DIREC'], 'Todos', 'Todas'),
+        (linha['DIREC'], linha['MUNICÍPIO'], 'Todas'),
+        (linha['DIREC'], linha['MUNICÍPIO'], linha['ESCOLA_FORMATADA']),
+        ('DIREC INEXISTENTE', 'Todos', 'Todas'),
+    ]
+
+
+def consultas_dashboard(backend, fonte, filtros):
+    """Executa as consultas de uma renderização da página (as mesmas chamadas do app)."""
+    resultado = {'resumo': backend.totais_bimestres(fonte, *filtros)}
+    for b in consultas.BIMESTRES:
+        resultado[f'direc_{b}'] = consultas.percentuais_direc(backend.totais_por_direc(fonte, *filtros, bimestre=b))
+    resultado['ranking'] = consultas.ranking_escolas(backend.totais_por_escola(fonte, *filtros))
+    resultado['entidades'] = backend.totais_por_entidade(fonte)
+    return resultado
+
+
+def medir(funcao, repeticoes):
+    """Menor tempo (s) entre `repeticoes` execuções."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de consulta (pandas x SQL).")
+    parser.add_argument('--escala', type=int, default=50, help="Quantas réplicas do df_escola gerar.")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Execuções por medição (vale a menor).")
+    parser.add_argument('--threads', type=int, default=None, help="Threads do DuckDB (padrão: todos os núcleos).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'df_escola.parquet')
+        gerar_base_sintetica(args.escala, caminho)
+
+        df = carregar_como_app(caminho)
+        fonte_sql = consultas_sql.FonteSQL(consultas_sql.conectar(args.threads), caminho)
+        print(f"Base sintética: {len(df):,} linhas ({args.escala}x o df_escola)")
+        print(f"{'filtros':<60} {'pandas (ms)':>12} {'sql (ms)':>12}")
+
+        for filtros in combinacoes_filtros(df):
+            t_pandas = medir(lambda: consultas_dashboard(consultas, df, filtros), args.repeticoes)
+            t_sql = medir(lambda: consultas_dashboard(consultas_sql, fonte_sql, filtros), args.repeticoes)
+            descricao = ' / '.join(str(f) for f in filtros)[:60]
+            print(f"{descricao:<60} {t_pandas * 1000:>12.1f} {t_sql * 1000:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
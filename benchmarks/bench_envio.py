@@ -0,0 +1,60 @@
+# Benchmark: dados enviados ao navegador em cada execução do dashboard
+#
+# Abre as páginas com o AppTest (sem servidor), com a medição de envio.py, e mostra os
+# bytes enviados por tipo de elemento na abertura de cada página, para o estado todo e para
+# uma DIREC. Termina com código 1 se alguma execução passar do orçamento.
+#
+# Uso:
+#     python benchmarks/bench_envio.py
+#     python benchmarks/bench_envio.py --orcamento 300   # kB por execução
+import argparse
+import os
+import sys
+
+PASTA_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_PROJETO)
+os.chdir(PASTA_PROJETO)
+os.environ['MEDIR_ENVIO'] = '1'
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+PAGINAS = ['paginas/lancamento.py', 'paginas/rendimento.py', 'paginas/ausentes_do_censo.py']
+
+
+def medir(pagina, direc=None):
+    at = AppTest.from_file(os.path.join(PASTA_PROJETO, 'Página_Inicial.py'), default_timeout=120)
+    if direc:
+        at.query_params['direc'] = direc
+    at.run()
+    if pagina != PAGINAS[0]:
+        at.switch_page(pagina).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at.session_state['medicao_envio']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede os bytes enviados ao navegador por execução.")
+    parser.add_argument('--direc', default=None, help="DIREC do segundo recorte (padrão: a primeira).")
+    parser.add_argument('--orcamento', type=float, default=None, help="Máximo (kB) por execução.")
+    args = parser.parse_args()
+
+    from publicacao_dados import ler_df_escola
+    direc = args.direc or sorted(ler_df_escola()['DIREC'].dropna().astype(str).unique())[0]
+
+    excedeu = False
+    for pagina in PAGINAS:
+        for recorte in (None, direc):
+            medicao = medir(pagina, recorte)
+            total = medicao.total / 1024
+            excedeu |= args.orcamento is not None and total > args.orcamento
+            print(f"\n{pagina} ({recorte or 'estado'}): {total:,.1f} kB em {len(medicao.mensagens)} mensagens")
+            print(medicao.resumo().head(8).to_string(index=False))
+
+    if args.orcamento is not None:
+        print(f"\n{'Acima' if excedeu else 'Dentro'} do orçamento ({args.orcamento:g} kB por execução)")
+        sys.exit(1 if excedeu else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Benchmark da abertura do dashboard, com orçamento de tempo
+#
+# Mede, em um processo Python novo:
+#   - o tempo de importação dos módulos usados no início do dashboard (Página_Inicial.py e página inicial);
+#   - a primeira sessão (processo frio: importações, leitura dos dados e caches vazios);
+#   - sessões novas com o processo já aquecido (o caso de um novo usuário com o servidor no ar).
+# Termina com código 1 se a mediana das sessões novas passar do orçamento.
+#
+# Uso:
+#     python benchmarks/bench_inicializacao.py --orcamento 1.0 --sessoes 5
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PASTA_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado no processo novo: imprime os tempos medidos em JSON
+_MEDICAO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+import streamlit, pandas
+import consultas, dados_painel, exportacao, historico, imagens, armazenamento_alunos, publicacao_dados
+importacoes = time.perf_counter() - inicio
+
+from streamlit.testing.v1 import AppTest
+
+def sessao():
+    inicio = time.perf_counter()
+    at = AppTest.from_file('Página_Inicial.py', default_timeout=120)
+    at.run()
+    if at.exception:
+        raise SystemExit(f"Erro no app: {at.exception[0].value}")
+    return time.perf_counter() - inicio
+
+primeira = sessao()
+seguintes = [sessao() for _ in range(int(sys.argv[1]))]
+print(json.dumps({'importacoes': importacoes, 'primeira': primeira, 'seguintes': seguintes}))
+"""
+
+
+def medir(sessoes):
+    """Executa a medição em um processo novo (na pasta do projeto) e devolve os tempos (s)."""
+    resultado = subprocess.run([sys.executable, '-c', _MEDICAO, str(sessoes)], cwd=PASTA_PROJETO,
+                               capture_output=True, text=True, check=True)
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de abertura do dashboard, comparado a um orçamento.")
+    parser.add_argument('--orcamento', type=float, default=1.0,
+                        help="Tempo máximo (s) da mediana das sessões novas com o processo aquecido.")
+    parser.add_argument('--sessoes', type=int, default=5, help="Sessões novas medidas após a primeira.")
+    args = parser.parse_args()
+
+    tempos = medir(args.sessoes)
+    mediana = statistics.median(tempos['seguintes'])
+
+    print(f"{'Importações do início do app':<45} {tempos['importacoes'] * 1000:>8.0f} ms")
+    print(f"{'Primeira sessão (processo frio)':<45} {tempos['primeira'] * 1000:>8.0f} ms")
+    print(f"{'Sessão nova, processo aquecido (mediana)':<45} {mediana * 1000:>8.0f} ms "
+          f"(mín. {min(tempos['seguintes']) * 1000:.0f}, máx. {max(tempos['seguintes']) * 1000:.0f})")
+
+    if mediana > args.orcamento:
+        print(f"ACIMA DO ORÇAMENTO: {mediana:.2f} s > {args.orcamento:.2f} s")
+        sys.exit(1)
+    print(f"Dentro do orçamento ({args.orcamento:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Busca de escolas por nome ou código INEP
+#
+# O índice é montado uma vez por versão dos dados: os nomes são normalizados (maiúsculas, sem
+# acentos e sem pontuação) e quebrados em palavras, e cada prefixo de cada palavra aponta para as
+# escolas que o contêm. Uma consulta é a interseção dos conjuntos dos prefixos digitados
+# ("est prof joao" encontra "ESCOLA ESTADUAL PROFESSOR JOÃO ..."), e um código INEP completo é
+# localizado diretamente em um dicionário.
+import heapq
+import unicodedata
+from collections import defaultdict
+
+COLUNAS_ESCOLA = ['INEP ESCOLA', 'ESCOLA', 'DIREC', 'MUNICÍPIO', 'ESCOLA_FORMATADA']
+
+
+def normalizar(texto):
+    """Texto em maiúsculas, sem acentos e com a pontuação trocada por espaços."""
+    sem_acento = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return ''.join(c if c.isalnum() else ' ' for c in sem_acento.upper())
+
+
+class IndiceEscolas:
+    """
+    Índice de prefixos das palavras do nome (e do código INEP) de cada escola.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Base com as colunas INEP ESCOLA, ESCOLA, DIREC, MUNICÍPIO e ESCOLA_FORMATADA (uma ou mais
+        linhas por escola).
+    """
+
+    def __init__(self, df):
+        escolas = (df[COLUNAS_ESCOLA].astype(str).drop_duplicates('INEP ESCOLA')
+                   .sort_values('ESCOLA_FORMATADA').reset_index(drop=True))
+        self.escolas = escolas.to_dict('records')
+        self.por_inep = {inep: i for i, inep in enumerate(escolas['INEP ESCOLA'])}
+        self._tamanhos = escolas['ESCOLA'].str.len().tolist()
+
+        prefixos = defaultdict(set)
+        self._palavras = []
+        for i, (nome, inep) in enumerate(zip(escolas['ESCOLA'], escolas['INEP ESCOLA'])):
+            palavras = normalizar(nome).split() + [inep]
+            self._palavras.append(set(palavras))
+            for palavra in palavras:
+                for fim in range(1, len(palavra) + 1):
+                    prefixos[palavra[:fim]].add(i)
+        self._prefixos = dict(prefixos)
+
+    def __len__(self):
+        return len(self.escolas)
+
+    def buscar(self, consulta, limite=10):
+        """
+        Escolas que correspondem à consulta, das mais para as menos relevantes.
+
+        Um código INEP completo vem primeiro; depois, as escolas que têm todas as palavras
+        digitadas como início de alguma palavra do nome, priorizando as que têm mais palavras
+        completas iguais às digitadas e, em seguida, os nomes mais curtos.
+
+        Returns
+        -------
+        list of dict
+            Até `limite` escolas, com as colunas de COLUNAS_ESCOLA.
+        """
+        termos = normalizar(consulta).split()
+        if not termos:
+            return []
+
+        exata = self.por_inep.get(termos[0]) if len(termos) == 1 else None
+
+        # Interseção dos conjuntos, começando pelo menor
+        conjuntos = sorted((self._prefixos.get(termo, set()) for termo in termos), key=len)
+        encontradas = set(conjuntos[0]).intersection(*conjuntos[1:])
+        encontradas.discard(exata)
+
+        # Só as `limite` melhores são ordenadas (heap), não todas as encontradas
+        melhores = heapq.nsmallest(
+            limite - (exata is not None), encontradas,
+            key=lambda i: (-sum(termo in self._palavras[i] for termo in termos), self._tamanhos[i], i))
+        posicoes = ([exata] if exata is not None else []) + melhores
+        return [self.escolas[i] for i in posicoes]
+
+
+def escola_por_inep(indice, inep):
+    """Linha da escola com o código INEP informado (ou None)."""
+    posicao = indice.por_inep.get(str(inep).strip())
+    return None if posicao is None else indice.escolas[posicao]
+
+
+if __name__ == '__main__':
+    # Tempo de consulta na base do dashboard
+    import time
+
+    # importado aqui: publicacao_dados importa este módulo
+    from publicacao_dados import ler_df_escola
+
+    df = ler_df_escola()
+
+    inicio = time.perf_counter()
+    indice = IndiceEscolas(df)
+    print(f"Índice de {len(indice)} escolas montado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    for consulta in ['esc est', 'jose', 'prof maria', df['INEP ESCOLA'].iloc[0], 'inexistente']:
+        repeticoes = 1000
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            resultado = indice.buscar(consulta)
+        tempo = (time.perf_counter() - inicio) / repeticoes * 1000
+        print(f"{consulta!r:<20} {len(resultado):>3} resultados em {tempo:.3f} ms")
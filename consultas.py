@@ -0,0 +1,244 @@
+# Consultas do dashboard sobre o df_escola (backend pandas)
+#
+# As mesmas funções existem em consultas_sql.py, executadas como SQL direto sobre o .parquet.
+# As duas versões recebem os mesmos filtros e devolvem DataFrames no mesmo formato; os
+# percentuais são sempre calculados pelas funções deste módulo, para que os dois backends
+# arredondem da mesma forma.
+#
+# O módulo não depende do Streamlit: as mesmas funções servem ao dashboard, aos processamentos
+# em lote (alertas_escolas.py), aos benchmarks e a notebooks.
+from collections.abc import Sequence
+
+import pandas as pd
+
+BIMESTRES = ['1B', '2B', '3B', '4B']
+
+COLUNAS_CONTAGEM = [f'{b}_Notas {tipo}' for b in BIMESTRES for tipo in ('Lancadas', 'Nao Lancadas')]
+
+COLUNAS_ESCOLA = ['INEP ESCOLA', 'ESCOLA', 'DIREC', 'MUNICÍPIO']
+
+# Níveis da comparação entre entidades: nível -> coluna do df_escola
+NIVEIS = {'DIREC': 'DIREC', 'Município': 'MUNICÍPIO', 'Escola': 'ESCOLA_FORMATADA'}
+ESTADO = ('Estado', 'Rio Grande do Norte')
+
+
+def formatar_escola(escola: pd.Series, inep: pd.Series) -> pd.Series:
+    """Monta o rótulo 'ESCOLA (cód. Inep: INEP)' usado nos filtros e tabelas."""
+    return escola.astype(str) + " (cód. Inep: " + inep.astype(str) + ")"
+
+
+def aplicar_filtros(_df: pd.DataFrame, direc: str, municipio: str, escola: str) -> pd.DataFrame:
+    """Linhas do recorte ('Todas' / 'Todos' para não filtrar; `escola` no formato de `formatar_escola`)."""
+    df_filtrado = _df
+
+    if direc != 'Todas':
+        df_filtrado = df_filtrado[df_filtrado['DIREC'] == direc]
+
+    if municipio != 'Todos':
+        df_filtrado = df_filtrado[df_filtrado['MUNICÍPIO'] == municipio]
+
+    # Criar coluna formatada para escolas (apenas se necessário)
+    if 'ESCOLA_FORMATADA' not in df_filtrado.columns:
+        df_filtrado = df_filtrado.assign(
+            ESCOLA_FORMATADA=formatar_escola(df_filtrado['ESCOLA'], df_filtrado['INEP ESCOLA'])
+        )
+
+    if escola != 'Todas':
+        df_filtrado = df_filtrado[df_filtrado['ESCOLA_FORMATADA'] == escola]
+
+    return df_filtrado
+
+
+def totais_bimestres(df: pd.DataFrame, direc: str, municipio: str, escola: str) -> pd.Series:
+    """Soma das notas lançadas e não lançadas de cada bimestre (Series indexada pelas colunas)."""
+    df_filtrado = aplicar_filtros(df, direc, municipio, escola)
+    return df_filtrado[COLUNAS_CONTAGEM].sum()
+
+
+def resumo_lancamento(totais: pd.Series) -> pd.DataFrame:
+    """
+    Notas lançadas e não lançadas de cada bimestre, com os percentuais.
+
+    Parameters
+    ----------
+    totais : pandas.Series
+        Resultado de `totais_bimestres` (de qualquer um dos backends).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por bimestre: Bimestre ('1º Bimestre', ...), Notas Lançadas, Notas Não
+        Lançadas, Total de Registros, % Lançadas e % Não Lançadas (arredondados a 1 casa).
+    """
+    lancadas = totais[[f'{b}_Notas Lancadas' for b in BIMESTRES]].to_numpy()
+    nao_lancadas = totais[[f'{b}_Notas Nao Lancadas' for b in BIMESTRES]].to_numpy()
+    resumo = pd.DataFrame({
+        'Bimestre': [f'{n}º Bimestre' for n in range(1, len(BIMESTRES) + 1)],
+        'Notas Lançadas': lancadas,
+        'Notas Não Lançadas': nao_lancadas,
+        'Total de Registros': lancadas + nao_lancadas,
+    })
+    total = resumo['Total de Registros'].where(resumo['Total de Registros'] > 0)
+    resumo['% Lançadas'] = (resumo['Notas Lançadas'] / total * 100).round(1)
+    resumo['% Não Lançadas'] = (resumo['Notas Não Lançadas'] / total * 100).round(1)
+    return resumo
+
+
+def totais_por_direc(df: pd.DataFrame, direc: str, municipio: str, escola: str, bimestre: str) -> pd.DataFrame:
+    """
+    Notas lançadas e não lançadas de um bimestre por DIREC.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Colunas DIREC, Lançadas e Não_Lançadas, em ordem alfabética de DIREC.
+    """
+    df_filtrado = aplicar_filtros(df, direc, municipio, escola)
+    df_direc = df_filtrado.groupby('DIREC', observed=True).agg({
+        f'{bimestre}_Notas Lancadas': 'sum',
+        f'{bimestre}_Notas Nao Lancadas': 'sum'
+    }).reset_index()
+
+    df_direc = df_direc.rename(columns={
+        f'{bimestre}_Notas Lancadas': 'Lançadas',
+        f'{bimestre}_Notas Nao Lancadas': 'Não_Lançadas'
+    })
+    return df_direc.sort_values('DIREC', ascending=True).reset_index(drop=True)
+
+
+def totais_por_escola(df: pd.DataFrame, direc: str, municipio: str, escola: str) -> pd.DataFrame:
+    """
+    Totais de notas não lançadas e de registros por escola e bimestre.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por combinação única de INEP ESCOLA, ESCOLA, DIREC e MUNICÍPIO (na ordem
+        em que aparecem nos dados), com as colunas `{bimestre}_Nao Lancadas` e `{bimestre}_Total`.
+        Os totais são sempre os da escola inteira (agrupados pelo INEP).
+    """
+    df_filtrado = aplicar_filtros(df, direc, municipio, escola)
+
+    somas = df_filtrado.groupby('INEP ESCOLA', observed=True)[COLUNAS_CONTAGEM].sum()
+    totais = pd.DataFrame(index=somas.index)
+    for b in BIMESTRES:
+        totais[f'{b}_Nao Lancadas'] = somas[f'{b}_Notas Nao Lancadas']
+        totais[f'{b}_Total'] = somas[f'{b}_Notas Lancadas'] + somas[f'{b}_Notas Nao Lancadas']
+
+    escolas_unicas = df_filtrado[COLUNAS_ESCOLA].drop_duplicates()
+    return escolas_unicas.merge(totais, left_on='INEP ESCOLA', right_index=True, how='left').reset_index(drop=True)
+
+
+def percentuais_direc(df_direc: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta total de registros e percentuais ao resultado de `totais_por_direc`."""
+    df_direc = df_direc.copy()
+    df_direc['Total_Registros'] = df_direc['Lançadas'] + df_direc['Não_Lançadas']
+    df_direc['%_Lançadas'] = (df_direc['Lançadas'] / df_direc['Total_Registros'] * 100).round(1)
+    df_direc['%_Não_Lançadas'] = (df_direc['Não_Lançadas'] / df_direc['Total_Registros'] * 100).round(1)
+    return df_direc
+
+
+def tabela_direc(df_direc: pd.DataFrame) -> pd.DataFrame:
+    """Tabela por DIREC exibida e exportada pelo dashboard, a partir de `percentuais_direc`."""
+    return pd.DataFrame({
+        'DIREC': df_direc['DIREC'],
+        'Total de Registros': df_direc['Total_Registros'],
+        'Notas Lançadas': df_direc['Lançadas'],
+        'Notas Não Lançadas': df_direc['Não_Lançadas'],
+        '% Lançadas': df_direc['%_Lançadas'],
+        '% Não Lançadas': df_direc['%_Não_Lançadas']
+    })
+
+
+def ranking_escolas(df_totais: pd.DataFrame, ordenar_por: str | None = None,
+                    top_k: int | None = None) -> pd.DataFrame:
+    """
+    Monta a tabela de escolas com os percentuais de notas não lançadas por bimestre.
+
+    Parameters
+    ----------
+    df_totais : pandas.DataFrame
+        Resultado de `totais_por_escola` (de qualquer um dos backends).
+    ordenar_por : str, optional
+        Coluna de percentual pela qual ordenar, do maior para o menor (empates na ordem original).
+        Sem ela, as escolas ficam na ordem de `df_totais`.
+    top_k : int, optional
+        Devolve só as `top_k` primeiras escolas da ordenação (seleção parcial, sem ordenar todas).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Colunas DIREC, Município, Escola e '% Notas Não Lançadas - Nº Bimestre'. Escolas sem
+        registros no bimestre ficam com 0%.
+    """
+    tabela = pd.DataFrame({
+        'DIREC': df_totais['DIREC'],
+        'Município': df_totais['MUNICÍPIO'],
+        'Escola': formatar_escola(df_totais['ESCOLA'], df_totais['INEP ESCOLA'])
+    })
+    for n, b in enumerate(BIMESTRES, start=1):
+        total = df_totais[f'{b}_Total']
+        perc = (df_totais[f'{b}_Nao Lancadas'] / total.where(total > 0) * 100).round(1)
+        tabela[f'% Notas Não Lançadas - {n}º Bimestre'] = perc.fillna(0)
+
+    if ordenar_por is not None and top_k is not None:
+        return tabela.nlargest(top_k, ordenar_por, keep='first')
+    if ordenar_por is not None:
+        return tabela.sort_values(ordenar_por, ascending=False, kind='stable')
+    return tabela if top_k is None else tabela.head(top_k)
+
+
+def totais_por_entidade(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vetor de contagens (notas lançadas e não lançadas por bimestre) de cada entidade.
+
+    As entidades são o estado, cada DIREC, cada município e cada escola. O cálculo percorre a
+    base uma vez por nível; depois, comparar entidades é só uma consulta pelo índice.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Índice (NIVEL, ENTIDADE), colunas de COLUNAS_CONTAGEM, em ordem de índice.
+    """
+    if 'ESCOLA_FORMATADA' not in df.columns:
+        df = df.assign(ESCOLA_FORMATADA=formatar_escola(df['ESCOLA'], df['INEP ESCOLA']))
+
+    estado = df[COLUNAS_CONTAGEM].sum().to_frame().T
+    partes = [estado.assign(NIVEL=ESTADO[0], ENTIDADE=ESTADO[1])]
+    for nivel, coluna in NIVEIS.items():
+        somas = df.groupby(coluna, observed=True)[COLUNAS_CONTAGEM].sum()
+        partes.append(somas.rename_axis('ENTIDADE').reset_index().assign(NIVEL=nivel))
+
+    vetores = pd.concat(partes, ignore_index=True)
+    vetores['ENTIDADE'] = vetores['ENTIDADE'].astype(str)
+    vetores[COLUNAS_CONTAGEM] = vetores[COLUNAS_CONTAGEM].astype('int64')
+    return vetores.set_index(['NIVEL', 'ENTIDADE']).sort_index()
+
+
+def comparar_entidades(vetores: pd.DataFrame, entidades: Sequence[tuple[str, str]]) -> pd.DataFrame:
+    """
+    Percentual de notas lançadas por bimestre de cada entidade, lado a lado.
+
+    Parameters
+    ----------
+    vetores : pandas.DataFrame
+        Resultado de `totais_por_entidade` (de qualquer um dos backends).
+    entidades : list of tuple
+        Pares (nível, entidade), na ordem em que devem aparecer.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Colunas Nível, Entidade, Total de Registros e '% Lançadas - Nº Bimestre'.
+    """
+    selecionados = vetores.loc[list(entidades)]
+    tabela = pd.DataFrame({
+        'Nível': selecionados.index.get_level_values('NIVEL'),
+        'Entidade': selecionados.index.get_level_values('ENTIDADE'),
+        'Total de Registros': (selecionados['1B_Notas Lancadas'] + selecionados['1B_Notas Nao Lancadas']).to_numpy()
+    })
+    for n, b in enumerate(BIMESTRES, start=1):
+        total = selecionados[f'{b}_Notas Lancadas'] + selecionados[f'{b}_Notas Nao Lancadas']
+        perc = (selecionados[f'{b}_Notas Lancadas'] / total.where(total > 0) * 100).round(1)
+        tabela[f'% Lançadas - {n}º Bimestre'] = perc.to_numpy()
+    return tabela
@@ -0,0 +1,201 @@
+# Consultas do dashboard sobre o df_escola (backend SQL, via DuckDB)
+#
+# Executa os mesmos filtros e agregações de consultas.py como SQL direto sobre o arquivo
+# .parquet, com um motor analítico embutido no processo (sem servidor). O DuckDB lê apenas
+# as colunas usadas em cada consulta e paraleliza a leitura e a agregação entre threads.
+#
+# Backend opcional: é selecionado com a variável de ambiente BACKEND_CONSULTAS=sql.
+#
+# As consultas recebem uma FonteSQL: a conexão e o arquivo consultado. No dashboard, o arquivo é
+# uma cópia fixa da versão dos dados da execução (gravar_versao), e não o df_escola.parquet, que
+# pode ser regravado a qualquer momento: os resultados em cache por versão são sempre dessa versão.
+import os
+import threading
+from collections import namedtuple
+
+import duckdb
+
+from consultas import BIMESTRES, COLUNAS_CONTAGEM, ESTADO
+
+ARQUIVO_ESCOLA = os.path.join('dados_tratados', 'df_escola.parquet')
+
+# Mesmas normalizações feitas em publicacao_dados.ler_df_escola()
+_INEP = "trim(CAST(\"INEP ESCOLA\" AS VARCHAR))"
+_ESCOLA = "trim(CAST(ESCOLA AS VARCHAR))"
+_ESCOLA_FORMATADA = f"{_ESCOLA} || ' (cód. Inep: ' || {_INEP} || ')'"
+
+# Versões gravadas mantidas em disco por gravar_versao (as sessões em andamento ainda podem
+# consultar as anteriores à atual)
+VERSOES_MANTIDAS = 3
+
+# Fonte das consultas: conexão (ou cursor) e arquivo .parquet consultado
+FonteSQL = namedtuple('FonteSQL', ['con', 'caminho'])
+
+
+def conectar(threads=None):
+    """
+    Abre uma conexão DuckDB em memória.
+
+    Parameters
+    ----------
+    threads : int, optional
+        Número de threads usadas nas consultas. Por padrão, todos os núcleos disponíveis.
+    """
+    config = {'threads': threads} if threads else {}
+    return duckdb.connect(database=':memory:', config=config)
+
+
+def gravar_versao(df, versao, pasta):
+    """
+    Grava uma cópia fixa de uma versão do df_escola, para ser consultada com SQL.
+
+    A cópia é gravada uma vez por versão (de forma atômica) e as mais antigas que as
+    VERSOES_MANTIDAS mais recentes são apagadas.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        df_escola da versão (ConjuntoDados.df).
+    versao : int
+        Versão dos dados (ConjuntoDados.versao).
+    pasta : str
+        Pasta das cópias (exclusiva do processo).
+
+    Returns
+    -------
+    str
+        Caminho da cópia.
+    """
+    caminho = os.path.join(pasta, f'df_escola_{versao}.parquet')
+    if not os.path.exists(caminho):
+        temporario = f'{caminho}.{threading.get_ident()}.tmp'
+        df.drop(columns=['ESCOLA_FORMATADA'], errors='ignore').to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+
+    versoes = sorted(int(arquivo[len('df_escola_'):-len('.parquet')]) for arquivo in os.listdir(pasta)
+                     if arquivo.startswith('df_escola_') and arquivo.endswith('.parquet'))
+    for antiga in versoes[:-VERSOES_MANTIDAS]:
+        if antiga != versao:
+            try:
+                os.remove(os.path.join(pasta, f'df_escola_{antiga}.parquet'))
+            except FileNotFoundError:
+                pass
+    return caminho
+
+
+def _where(direc, municipio, escola):
+    """Monta a cláusula WHERE (com parâmetros) equivalente a consultas.aplicar_filtros."""
+    condicoes = []
+    parametros = []
+
+    if direc != 'Todas':
+        condicoes.append("DIREC = ?")
+        parametros.append(direc)
+
+    if municipio != 'Todos':
+        condicoes.append("\"MUNICÍPIO\" = ?")
+        parametros.append(municipio)
+
+    if escola != 'Todas':
+        condicoes.append(f"{_ESCOLA_FORMATADA} = ?")
+        parametros.append(escola)
+
+    where = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    return where, parametros
+
+
+def _soma(coluna):
+    return f"CAST(COALESCE(SUM(\"{coluna}\"), 0) AS BIGINT) AS \"{coluna}\""
+
+
+def _executar(fonte, sql, parametros):
+    # Um cursor por consulta: a conexão pode ser compartilhada entre as sessões do app
+    return fonte.con.cursor().execute(sql, parametros).df()
+
+
+def totais_bimestres(fonte, direc, municipio, escola):
+    """Soma das notas lançadas e não lançadas de cada bimestre (Series indexada pelas colunas)."""
+    where, parametros = _where(direc, municipio, escola)
+    sql = f"""
+        SELECT {', '.join(_soma(c) for c in COLUNAS_CONTAGEM)}
+        FROM read_parquet(?)
+        {where}
+    """
+    return _executar(fonte, sql, [fonte.caminho] + parametros).iloc[0]
+
+
+def totais_por_direc(fonte, direc, municipio, escola, bimestre):
+    """Notas lançadas e não lançadas de um bimestre por DIREC (colunas DIREC, Lançadas e Não_Lançadas)."""
+    where, parametros = _where(direc, municipio, escola)
+    sql = f"""
+        SELECT DIREC,
+               CAST(SUM("{bimestre}_Notas Lancadas") AS BIGINT) AS "Lançadas",
+               CAST(SUM("{bimestre}_Notas Nao Lancadas") AS BIGINT) AS "Não_Lançadas"
+        FROM read_parquet(?)
+        {where}
+        GROUP BY DIREC
+        ORDER BY DIREC
+    """
+    return _executar(fonte, sql, [fonte.caminho] + parametros)
+
+
+def totais_por_escola(fonte, direc, municipio, escola):
+    """
+    Totais de notas não lançadas e de registros por escola e bimestre.
+
+    Mesmo formato de consultas.totais_por_escola: uma linha por combinação única de
+    INEP ESCOLA, ESCOLA, DIREC e MUNICÍPIO, com os totais da escola inteira.
+    """
+    where, parametros = _where(direc, municipio, escola)
+    somas = ",\n".join(
+        f"SUM(\"{b}_Notas Nao Lancadas\") AS \"{b}_Nao Lancadas\", "
+        f"SUM(\"{b}_Notas Lancadas\" + \"{b}_Notas Nao Lancadas\") AS \"{b}_Total\""
+        for b in BIMESTRES
+    )
+    colunas_totais = ", ".join(
+        f"CAST(t.\"{b}_{c}\" AS BIGINT) AS \"{b}_{c}\"" for b in BIMESTRES for c in ('Nao Lancadas', 'Total')
+    )
+    sql = f"""
+        WITH filtrado AS (
+            SELECT {_INEP} AS "INEP ESCOLA", {_ESCOLA} AS ESCOLA, DIREC, "MUNICÍPIO",
+                   {', '.join(f'"{c}"' for c in COLUNAS_CONTAGEM)},
+                   file_row_number AS ordem
+            FROM read_parquet(?, file_row_number = true)
+            {where}
+        ),
+        escolas AS (
+            SELECT "INEP ESCOLA", ESCOLA, DIREC, "MUNICÍPIO", MIN(ordem) AS ordem
+            FROM filtrado
+            GROUP BY ALL
+        ),
+        totais AS (
+            SELECT "INEP ESCOLA", {somas}
+            FROM filtrado
+            GROUP BY "INEP ESCOLA"
+        )
+        SELECT e."INEP ESCOLA", e.ESCOLA, e.DIREC, e."MUNICÍPIO", {colunas_totais}
+        FROM escolas e JOIN totais t USING ("INEP ESCOLA")
+        ORDER BY e.ordem
+    """
+    return _executar(fonte, sql, [fonte.caminho] + parametros)
+
+
+def totais_por_entidade(fonte):
+    """
+    Vetor de contagens de cada entidade (estado, DIREC, município e escola).
+
+    Mesmo formato de consultas.totais_por_entidade; os quatro níveis são calculados em uma
+    única leitura do arquivo, com GROUPING SETS.
+    """
+    sql = f"""
+        SELECT CASE WHEN GROUPING(DIREC) = 0 THEN 'DIREC'
+                    WHEN GROUPING("MUNICÍPIO") = 0 THEN 'Município'
+                    WHEN GROUPING(escola_formatada) = 0 THEN 'Escola'
+                    ELSE ? END AS NIVEL,
+               COALESCE(CAST(DIREC AS VARCHAR), CAST("MUNICÍPIO" AS VARCHAR), escola_formatada, ?) AS ENTIDADE,
+               {', '.join(_soma(c) for c in COLUNAS_CONTAGEM)}
+        FROM (SELECT *, {_ESCOLA_FORMATADA} AS escola_formatada FROM read_parquet(?))
+        GROUP BY GROUPING SETS ((), (DIREC), ("MUNICÍPIO"), (escola_formatada))
+    """
+    vetores = _executar(fonte, sql, [ESTADO[0], ESTADO[1], fonte.caminho])
+    return vetores.set_index(['NIVEL', 'ENTIDADE']).sort_index()
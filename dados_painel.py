@@ -0,0 +1,327 @@
+# Camada de dados compartilhada pelas páginas do dashboard
+#
+# O Página_Inicial.py (ponto de entrada) fixa, no início de cada execução, o conjunto de dados
+# publicado (base, índice de busca e totais por entidade; ver publicacao_dados.py) e desenha os
+# filtros no menu lateral. Todas as páginas usam esse mesmo conjunto, já em memória no processo,
+# o mesmo backend de consultas e os mesmos filtros: trocar de página não recarrega nada.
+import atexit
+import os
+import tempfile
+from functools import partial
+
+import streamlit as st
+
+import consultas
+from armazenamento_alunos import ARQUIVO_BASE, ARQUIVO_INDICE, carregar_escola, carregar_indice
+from busca_escolas import escola_por_inep
+from distribuicao_notas import ARQUIVO_DISTRIBUICAO, carregar_distribuicao
+from preaquecimento import ARQUIVO_ACESSOS, CacheVisoes, PreAquecedor, calcular_visao
+from publicacao_dados import ARQUIVO_ESCOLA, MonitorDados, assinatura
+
+
+# DADOS
+# Um único monitor por processo mantém a base carregada (com o índice de busca e os totais por
+# entidade já montados) e publica em segundo plano cada nova versão do df_escola.parquet.
+@st.cache_resource(show_spinner=False)
+def monitor_dados():
+    return MonitorDados(ARQUIVO_ESCOLA).iniciar()
+
+
+def iniciar_execucao():
+    """
+    Fixa o conjunto de dados desta execução.
+
+    É chamado uma vez, no início da execução, para que a execução inteira (e a página aberta)
+    use a mesma versão, mesmo que uma nova seja publicada no meio dela.
+    """
+    st.session_state.conjunto = monitor_dados().atual
+    preaquecedor()
+
+
+def conjunto():
+    """Conjunto de dados da execução (ConjuntoDados: versao, df, indice, vetores e anomalias)."""
+    if 'conjunto' not in st.session_state:
+        iniciar_execucao()
+    return st.session_state.conjunto
+
+
+# BACKEND DE CONSULTAS
+# 'pandas' (padrão) calcula sobre o DataFrame em memória; 'sql' executa as mesmas consultas
+# com DuckDB sobre uma cópia .parquet da versão fixada na execução (selecionar com a variável de
+# ambiente BACKEND_CONSULTAS)
+@st.cache_resource(show_spinner=False)
+def conectar_sql():
+    import consultas_sql
+    return consultas_sql.conectar()
+
+
+@st.cache_resource(show_spinner=False)
+def pasta_versoes_sql():
+    # cópias das versões dos dados consultadas pelo backend SQL (exclusiva do processo)
+    return tempfile.mkdtemp(prefix='painel_sql_')
+
+
+def usa_sql():
+    return os.environ.get('BACKEND_CONSULTAS', 'pandas').lower() == 'sql'
+
+
+def fonte_sql(dados, con, pasta):
+    """FonteSQL da versão `dados` (ConjuntoDados), consultada com a conexão (ou cursor) `con`."""
+    import consultas_sql
+    return consultas_sql.FonteSQL(con, consultas_sql.gravar_versao(dados.df, dados.versao, pasta))
+
+
+def backend_consultas():
+    """Módulo de consultas e a fonte passada a ele (DataFrame no pandas, FonteSQL no SQL)."""
+    if usa_sql():
+        import consultas_sql
+        return consultas_sql, fonte_sql(conjunto(), conectar_sql(), pasta_versoes_sql())
+    return consultas, conjunto().df
+
+
+@st.cache_data(show_spinner=False, ttl=None, max_entries=1)
+def _vetores_entidades_sql(versao_dados):
+    backend, fonte = backend_consultas()
+    return backend.totais_por_entidade(fonte)
+
+
+def vetores_entidades():
+    """Totais de cada entidade (estado, DIREC, município e escola), uma vez por versão dos dados."""
+    backend, _ = backend_consultas()
+    if backend is consultas:
+        return conjunto().vetores  # já montados junto com a publicação da versão
+    return _vetores_entidades_sql(conjunto().versao)
+
+
+# VISÕES DA PÁGINA DE LANÇAMENTO
+# Um cache por processo guarda os totais de cada recorte (ver preaquecimento.py). Uma thread em
+# segundo plano calcula as visões do estado, das DIRECs e dos municípios mais acessados ao subir
+# o servidor e a cada nova versão publicada, dentro de um orçamento de tempo e de memória. As
+# estatísticas de acesso são gravadas periodicamente e ao encerrar o servidor.
+@st.cache_resource(show_spinner=False)
+def preaquecedor():
+    if usa_sql():
+        import consultas_sql
+        con, pasta = conectar_sql(), pasta_versoes_sql()
+        # conexão própria da thread de pré-aquecimento (sobre o mesmo banco em memória), consultando
+        # a cópia da versão que está sendo pré-aquecida
+        calculadora = lambda dados: partial(calcular_visao, consultas_sql, fonte_sql(dados, con.cursor(), pasta))
+    else:
+        calculadora = lambda dados: partial(calcular_visao, consultas, dados.df)
+
+    monitor = monitor_dados()
+    preaquecedor = PreAquecedor(CacheVisoes(arquivo_acessos=ARQUIVO_ACESSOS), calculadora).iniciar()
+    monitor.inscrever(preaquecedor.solicitar)
+    preaquecedor.solicitar(monitor.atual)
+    atexit.register(preaquecedor.parar)
+    return preaquecedor
+
+
+def visao_lancamento(filtros):
+    """Visão do recorte (resumo, tabelas por DIREC e totais por escola), do cache ou calculada agora."""
+    backend, fonte = backend_consultas()
+    return preaquecedor().cache.obter(conjunto().versao, filtros, partial(calcular_visao, backend, fonte))
+
+
+# BASE DE ESTUDANTES
+# (lê somente a faixa de linhas da escola selecionada, via memory-map; usada no detalhamento da
+# página de lançamento). Os caches são chaveados pela versão dos dois arquivos: o índice de uma
+# extração antiga não pode ser aplicado à base regravada.
+def versao_alunos():
+    return assinatura(ARQUIVO_BASE), assinatura(ARQUIVO_INDICE)
+
+@st.cache_data(show_spinner=False, ttl=None, max_entries=1)
+def carregar_indice_alunos(versao_arquivos):
+    return carregar_indice()
+
+@st.cache_data(show_spinner=False, ttl=None, max_entries=50)
+def _alunos_escola(inep, versao_arquivos):
+    return carregar_escola(inep, carregar_indice_alunos(versao_arquivos))
+
+def carregar_alunos_escola(inep):
+    return _alunos_escola(inep, versao_alunos())
+
+
+# DISTRIBUIÇÃO DAS NOTAS
+# (histogramas por escola, série, componente e bimestre; ver distribuicao_notas.py). Lidos uma vez
+# por versão do arquivo e compartilhados pelas sessões: as páginas só filtram e somam.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _distribuicao(versao_arquivo):
+    return carregar_distribuicao()
+
+def distribuicao_notas():
+    """Histogramas das notas da versão atual do arquivo, ou None se ainda não foi gerado."""
+    versao_arquivo = assinatura(ARQUIVO_DISTRIBUICAO)
+    if versao_arquivo is None:
+        return None
+    return _distribuicao(versao_arquivo)
+
+
+# FILTROS
+# Os seletores ficam em um fragmento: escolher a DIREC, o município ou a escola só atualiza as
+# opções dos seletores seguintes (reexecuta apenas o fragmento), e a página inteira é recalculada
+# uma única vez, ao clicar em "Aplicar filtros". Os filtros aplicados (filtro_* no session state)
+# valem para todas as páginas e vão para a URL (?direc=...&municipio=...&inep=...); um link com
+# esses parâmetros já abre a página filtrada.
+
+# Opções dos seletores
+def get_direc_options(_df):
+    return ['Todas'] + sorted(_df['DIREC'].dropna().unique().tolist())
+
+def get_municipio_options(_df, direc):
+    if direc != 'Todas':
+        df_temp = _df[_df['DIREC'] == direc]
+    else:
+        df_temp = _df
+    return ['Todos'] + sorted(df_temp['MUNICÍPIO'].dropna().unique().tolist())
+
+def get_escola_options(_df, direc, municipio):
+    df_temp = _df
+    if direc != 'Todas':
+        df_temp = df_temp[df_temp['DIREC'] == direc]
+    if municipio != 'Todos':
+        df_temp = df_temp[df_temp['MUNICÍPIO'] == municipio]
+    # (ESCOLA_FORMATADA já é criada ao ler a base, em publicacao_dados.ler_df_escola)
+    return ['Todas'] + sorted(df_temp['ESCOLA_FORMATADA'].dropna().unique().tolist())
+
+def filtros_da_url(dados):
+    # Filtros de um link (?direc=...&municipio=...&inep=...); valores desconhecidos são ignorados.
+    # Com o INEP de uma escola, a DIREC e o município são os da própria escola.
+    escola = escola_por_inep(dados.indice, st.query_params.get('inep', ''))
+    if escola is not None:
+        return escola['DIREC'], escola['MUNICÍPIO'], escola['ESCOLA_FORMATADA']
+
+    direc = st.query_params.get('direc', 'Todas')
+    if direc not in get_direc_options(dados.df):
+        direc = 'Todas'
+    municipio = st.query_params.get('municipio', 'Todos')
+    if municipio not in get_municipio_options(dados.df, direc):
+        municipio = 'Todos'
+    return direc, municipio, 'Todas'
+
+def parametros_url(dados, direc, municipio, escola):
+    parametros = {}
+    if direc != 'Todas':
+        parametros['direc'] = direc
+    if municipio != 'Todos':
+        parametros['municipio'] = municipio
+    if escola != 'Todas':
+        parametros['inep'] = dados.df.loc[dados.df['ESCOLA_FORMATADA'] == escola, 'INEP ESCOLA'].iloc[0]
+    return parametros
+
+def inicializar_filtros(dados):
+    # Inicializar session state para filtros se não existir (com os filtros da URL, se houver)
+    # filtro_*: filtros aplicados; selecao_*: escolhas nos seletores, ainda não aplicadas
+    if 'filtro_direc' not in st.session_state:
+        (st.session_state.filtro_direc,
+         st.session_state.filtro_municipio,
+         st.session_state.filtro_escola) = filtros_da_url(dados)
+    # Um recorte que deixou de existir (ex.: após a publicação de uma nova versão) volta para "Todas"
+    if (st.session_state.filtro_direc not in get_direc_options(dados.df)
+            or st.session_state.filtro_municipio not in get_municipio_options(dados.df, st.session_state.filtro_direc)
+            or st.session_state.filtro_escola not in get_escola_options(
+                dados.df, st.session_state.filtro_direc, st.session_state.filtro_municipio)):
+        st.session_state.filtro_direc, st.session_state.filtro_municipio, st.session_state.filtro_escola = (
+            'Todas', 'Todos', 'Todas')
+        for chave in ('selecao_direc', 'selecao_municipio', 'selecao_escola'):
+            st.session_state.pop(chave, None)
+    for chave in ('direc', 'municipio', 'escola'):
+        st.session_state.setdefault(f'selecao_{chave}', st.session_state[f'filtro_{chave}'])
+
+# Resetar os filtros dependentes quando a DIREC ou o município mudam
+def ao_mudar_direc():
+    st.session_state.selecao_municipio = 'Todos'
+    st.session_state.selecao_escola = 'Todas'
+
+def ao_mudar_municipio():
+    st.session_state.selecao_escola = 'Todas'
+
+def aplicar_selecao():
+    st.session_state.filtro_direc = st.session_state.selecao_direc
+    st.session_state.filtro_municipio = st.session_state.selecao_municipio
+    st.session_state.filtro_escola = st.session_state.selecao_escola
+
+# Ir direto para uma escola encontrada na busca (sem passar pela DIREC e pelo município)
+def ir_para_escola(escola):
+    st.session_state.filtro_direc = st.session_state.selecao_direc = escola['DIREC']
+    st.session_state.filtro_municipio = st.session_state.selecao_municipio = escola['MUNICÍPIO']
+    st.session_state.filtro_escola = st.session_state.selecao_escola = escola['ESCOLA_FORMATADA']
+    st.session_state.busca_escola = ''
+
+# Botão para limpar todos os filtros
+def resetar_filtros():
+    st.session_state.filtro_direc = st.session_state.selecao_direc = 'Todas'
+    st.session_state.filtro_municipio = st.session_state.selecao_municipio = 'Todos'
+    st.session_state.filtro_escola = st.session_state.selecao_escola = 'Todas'
+
+@st.fragment
+def seletores_filtros(dados):
+    st.title("Filtros")
+
+    # Buscar a escola pelo nome ou pelo código INEP
+    busca = st.text_input("🔎 Buscar escola (nome ou INEP):", key='busca_escola',
+                          placeholder="Ex.: jose augusto ou 24031348")
+    if busca:
+        resultados = dados.indice.buscar(busca, limite=8)
+        if not resultados:
+            st.caption("Nenhuma escola encontrada.")
+        for escola in resultados:
+            if st.button(escola['ESCOLA_FORMATADA'], key=f"busca_{escola['INEP ESCOLA']}", width='stretch',
+                         on_click=ir_para_escola, args=(escola,)):
+                st.rerun(scope='app')
+
+    # 1. Escolher a DIREC
+    st.selectbox("Selecione a DIREC:", options=get_direc_options(dados.df), key='selecao_direc',
+                 on_change=ao_mudar_direc)
+
+    # 2. Escolher o Município
+    municipio_options = get_municipio_options(dados.df, st.session_state.selecao_direc)
+    st.selectbox("Selecione o Município:", options=municipio_options, key='selecao_municipio',
+                 on_change=ao_mudar_municipio)
+
+    # 3. Escolher a Escola
+    escola_options = get_escola_options(dados.df, st.session_state.selecao_direc, st.session_state.selecao_municipio)
+    st.selectbox("Selecione a Escola:", options=escola_options, key='selecao_escola')
+
+    selecao = (st.session_state.selecao_direc, st.session_state.selecao_municipio, st.session_state.selecao_escola)
+    aplicados = filtros_aplicados()
+    if selecao != aplicados:
+        st.caption("⚠️ Seleção ainda não aplicada.")
+
+    # Só estes botões recalculam a página inteira (os callbacks atualizam o estado antes da
+    # reexecução do fragmento, que então pede a reexecução da página)
+    if st.button("✅ Aplicar filtros", type='primary', disabled=selecao == aplicados, width='stretch',
+                 on_click=aplicar_selecao):
+        st.rerun(scope='app')
+
+    if st.button("🔄 Limpar Todos os Filtros", width='stretch', on_click=resetar_filtros):
+        st.rerun(scope='app')
+
+
+def barra_filtros():
+    """Desenha os filtros no menu lateral e mantém a URL igual aos filtros aplicados."""
+    dados = conjunto()
+    inicializar_filtros(dados)
+
+    with st.sidebar:
+        seletores_filtros(dados)
+
+    # Manter a URL igual aos filtros aplicados (o endereço da página serve como link para esse recorte)
+    parametros = parametros_url(dados, *filtros_aplicados())
+    if st.query_params.to_dict() != parametros:
+        st.query_params.clear()
+        st.query_params.update(parametros)
+
+
+def filtros_aplicados():
+    """(DIREC, município, escola) aplicados, com 'Todas' / 'Todos' quando não há filtro."""
+    return (st.session_state.get('filtro_direc', 'Todas'),
+            st.session_state.get('filtro_municipio', 'Todos'),
+            st.session_state.get('filtro_escola', 'Todas'))
+
+
+def inep_da_escola(escola):
+    """Código INEP a partir do nome formatado ('NOME (cód. Inep: 24000000)'), ou None para 'Todas'."""
+    if escola == 'Todas':
+        return None
+    return escola.rsplit('cód. Inep: ', 1)[-1].rstrip(')')
@@ -0,0 +1,131 @@
+# Deduplicação de registros estudante × componente entre exportações sobrepostas
+#
+# Exportações de DIRECs vizinhas e reexportações da mesma escola repetem registros. Cada linha é
+# identificada por um hash de 64 bits de (CPF, INEP ESCOLA, SÉRIE, COMPONENTE CURRICULAR), e os
+# arquivos são processados do mais recente para o mais antigo: a primeira ocorrência de cada chave
+# (a do arquivo mais recente) é mantida e as demais são descartadas. Linhas sem CPF (vazio, NaN ou
+# só zeros) não identificam o estudante: ficam fora da deduplicação e são sempre mantidas.
+#
+# Os hashes já vistos ficam em um conjunto compacto (arrays uint64 ordenados, 8 bytes por
+# registro), e a deduplicação é feita arquivo a arquivo, sem concatenar nem ordenar a base inteira.
+import numpy as np
+import pandas as pd
+
+COLUNAS_CHAVE = ['CPF PESSOA', 'INEP ESCOLA', 'SÉRIE', 'COMPONENTE CURRICULAR']
+
+
+def _digitos_cpf(cpf):
+    return cpf.astype(str).str.replace(r'\D', '', regex=True).where(cpf.notna(), '')
+
+
+def cpf_identificado(df):
+    """
+    Máscara booleana: quais linhas têm um CPF que identifica o estudante.
+
+    CPFs vazios, NaN/None ou só com zeros não identificam ninguém (várias linhas diferentes teriam
+    a mesma chave) e ficam fora da deduplicação.
+    """
+    return (_digitos_cpf(df['CPF PESSOA']).str.strip('0') != '').to_numpy()
+
+
+def hash_registros(df):
+    """
+    Hash de 64 bits da chave (CPF, INEP ESCOLA, SÉRIE, COMPONENTE CURRICULAR) de cada linha.
+
+    Os valores são normalizados antes do hash (CPF só com dígitos, textos sem espaços nas
+    pontas e SÉRIE em maiúsculas), para que grafias diferentes do mesmo registro coincidam.
+
+    Returns
+    -------
+    numpy.ndarray
+        Hashes em uint64, um por linha.
+    """
+    chave = pd.DataFrame({
+        'CPF PESSOA': _digitos_cpf(df['CPF PESSOA']).str.zfill(11),
+        'INEP ESCOLA': df['INEP ESCOLA'].astype(str).str.strip(),
+        'SÉRIE': df['SÉRIE'].astype(str).str.strip().str.upper(),
+        'COMPONENTE CURRICULAR': df['COMPONENTE CURRICULAR'].astype(str).str.strip()
+    })
+    return pd.util.hash_pandas_object(chave, index=False).to_numpy()
+
+
+class ConjuntoHashes:
+    """
+    Conjunto de hashes uint64 guardado como alguns blocos ordenados.
+
+    Cada inserção cria um bloco novo; blocos de tamanho parecido são intercalados (como um
+    contador binário), de modo que há no máximo ~log2(n) blocos e cada hash é reordenado poucas
+    vezes. A consulta é uma busca binária vetorizada em cada bloco.
+    """
+
+    def __init__(self):
+        self._blocos = []
+
+    def __len__(self):
+        return sum(len(bloco) for bloco in self._blocos)
+
+    @property
+    def nbytes(self):
+        return sum(bloco.nbytes for bloco in self._blocos)
+
+    def contem(self, hashes):
+        """Máscara booleana: quais hashes já estão no conjunto."""
+        hashes = np.asarray(hashes, dtype='uint64')
+        # Buscar com as chaves ordenadas é bem mais rápido (acessos sequenciais à memória)
+        ordem = np.argsort(hashes)
+        ordenados = hashes[ordem]
+
+        presente_ordenados = np.zeros(len(hashes), dtype=bool)
+        for bloco in self._blocos:
+            posicao = np.searchsorted(bloco, ordenados)
+            posicao[posicao == len(bloco)] = len(bloco) - 1
+            presente_ordenados |= bloco[posicao] == ordenados
+
+        presente = np.empty(len(hashes), dtype=bool)
+        presente[ordem] = presente_ordenados
+        return presente
+
+    def adicionar(self, hashes):
+        """Acrescenta hashes que ainda não estão no conjunto (use `contem` antes)."""
+        novo = np.unique(np.asarray(hashes, dtype='uint64'))
+        if len(novo) == 0:
+            return
+        self._blocos.append(novo)
+        while len(self._blocos) > 1 and len(self._blocos[-2]) <= 2 * len(self._blocos[-1]):
+            ultimo = self._blocos.pop()
+            penultimo = self._blocos.pop()
+            # Os blocos são disjuntos e já ordenados: a ordenação estável (timsort) só intercala
+            # as duas sequências, em tempo linear
+            self._blocos.append(np.sort(np.concatenate([penultimo, ultimo]), kind='stable'))
+
+
+class Deduplicador:
+    """
+    Remove, arquivo a arquivo, os registros já vistos em arquivos processados antes.
+
+    Os arquivos devem ser passados do mais recente para o mais antigo, para que seja mantida a
+    versão mais recente de cada registro. Linhas sem CPF (ver `cpf_identificado`) são sempre
+    mantidas.
+    """
+
+    def __init__(self):
+        self.vistos = ConjuntoHashes()
+        self.duplicados_por_arquivo = {}
+        self.sem_cpf_por_arquivo = {}
+
+    def filtrar(self, df, nome_arquivo):
+        """
+        Devolve as linhas de `df` cuja chave ainda não apareceu (nem neste arquivo, nem antes).
+
+        A quantidade de linhas removidas fica em `duplicados_por_arquivo[nome_arquivo]`, e a de
+        linhas sem CPF (mantidas sem deduplicar) em `sem_cpf_por_arquivo[nome_arquivo]`.
+        """
+        identificado = cpf_identificado(df)
+        hashes = hash_registros(df)
+        repetido_no_arquivo = pd.Series(hashes).duplicated().to_numpy()
+        manter = ~identificado | ~(repetido_no_arquivo | self.vistos.contem(hashes))
+
+        self.vistos.adicionar(hashes[manter & identificado])
+        self.duplicados_por_arquivo[nome_arquivo] = int((~manter).sum())
+        self.sem_cpf_por_arquivo[nome_arquivo] = int((~identificado).sum())
+        return df[manter]
@@ -0,0 +1,179 @@
+# Distribuição das notas por escola, série e componente curricular
+#
+# O processamento resume as notas de cada grupo (escola, série, componente e bimestre) em um
+# histograma de faixas fixas de 0 a 10 (LARGURA_FAIXA pontos cada) e na soma das notas. Os
+# histogramas podem ser somados: o de um município, de uma DIREC ou do estado é a soma dos
+# histogramas das escolas, sem voltar às linhas dos estudantes. Assim, a mediana, os quartis, a
+# média e o percentual abaixo da média mínima custam o mesmo em qualquer nível de agregação.
+#
+# A média e o percentual abaixo da média mínima (um limite de faixa) são exatos; a mediana e os
+# quartis são estimados dentro da faixa em que caem (erro menor que a largura da faixa). Notas
+# fora do intervalo de 0 a 10 (apontadas na validação) ficam de fora dos histogramas.
+import os
+
+import numpy as np
+import pandas as pd
+
+from exportacao import gravar_parquet
+
+ARQUIVO_DISTRIBUICAO = os.path.join('dados_tratados', 'distribuicao_notas.parquet')
+
+LARGURA_FAIXA = 0.5
+LIMITES = np.linspace(0, 10, int(10 / LARGURA_FAIXA) + 1)
+COLUNAS_FAIXAS = [f'FAIXA_{i:02d}' for i in range(len(LIMITES) - 1)]
+
+COLUNAS_GRUPO = ['DIREC', 'MUNICÍPIO', 'INEP ESCOLA', 'ESCOLA', 'SÉRIE', 'COMPONENTE CURRICULAR']
+
+# Nota mínima para aprovação (um limite de faixa, ver `faixa_inicial`)
+MEDIA_MINIMA = 6.0
+
+
+def rotulo_faixa(i):
+    """Rótulo da faixa i ('0,0–0,5', ..., '9,5–10,0')."""
+    return f"{LIMITES[i]:.1f}–{LIMITES[i + 1]:.1f}".replace('.', ',')
+
+
+def faixa_inicial(nota):
+    """Índice da faixa que começa em `nota` (ValueError se `nota` não for um limite de faixa)."""
+    faixa = int(round(nota / LARGURA_FAIXA))
+    if not 0 <= faixa < len(LIMITES) or not np.isclose(LIMITES[faixa], nota):
+        raise ValueError(f"{nota} não é um limite de faixa (múltiplo de {LARGURA_FAIXA} entre 0 e 10)")
+    return faixa
+
+
+def histogramas(df, colunas_notas, colunas_grupo=COLUNAS_GRUPO):
+    """
+    Histograma das notas de cada grupo e bimestre, em uma única passada pela base.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Base tratada (uma linha por estudante e componente curricular).
+    colunas_notas : sequence of str
+        Colunas das notas bimestrais.
+    colunas_grupo : sequence of str
+        Colunas que definem o grupo.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por grupo e bimestre (coluna BIMESTRE, com o nome da coluna da nota) com notas
+        lançadas: as contagens de cada faixa (FAIXA_00, ...) e a soma das notas (SOMA).
+    """
+    grupos = df[list(colunas_grupo)].astype(str)
+    codigos, chaves = pd.MultiIndex.from_frame(grupos).factorize()
+    n_faixas = len(COLUNAS_FAIXAS)
+
+    partes = []
+    for coluna in colunas_notas:
+        notas = pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype='float64')
+        validas = (notas >= 0) & (notas <= 10)
+        grupo, nota = codigos[validas], notas[validas]
+        faixa = np.minimum((nota / LARGURA_FAIXA).astype('int64'), n_faixas - 1)
+
+        # Contagem por (grupo, faixa) em uma matriz grupos x faixas
+        contagens = np.bincount(grupo * n_faixas + faixa, minlength=len(chaves) * n_faixas)
+        contagens = contagens.reshape(len(chaves), n_faixas)
+        soma = np.bincount(grupo, weights=nota, minlength=len(chaves))
+
+        com_notas = contagens.sum(axis=1) > 0
+        parte = chaves[com_notas].to_frame(index=False, name=list(colunas_grupo))
+        parte['BIMESTRE'] = coluna
+        parte[COLUNAS_FAIXAS] = contagens[com_notas].astype('uint32')
+        parte['SOMA'] = soma[com_notas]
+        partes.append(parte)
+
+    colunas = list(colunas_grupo) + ['BIMESTRE'] + COLUNAS_FAIXAS + ['SOMA']
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    return pd.concat(partes, ignore_index=True)[colunas]
+
+
+def combinar(df_hist, colunas):
+    """Soma os histogramas dos grupos com os mesmos valores em `colunas` (ex.: por DIREC e bimestre)."""
+    return df_hist.groupby(list(colunas), observed=True, as_index=False)[COLUNAS_FAIXAS + ['SOMA']].sum()
+
+
+def quantis(contagens, q):
+    """
+    Quantil `q` de cada histograma (linhas de `contagens`), com as notas espalhadas por igual
+    dentro de cada faixa. NaN para histogramas vazios.
+    """
+    contagens = np.asarray(contagens, dtype='float64')
+    acumulado = contagens.cumsum(axis=1)
+    total = acumulado[:, -1]
+    alvo = q * total
+
+    # Primeira faixa em que o acumulado alcança o alvo (com alvo 0, a primeira faixa não vazia)
+    faixa = np.minimum((acumulado < np.maximum(alvo, 1e-12)[:, None]).sum(axis=1), contagens.shape[1] - 1)
+    linhas = np.arange(len(contagens))
+    antes = np.where(faixa > 0, acumulado[linhas, faixa - 1], 0.0)
+    na_faixa = contagens[linhas, faixa]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fracao = np.clip((alvo - antes) / na_faixa, 0, 1)
+    valor = LIMITES[faixa] + fracao * LARGURA_FAIXA
+    return np.where(total > 0, valor, np.nan)
+
+
+def estatisticas(df_hist, media_minima=MEDIA_MINIMA):
+    """
+    Notas lançadas, média, quartis e percentual abaixo da média mínima de cada histograma.
+
+    Parameters
+    ----------
+    df_hist : pandas.DataFrame
+        Histogramas (de `histogramas` ou `combinar`).
+    media_minima : float
+        Nota mínima para aprovação; precisa ser um limite de faixa (múltiplo de LARGURA_FAIXA).
+
+    Returns
+    -------
+    pandas.DataFrame
+        As colunas de `df_hist` que não são do histograma, seguidas de Notas Lançadas, Média,
+        1º Quartil, Mediana, 3º Quartil e % Abaixo da Média (arredondados a 1 casa).
+    """
+    faixa_minima = faixa_inicial(media_minima)
+
+    contagens = df_hist[COLUNAS_FAIXAS].to_numpy(dtype='float64')
+    total = contagens.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = df_hist['SOMA'].to_numpy() / total
+        abaixo = contagens[:, :faixa_minima].sum(axis=1) / total * 100
+
+    resultado = df_hist.drop(columns=COLUNAS_FAIXAS + ['SOMA']).reset_index(drop=True)
+    resultado['Notas Lançadas'] = total.astype('int64')
+    resultado['Média'] = np.round(media, 1)
+    for rotulo, q in [('1º Quartil', 0.25), ('Mediana', 0.5), ('3º Quartil', 0.75)]:
+        resultado[rotulo] = np.round(quantis(contagens, q), 1)
+    resultado['% Abaixo da Média'] = np.round(abaixo, 1)
+    return resultado
+
+
+def filtrar(df_hist, direc='Todas', municipio='Todos', inep=None, bimestre=None):
+    """Histogramas do recorte ('Todas' / 'Todos' / None para não filtrar)."""
+    mascara = np.ones(len(df_hist), dtype=bool)
+    if direc != 'Todas':
+        mascara &= (df_hist['DIREC'] == direc).to_numpy()
+    if municipio != 'Todos':
+        mascara &= (df_hist['MUNICÍPIO'] == municipio).to_numpy()
+    if inep:
+        mascara &= (df_hist['INEP ESCOLA'] == str(inep)).to_numpy()
+    if bimestre is not None:
+        mascara &= (df_hist['BIMESTRE'] == bimestre).to_numpy()
+    return df_hist[mascara]
+
+
+def salvar_distribuicao(df_hist, caminho=ARQUIVO_DISTRIBUICAO):
+    """Grava os histogramas (gravação em arquivo temporário e troca de uma vez)."""
+    temporario = caminho + '.tmp'
+    gravar_parquet(df_hist, temporario)
+    os.replace(temporario, caminho)
+    return len(df_hist)
+
+
+def carregar_distribuicao(caminho=ARQUIVO_DISTRIBUICAO):
+    """Lê os histogramas, com as colunas de texto como categorias (cada valor guardado uma vez)."""
+    df_hist = pd.read_parquet(caminho)
+    for coluna in COLUNAS_GRUPO + ['BIMESTRE']:
+        df_hist[coluna] = df_hist[coluna].astype('category')
+    return df_hist
@@ -0,0 +1,117 @@
+# Dados enviados ao navegador a cada execução do dashboard
+#
+# Cada elemento da página (gráfico, tabela, métrica, texto...) chega ao navegador como uma
+# mensagem pelo websocket, a cada execução, e o volume transferido pesa nas conexões lentas das
+# escolas. Este módulo tem:
+#   - a medição: intercepta as mensagens da execução e soma o tamanho de cada uma (em bytes, já
+#     serializada), por tipo de elemento. Ativada com a variável de ambiente MEDIR_ENVIO=1: o
+#     resumo de cada execução vai para o log e para o menu lateral. O benchmark
+#     benchmarks/bench_envio.py usa a mesma medição;
+#   - `tabela_compacta`, o formato em que as tabelas do dashboard são passadas ao st.dataframe.
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def medicao_ativa():
+    return os.environ.get('MEDIR_ENVIO', '') == '1'
+
+
+def tipo_mensagem(msg):
+    """Tipo do elemento enviado ('plotly_chart', 'arrow_data_frame', 'metric'...) ou da mensagem."""
+    tipo = msg.WhichOneof('type')
+    if tipo != 'delta':
+        return tipo
+    tipo_delta = msg.delta.WhichOneof('type')
+    if tipo_delta == 'new_element':
+        return msg.delta.new_element.WhichOneof('type')
+    return tipo_delta
+
+
+class MedicaoEnvio:
+    """Mensagens enviadas em uma execução: lista de (tipo, bytes), na ordem de envio."""
+
+    def __init__(self):
+        self.mensagens = []
+
+    def registrar(self, msg):
+        self.mensagens.append((tipo_mensagem(msg), msg.ByteSize()))
+
+    @property
+    def total(self):
+        return sum(tamanho for _, tamanho in self.mensagens)
+
+    def resumo(self):
+        """
+        Bytes enviados por tipo de elemento.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Tipo, Elementos, Bytes e Maior elemento (bytes), do tipo que mais enviou ao que menos.
+        """
+        df = pd.DataFrame(self.mensagens, columns=['Tipo', 'Bytes'])
+        return (df.groupby('Tipo', as_index=False)
+                .agg(Elementos=('Bytes', 'size'), Bytes=('Bytes', 'sum'), **{'Maior elemento': ('Bytes', 'max')})
+                .sort_values('Bytes', ascending=False, ignore_index=True))
+
+
+def iniciar_medicao():
+    """
+    Passa a medir as mensagens enviadas pela sessão a partir deste ponto da execução.
+
+    Returns
+    -------
+    MedicaoEnvio or None
+        None fora de uma execução do Streamlit.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    # O contexto é o mesmo em todas as execuções da sessão: a função de envio original fica
+    # guardada nele, e cada execução a envolve de novo (sem acumular interceptações)
+    if not hasattr(ctx, '_enviar_sem_medicao'):
+        ctx._enviar_sem_medicao = ctx._enqueue
+    enviar = ctx._enviar_sem_medicao
+    medicao = MedicaoEnvio()
+
+    def enviar_medindo(msg):
+        medicao.registrar(msg)
+        enviar(msg)
+
+    ctx._enqueue = enviar_medindo
+    return medicao
+
+
+def registrar_no_log(medicao, pagina):
+    """Escreve no log o total enviado na execução e os tipos de elemento que mais pesaram."""
+    resumo = medicao.resumo()
+    logger.info("Execução de %s: %.1f kB em %d mensagens; %s", pagina, medicao.total / 1024,
+                len(medicao.mensagens),
+                ', '.join(f"{linha.Tipo} {linha.Bytes / 1024:.1f} kB ({linha.Elementos})"
+                          for linha in resumo.head(5).itertuples()))
+
+
+def tabela_compacta(df):
+    """
+    Tabela para o st.dataframe, em Arrow, sem os metadados do pandas e sem o índice.
+
+    O st.dataframe converte o DataFrame para Arrow com os metadados do pandas (a descrição de cada
+    coluna e do índice, cerca de 1 kB por tabela) e, quando o índice não é o padrão (ex.: depois
+    de ordenar ou filtrar), com o índice como uma coluna a mais, mesmo com `hide_index=True`.
+    Os valores continuam numéricos, formatados na exibição com `column_config`; inteiros que
+    cabem em 32 bits são enviados em 32 bits.
+    """
+    colunas = {}
+    for coluna in df.columns:
+        valores = df[coluna]
+        if (pd.api.types.is_integer_dtype(valores) and len(valores)
+                and valores.min() >= -2**31 and valores.max() < 2**31):
+            valores = valores.astype('int32')
+        colunas[coluna] = valores
+    return pa.Table.from_pandas(pd.DataFrame(colunas), preserve_index=False).replace_schema_metadata(None)
@@ -0,0 +1,119 @@
+# Exportação de tabelas em CSV, Parquet e XLSX
+#
+# As tabelas são gravadas em blocos de linhas, sem montar o arquivo inteiro em uma estrutura
+# intermediária: o CSV é escrito bloco a bloco, o Parquet em row groups e o XLSX com o modo
+# write-only do openpyxl, em que cada linha vai direto para o arquivo (memória constante, ao
+# contrário de DataFrame.to_excel, que monta a planilha inteira em memória antes de gravar).
+#
+# O pyarrow e o openpyxl só são importados ao exportar, para não pesar na abertura do dashboard.
+import io
+import unicodedata
+
+# formato: (tipo MIME, extensão)
+FORMATOS = {
+    'csv': ('text/csv', '.csv'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+}
+
+LINHAS_POR_BLOCO = 50_000
+
+# Limite de linhas de uma planilha do Excel (incluindo o cabeçalho)
+LINHAS_MAXIMAS_XLSX = 1_048_576
+
+
+def nome_arquivo(*partes):
+    """Nome de arquivo (sem extensão) a partir das partes, sem acentos, espaços e pontuação."""
+    texto = unicodedata.normalize('NFKD', '_'.join(map(str, partes))).encode('ascii', 'ignore').decode('ascii')
+    return '_'.join(''.join(c if c.isalnum() else ' ' for c in texto).split())
+
+
+def _blocos(df, linhas_por_bloco=LINHAS_POR_BLOCO):
+    for inicio in range(0, len(df), linhas_por_bloco):
+        yield df.iloc[inicio:inicio + linhas_por_bloco]
+
+
+def gravar_csv(df, destino, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """CSV em UTF-8 com BOM (abre com acentos corretos no Excel), separado por ';'."""
+    abrir = isinstance(destino, str)
+    arquivo = open(destino, 'w', encoding='utf-8-sig', newline='') if abrir else io.TextIOWrapper(
+        destino, encoding='utf-8-sig', newline='', write_through=True)
+    try:
+        arquivo.write(';'.join(map(str, df.columns)) + '\r\n')
+        for bloco in _blocos(df, linhas_por_bloco):
+            bloco.to_csv(arquivo, sep=';', decimal=',', index=False, header=False, lineterminator='\r\n')
+    finally:
+        if abrir:
+            arquivo.close()
+        else:
+            arquivo.detach()  # não fechar o destino recebido
+
+
+def gravar_parquet(df, destino, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Parquet gravado em row groups de `linhas_por_bloco` linhas."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for bloco in _blocos(df, linhas_por_bloco):
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+        if len(df) == 0:
+            escritor.write_table(esquema.empty_table())
+
+
+def gravar_xlsx(df, destino, nome_planilha='Dados', linhas_por_bloco=LINHAS_POR_BLOCO,
+                limite_linhas=LINHAS_MAXIMAS_XLSX):
+    """
+    XLSX gravado com o openpyxl em modo write-only (uso de memória constante).
+
+    Uma planilha do Excel tem no máximo `limite_linhas` linhas: o que passar disso continua em
+    novas abas ('Dados (2)', 'Dados (3)', ...), cada uma com o cabeçalho.
+    """
+    from openpyxl import Workbook
+
+    planilha = Workbook(write_only=True)
+    cabecalho = [str(col) for col in df.columns]
+    aba, linhas_aba = None, limite_linhas
+    for bloco in _blocos(df, linhas_por_bloco):
+        # Células vazias no lugar de NaN/NA (o Excel não tem representação para NaN)
+        bloco = bloco.astype(object).where(bloco.notna(), None)
+        for linha in bloco.itertuples(index=False, name=None):
+            if linhas_aba == limite_linhas:
+                numero = len(planilha.worksheets) + 1
+                aba = planilha.create_sheet(nome_planilha if numero == 1 else f'{nome_planilha} ({numero})')
+                aba.append(cabecalho)
+                linhas_aba = 1
+            aba.append(linha)
+            linhas_aba += 1
+    if aba is None:
+        planilha.create_sheet(nome_planilha).append(cabecalho)
+    planilha.save(destino)
+
+
+_GRAVAR = {'csv': gravar_csv, 'parquet': gravar_parquet, 'xlsx': gravar_xlsx}
+
+
+def gravar(df, destino, formato):
+    """
+    Grava `df` em `destino` (caminho ou arquivo binário aberto) no formato indicado.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Tabela a ser exportada.
+    destino : str or file-like
+        Caminho do arquivo ou objeto binário com `write`.
+    formato : str
+        Um dos formatos em FORMATOS ('csv', 'parquet' ou 'xlsx').
+    """
+    if formato not in _GRAVAR:
+        raise ValueError(f"Formato de exportação desconhecido: {formato!r} (use {', '.join(FORMATOS)})")
+    _GRAVAR[formato](df, destino)
+
+
+def exportar(df, formato):
+    """Conteúdo do arquivo exportado, em bytes (para download)."""
+    buffer = io.BytesIO()
+    gravar(df, buffer, formato)
+    return buffer.getvalue()
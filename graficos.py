@@ -0,0 +1,139 @@
+# Gráficos do dashboard (Plotly)
+#
+# Cada gráfico vai para o navegador como um JSON a cada execução da página. Para enviar menos
+# bytes pelas conexões lentas das escolas:
+#   - os gráficos usam um template próprio e enxuto ('painel'), no lugar do template padrão do
+#     Plotly, que tem cerca de 7 kB e era enviado dentro de cada gráfico;
+#   - os rótulos das barras e as dicas (hover) são definidos uma vez por série, com
+#     `texttemplate`/`hovertemplate` e os totais em `customdata`, em vez de um texto montado
+#     para cada barra;
+#   - o gráfico por DIREC, repetido para os quatro bimestres, é montado por uma única função.
+#
+# Importar este módulo torna o 'painel' o template padrão do processo (também para os gráficos
+# montados direto com plotly.express nas páginas).
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Só o que os gráficos do dashboard usam: com o tema do Streamlit (padrão do st.plotly_chart), as
+# cores de fundo, as fontes e as grades vêm do próprio Streamlit.
+TEMPLATE = go.layout.Template(layout=dict(
+    colorway=pio.templates['plotly'].layout.colorway,
+    margin=dict(t=50, b=50, l=50, r=50),
+    legend_title_text='',
+))
+pio.templates['painel'] = TEMPLATE
+pio.templates.default = 'painel'
+
+CORES_NAO_LANCADAS = ['#ffcccc', '#ff6666', '#ff0000', '#cc0000', '#990000', '#660000']
+CORES_LANCADAS = ['#1b5e20', '#2e7d32', '#388e3c', '#4caf50', '#66bb6a', '#81c784', '#a5d6a7', '#c8e6c9',
+                  '#e8f5e8']  # Tons de verde
+
+
+def grafico_bimestres(df_resumo, coluna, titulo, titulo_eixo_y, cores):
+    """
+    Barras com a quantidade de notas de cada bimestre (uma cor por bimestre).
+
+    Parameters
+    ----------
+    df_resumo : pandas.DataFrame
+        Resultado de `consultas.resumo_lancamento`.
+    coluna : str
+        Coluna exibida ('Notas Lançadas' ou 'Notas Não Lançadas').
+    titulo, titulo_eixo_y : str
+        Título do gráfico e do eixo Y.
+    cores : list of str
+        Cores dos bimestres, em ordem.
+    """
+    fig = px.bar(df_resumo, x='Bimestre', y=coluna, title=titulo, color='Bimestre',
+                 color_discrete_sequence=cores)
+
+    # Ajustar margens para não cortar as barras
+    fig.update_layout(
+        xaxis_title='Bimestre',
+        yaxis_title=titulo_eixo_y,
+        showlegend=False,
+        height=500,
+        yaxis=dict(range=[0, df_resumo[coluna].max() * 1.15]),
+    )
+    fig.update_traces(texttemplate='%{y:d}', textposition='auto', textfont_size=12)
+    return fig
+
+
+def grafico_direc(df_direc, titulo):
+    """
+    Barras empilhadas com o percentual de notas lançadas e não lançadas de cada DIREC.
+
+    Parameters
+    ----------
+    df_direc : pandas.DataFrame
+        Resultado de `consultas.percentuais_direc` (um bimestre).
+    titulo : str
+        Título do gráfico.
+    """
+    # Nomes das DIRECs truncados nos 9 primeiros caracteres (apenas o nº da DIREC)
+    direcs = df_direc['DIREC'].str.slice(0, 9)
+
+    fig = go.Figure()
+    for icone, rotulo, coluna_perc, coluna_total, cor in [
+            ('✅', 'Notas Lançadas', '%_Lançadas', 'Lançadas', '#2e7d32'),
+            ('❌', 'Notas Não Lançadas', '%_Não_Lançadas', 'Não_Lançadas', '#c62828')]:
+        fig.add_trace(go.Bar(
+            name=f'{icone} {rotulo}',
+            x=direcs,
+            y=df_direc[coluna_perc],
+            customdata=df_direc[coluna_total],
+            marker=dict(color=cor),
+            texttemplate='%{y:.1f}%',
+            textposition='inside',
+            hovertemplate=f'<b>%{{x}}</b><br>{rotulo}: %{{y}}%<br>Total: %{{customdata}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title='DIREC',
+        yaxis_title='Percentual (%)',
+        barmode='stack',
+        height=600,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=80, b=100),  # margem inferior maior para caber os nomes inclinados
+    )
+    # Nomes das DIRECs inclinados em 45 graus e eixo Y de 0% a 100%
+    fig.update_xaxes(tickangle=-45)
+    fig.update_yaxes(range=[0, 100])
+    return fig
+
+
+def grafico_distribuicao(contagens, rotulos, faixa_minima, titulo):
+    """
+    Barras com a quantidade de notas em cada faixa (abaixo da média mínima em vermelho).
+
+    Parameters
+    ----------
+    contagens : sequence of int
+        Notas em cada faixa (histograma de `distribuicao_notas`).
+    rotulos : list of str
+        Rótulo de cada faixa.
+    faixa_minima : int
+        Primeira faixa a partir da nota mínima para aprovação (as anteriores ficam em vermelho).
+    titulo : str
+        Título do gráfico.
+    """
+    cores = ['#c62828' if i < faixa_minima else '#2e7d32' for i in range(len(rotulos))]
+
+    fig = go.Figure(go.Bar(
+        x=rotulos,
+        y=list(contagens),
+        marker=dict(color=cores),
+        hovertemplate='Notas de %{x}: %{y}<extra></extra>',
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title='Nota',
+        yaxis_title='Quantidade de Notas',
+        height=400,
+        showlegend=False,
+    )
+    fig.update_xaxes(tickangle=-45)
+    return fig
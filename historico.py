@@ -0,0 +1,193 @@
+# Histórico do lançamento de notas entre extrações do SIGEduc
+#
+# Cada execução do processamento acrescenta uma partição ao histórico, identificada pela data da
+# extração (historico/data_extracao=AAAA-MM-DD/delta.parquet). A partição guarda só as linhas do
+# df_escola que mudaram em relação à extração anterior (e as que deixaram de existir, marcadas em
+# REMOVIDO, com contadores zerados), de modo que um ano de extrações semanais ocupa pouco mais que
+# uma extração completa.
+#
+# A evolução de qualquer recorte (estado, DIREC, município ou escola) é calculada de forma
+# incremental: a diferença de cada linha em relação à sua versão anterior é somada por data e
+# acumulada, sem reconstruir o df_escola de cada extração.
+import glob
+import os
+
+import pandas as pd
+
+from consultas import BIMESTRES, COLUNAS_CONTAGEM, formatar_escola
+
+PASTA_HISTORICO = os.path.join('dados_tratados', 'historico')
+
+COLUNAS_CHAVE = ['DIREC', 'MUNICÍPIO', 'ESCOLA', 'INEP ESCOLA', 'ETAPA_RESUMIDA', 'SÉRIE']
+
+_PREFIXO_PARTICAO = 'data_extracao='
+
+
+def listar_extracoes(pasta=PASTA_HISTORICO):
+    """Datas (AAAA-MM-DD) das extrações gravadas no histórico, em ordem crescente."""
+    particoes = glob.glob(os.path.join(pasta, _PREFIXO_PARTICAO + '*', 'delta.parquet'))
+    return sorted(os.path.basename(os.path.dirname(p))[len(_PREFIXO_PARTICAO):] for p in particoes)
+
+
+def _normalizar(df):
+    df = df[COLUNAS_CHAVE + COLUNAS_CONTAGEM].copy()
+    # Mesmas normalizações feitas em publicacao_dados.ler_df_escola()
+    for col in COLUNAS_CHAVE:
+        df[col] = df[col].astype(str)
+    df['INEP ESCOLA'] = df['INEP ESCOLA'].str.strip()
+    df['ESCOLA'] = df['ESCOLA'].str.strip()
+    for col in COLUNAS_CONTAGEM:
+        df[col] = df[col].astype('int64')
+    return df
+
+
+def carregar_historico(pasta=PASTA_HISTORICO, ate=None):
+    """
+    Lê todas as partições do histórico (deltas), com a coluna DATA_EXTRACAO.
+
+    Parameters
+    ----------
+    ate : str, optional
+        Considera só as extrações anteriores a esta data (exclusive).
+    """
+    partes = []
+    for data in listar_extracoes(pasta):
+        if ate is not None and data >= ate:
+            continue
+        delta = pd.read_parquet(os.path.join(pasta, _PREFIXO_PARTICAO + data, 'delta.parquet'))
+        delta['DATA_EXTRACAO'] = pd.Timestamp(data)
+        partes.append(delta)
+
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_CHAVE + COLUNAS_CONTAGEM + ['REMOVIDO', 'DATA_EXTRACAO'])
+    return pd.concat(partes, ignore_index=True)
+
+
+def estado_atual(historico):
+    """Reconstrói o df_escola da última extração a partir dos deltas."""
+    if historico.empty:
+        return historico[COLUNAS_CHAVE + COLUNAS_CONTAGEM]
+    ultimo = historico.sort_values('DATA_EXTRACAO', kind='stable').drop_duplicates(COLUNAS_CHAVE, keep='last')
+    return ultimo.loc[~ultimo['REMOVIDO'], COLUNAS_CHAVE + COLUNAS_CONTAGEM].reset_index(drop=True)
+
+
+def _delta(atual, anterior):
+    # Linhas de `atual` novas ou com algum contador diferente em relação a `anterior`, e as linhas
+    # de `anterior` que deixaram de existir (contadores zerados e REMOVIDO = True)
+    comparacao = atual.merge(anterior, on=COLUNAS_CHAVE, how='outer', suffixes=('', '_ANTERIOR'), indicator=True)
+
+    novas = comparacao['_merge'] == 'left_only'
+    alteradas = pd.Series(False, index=comparacao.index)
+    for col in COLUNAS_CONTAGEM:
+        alteradas |= comparacao[col] != comparacao[f'{col}_ANTERIOR']
+    alteradas &= comparacao['_merge'] == 'both'
+    removidas = comparacao['_merge'] == 'right_only'
+
+    delta = comparacao.loc[novas | alteradas | removidas, COLUNAS_CHAVE + COLUNAS_CONTAGEM].copy()
+    delta['REMOVIDO'] = removidas[novas | alteradas | removidas].to_numpy()
+    delta.loc[delta['REMOVIDO'], COLUNAS_CONTAGEM] = 0
+    delta[COLUNAS_CONTAGEM] = delta[COLUNAS_CONTAGEM].astype('int64')
+    return delta.reset_index(drop=True)
+
+
+def _gravar_delta(delta, data_extracao, pasta):
+    # Gravar de forma atômica (arquivo temporário + rename)
+    pasta_particao = os.path.join(pasta, _PREFIXO_PARTICAO + data_extracao)
+    os.makedirs(pasta_particao, exist_ok=True)
+    caminho = os.path.join(pasta_particao, 'delta.parquet')
+    delta.to_parquet(caminho + '.tmp', index=False)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def registrar_extracao(df_escola, data_extracao, pasta=PASTA_HISTORICO):
+    """
+    Grava no histórico as linhas do df_escola que mudaram desde a extração anterior.
+
+    Se já existir uma partição com a mesma data, ela é substituída. Se já houver extrações
+    posteriores (extração gravada fora de ordem ou substituída), os deltas delas são refeitos em
+    relação à nova sequência, para que cada delta continue sendo a diferença para a extração
+    imediatamente anterior.
+
+    Parameters
+    ----------
+    df_escola : pandas.DataFrame
+        Resultado do processamento (agregado por escola e série).
+    data_extracao : str
+        Data da extração do SIGEduc (AAAA-MM-DD).
+
+    Returns
+    -------
+    int
+        Quantidade de linhas gravadas no delta.
+    """
+    data_extracao = pd.Timestamp(data_extracao).strftime('%Y-%m-%d')
+    historico = carregar_historico(pasta)
+    anterior = estado_atual(historico[historico['DATA_EXTRACAO'] < pd.Timestamp(data_extracao)])
+    atual = _normalizar(df_escola)
+
+    # Extrações posteriores, reconstruídas antes de qualquer partição ser regravada
+    posteriores = [(data, estado_atual(historico[historico['DATA_EXTRACAO'] <= pd.Timestamp(data)]))
+                   for data in listar_extracoes(pasta) if data > data_extracao]
+
+    delta = _delta(atual, anterior)
+    _gravar_delta(delta, data_extracao, pasta)
+
+    for data, estado in posteriores:
+        _gravar_delta(_delta(estado, atual), data, pasta)
+        atual = estado
+    return len(delta)
+
+
+def preparar_evolucao(historico):
+    """
+    Calcula, para cada linha dos deltas, a diferença em relação à versão anterior da mesma linha.
+
+    O resultado é a base de `evolucao`: somar as diferenças até uma data dá o total naquela data.
+    """
+    if historico.empty:
+        return historico.assign(ESCOLA_FORMATADA=pd.Series(dtype=str))
+
+    historico = historico.sort_values('DATA_EXTRACAO', kind='stable').reset_index(drop=True)
+    anteriores = historico.groupby(COLUNAS_CHAVE, sort=False)[COLUNAS_CONTAGEM].shift(1).fillna(0).astype('int64')
+
+    diferencas = historico[COLUNAS_CHAVE + ['DATA_EXTRACAO']].copy()
+    diferencas[COLUNAS_CONTAGEM] = historico[COLUNAS_CONTAGEM] - anteriores
+    diferencas['ESCOLA_FORMATADA'] = formatar_escola(diferencas['ESCOLA'], diferencas['INEP ESCOLA'])
+    return diferencas
+
+
+def evolucao(diferencas, direc, municipio, escola, datas):
+    """
+    Totais e percentuais de notas lançadas por bimestre em cada extração, para um recorte.
+
+    Parameters
+    ----------
+    diferencas : pandas.DataFrame
+        Resultado de `preparar_evolucao`.
+    direc, municipio, escola : str
+        Mesmos filtros do dashboard ('Todas'/'Todos' para não filtrar).
+    datas : list of str
+        Datas de todas as extrações (para incluir as que não mudaram nesse recorte).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por extração, com os contadores acumulados e '% Lançadas - Nº Bimestre'.
+    """
+    filtro = pd.Series(True, index=diferencas.index)
+    if direc != 'Todas':
+        filtro &= diferencas['DIREC'] == direc
+    if municipio != 'Todos':
+        filtro &= diferencas['MUNICÍPIO'] == municipio
+    if escola != 'Todas':
+        filtro &= diferencas['ESCOLA_FORMATADA'] == escola
+
+    por_data = diferencas[filtro].groupby('DATA_EXTRACAO')[COLUNAS_CONTAGEM].sum()
+    por_data = por_data.reindex(pd.to_datetime(datas), fill_value=0).cumsum()
+    por_data.index.name = 'DATA_EXTRACAO'
+
+    for n, b in enumerate(BIMESTRES, start=1):
+        total = por_data[f'{b}_Notas Lancadas'] + por_data[f'{b}_Notas Nao Lancadas']
+        por_data[f'% Lançadas - {n}º Bimestre'] = (por_data[f'{b}_Notas Lancadas'] / total.where(total > 0) * 100).round(1)
+
+    return por_data.reset_index()
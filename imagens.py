@@ -0,0 +1,51 @@
+# Imagens do dashboard, pré-processadas
+#
+# O logotipo original (images/logos.png, 6539 px de largura) era redimensionado e recodificado
+# pelo st.image em toda abertura de página. O cabeçalho agora usa uma cópia já reduzida para a
+# largura exibida e comprimida (PNG com paleta), que o Streamlit serve sem reprocessar.
+#
+# Uso (regenerar o cabeçalho após trocar o logotipo):
+#     python imagens.py
+import os
+
+from PIL import Image
+
+ARQUIVO_LOGOS = os.path.join('images', 'logos.png')
+ARQUIVO_CABECALHO = os.path.join('images', 'logos_cabecalho.png')
+
+LARGURA_CABECALHO = 1700
+
+
+def preparar_cabecalho(origem=ARQUIVO_LOGOS, destino=ARQUIVO_CABECALHO, largura=LARGURA_CABECALHO):
+    """
+    Reduz a imagem de `origem` para `largura` pixels e grava em `destino` como PNG com paleta.
+
+    Returns
+    -------
+    str
+        Caminho da imagem gerada.
+    """
+    with Image.open(origem) as imagem:
+        altura = round(imagem.height * largura / imagem.width)
+        reduzida = imagem.convert('RGBA').resize((largura, altura), resample=Image.LANCZOS)
+
+    # Paleta de 256 cores (com transparência): o logotipo tem poucas cores e fica bem menor
+    reduzida = reduzida.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+
+    temporario = destino + '.tmp'
+    reduzida.save(temporario, format='PNG', optimize=True)
+    os.replace(temporario, destino)
+    return destino
+
+
+def caminho_cabecalho():
+    """Caminho da imagem do cabeçalho, gerando-a se não existir ou se o logotipo for mais novo."""
+    if (not os.path.exists(ARQUIVO_CABECALHO)
+            or os.path.getmtime(ARQUIVO_CABECALHO) < os.path.getmtime(ARQUIVO_LOGOS)):
+        preparar_cabecalho()
+    return ARQUIVO_CABECALHO
+
+
+if __name__ == '__main__':
+    caminho = preparar_cabecalho()
+    print(f"{caminho}: {os.path.getsize(caminho) / 1024:.0f} KB")
@@ -0,0 +1,172 @@
+# Instrumentação das etapas do processamento
+#
+# Cada etapa é medida com `medir_etapa`: tempo, linhas de entrada e de saída, linhas por segundo,
+# bytes lidos do disco, pico de memória (RSS, incluindo processos filhos), linhas descartadas por
+# cada filtro e avisos (warnings) emitidos. Ao final, o relatório é gravado em JSON ao lado das
+# saídas, para acompanhar o desempenho do processamento entre uma extração e outra.
+import json
+import os
+import platform
+import threading
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import psutil
+
+# Avisos conhecidos, que não são contados no relatório nem impressos: (mensagem, categoria).
+# O do openpyxl é emitido para toda planilha exportada pelo SIGEduc (sem estilo padrão).
+AVISOS_IGNORADOS = [('Workbook contains no default style', UserWarning)]
+
+
+def ignorar_avisos_conhecidos():
+    """Acrescenta aos filtros de avisos os de AVISOS_IGNORADOS (com prioridade sobre os demais)."""
+    for mensagem, categoria in AVISOS_IGNORADOS:
+        warnings.filterwarnings('ignore', message=mensagem, category=categoria)
+
+
+class MonitorMemoria:
+    """Amostra o RSS do processo (e dos processos filhos) em segundo plano e guarda o pico."""
+
+    def __init__(self, intervalo=0.05):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._processo = psutil.Process()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+
+    def _rss_atual(self):
+        total = self._processo.memory_info().rss
+        for filho in self._processo.children(recursive=True):
+            try:
+                total += filho.memory_info().rss
+            except psutil.Error:
+                pass  # o processo filho terminou durante a leitura
+        return total
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self.pico = max(self.pico, self._rss_atual())
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        self.pico = self._rss_atual()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, self._rss_atual())
+
+
+class MedicaoEtapa:
+    """Contadores de uma etapa, preenchidos pela própria etapa durante a execução."""
+
+    def __init__(self, etapa, status='executada'):
+        self.etapa = etapa
+        self.status = status
+        self.tempo_s = 0.0
+        self.linhas_entrada = 0
+        self.linhas_saida = 0
+        self.bytes_lidos = 0
+        self.pico_rss = 0
+        self.descartes = {}
+        self.detalhes = {}
+        self.avisos = Counter()
+
+    def entrada(self, linhas):
+        self.linhas_entrada += int(linhas)
+
+    def saida(self, linhas):
+        self.linhas_saida += int(linhas)
+
+    def leitura(self, caminhos):
+        """Soma o tamanho dos arquivos lidos pela etapa."""
+        if isinstance(caminhos, (str, os.PathLike)):
+            caminhos = [caminhos]
+        self.bytes_lidos += sum(os.path.getsize(c) for c in caminhos)
+
+    def descarte(self, filtro, linhas):
+        """Registra quantas linhas um filtro removeu."""
+        self.descartes[filtro] = self.descartes.get(filtro, 0) + int(linhas)
+
+    def detalhe(self, nome, valor):
+        """Guarda uma informação adicional da etapa (precisa ser serializável em JSON)."""
+        self.detalhes[nome] = valor
+
+    def como_dict(self):
+        return {
+            'etapa': self.etapa,
+            'status': self.status,
+            'tempo_s': round(self.tempo_s, 3),
+            'linhas_entrada': self.linhas_entrada,
+            'linhas_saida': self.linhas_saida,
+            'linhas_por_s': round(self.linhas_entrada / self.tempo_s, 1) if self.tempo_s > 0 else None,
+            'bytes_lidos': self.bytes_lidos,
+            'pico_rss_mb': round(self.pico_rss / 1024 ** 2, 1),
+            'descartes': self.descartes,
+            'detalhes': self.detalhes,
+            'avisos': dict(self.avisos),
+        }
+
+
+class RelatorioExecucao:
+    """Relatório de uma execução do processamento (uma entrada por etapa)."""
+
+    def __init__(self, parametros=None):
+        self.inicio = datetime.now()
+        self.parametros = parametros or {}
+        self.etapas = []
+        self.status = 'em andamento'
+
+    def pular(self, etapa, motivo):
+        """Registra uma etapa que não foi executada (resultado lido do checkpoint)."""
+        self.etapas.append(MedicaoEtapa(etapa, status=motivo))
+
+    def como_dict(self):
+        fim = datetime.now()
+        return {
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'fim': fim.isoformat(timespec='seconds'),
+            'duracao_s': round((fim - self.inicio).total_seconds(), 3),
+            'status': self.status,
+            'python': platform.python_version(),
+            'parametros': self.parametros,
+            'etapas': [m.como_dict() for m in self.etapas],
+        }
+
+    def salvar(self, caminho):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with open(caminho, 'w', encoding='utf8') as f:
+            json.dump(self.como_dict(), f, indent=2, ensure_ascii=False)
+
+
+@contextmanager
+def medir_etapa(relatorio, etapa):
+    """
+    Mede uma etapa e acrescenta o resultado ao relatório (também quando a etapa falha).
+
+    Os avisos emitidos durante a etapa não são impressos: são contados no relatório, um por
+    mensagem distinta (exceto os de AVISOS_IGNORADOS).
+    """
+    medicao = MedicaoEtapa(etapa)
+    inicio = time.perf_counter()
+    monitor = MonitorMemoria()
+    avisos = []
+    try:
+        with monitor, warnings.catch_warnings(record=True) as avisos:
+            warnings.simplefilter('default')
+            ignorar_avisos_conhecidos()  # o simplefilter acima passaria na frente deles
+            yield medicao
+    except BaseException:
+        medicao.status = 'falhou'
+        raise
+    finally:
+        medicao.tempo_s = time.perf_counter() - inicio
+        medicao.pico_rss = monitor.pico
+        for aviso in avisos:
+            medicao.avisos[f"{aviso.category.__name__}: {aviso.message}"] += 1
+        relatorio.etapas.append(medicao)
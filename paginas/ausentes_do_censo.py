@@ -0,0 +1,76 @@
+# Página: estudantes enviados ao Censo Escolar que não estão no SIGEduc
+import os
+
+import streamlit as st
+
+import dados_painel
+from ausentes_censo import ARQUIVO_AUSENTES, contar_ausentes, pagina_ausentes
+from envio import tabela_compacta
+
+st.title("📋 Estudantes do Censo Escolar ausentes do SIGEduc")
+
+st.markdown("""
+            Estudantes que foram enviados ao **Censo Escolar** e não constam atualmente no **SIGEduc**.
+            Por privacidade, o CPF é exibido parcialmente.
+            """)
+
+if not os.path.exists(ARQUIVO_AUSENTES):
+    st.info("A lista de ausentes ainda não foi gerada. Ela é gravada pelo processamento dos dados "
+            "(`processamento_local.py`), na etapa `export`.")
+    st.stop()
+
+
+# CONSULTAS
+# A filtragem, a busca e a paginação são feitas pelo DuckDB direto no .parquet: só as linhas da
+# página exibida são lidas para a memória e enviadas ao navegador. Os resultados ficam em cache
+# por versão do arquivo.
+versao_ausentes = os.stat(ARQUIVO_AUSENTES).st_mtime_ns
+
+@st.cache_data(show_spinner=False, ttl=None, max_entries=500)
+def contar(versao_ausentes, direc, municipio, inep, busca):
+    return contar_ausentes(dados_painel.conectar_sql(), direc, municipio, inep, busca)
+
+@st.cache_data(show_spinner=False, ttl=None, max_entries=500)
+def buscar_pagina(versao_ausentes, direc, municipio, inep, busca, pagina, tamanho_pagina):
+    return pagina_ausentes(dados_painel.conectar_sql(), direc, municipio, inep, busca, pagina, tamanho_pagina)
+
+
+# FILTROS
+# Os mesmos filtros do menu lateral das outras páginas (dados_painel.py); a escola filtra pelo INEP.
+direc, municipio, escola = dados_painel.filtros_aplicados()
+inep = dados_painel.inep_da_escola(escola)
+
+
+# LISTA PAGINADA
+# Em um fragmento: buscar ou trocar de página só reexecuta a tabela.
+@st.fragment
+def lista_ausentes(direc, municipio, inep):
+    col_busca, col_tamanho = st.columns([3, 1])
+    with col_busca:
+        busca = st.text_input("🔎 Buscar (nome do estudante, escola ou INEP):", key='ausentes_busca')
+    with col_tamanho:
+        tamanho_pagina = st.selectbox("Linhas por página:", options=[25, 50, 100, 200], index=1,
+                                      key='ausentes_tamanho')
+
+    total = contar(versao_ausentes, direc, municipio, inep, busca)
+    paginas = max(1, -(-total // tamanho_pagina))
+
+    col_total, col_pagina = st.columns([3, 1])
+    with col_pagina:
+        pagina = st.number_input(f"Página (de {paginas}):", min_value=1, max_value=paginas, value=1, step=1,
+                                 key=f'ausentes_pagina_{direc}_{municipio}_{inep}_{busca}_{tamanho_pagina}')
+    with col_total:
+        st.metric("Estudantes ausentes no recorte", f"{total:,}".replace(',', '.'))
+
+    if total == 0:
+        st.success("Nenhum estudante ausente encontrado para o recorte selecionado.")
+        return
+
+    st.dataframe(
+        tabela_compacta(buscar_pagina(versao_ausentes, direc, municipio, inep, busca, pagina, tamanho_pagina)),
+        width='stretch',
+        hide_index=True)
+    inicio = (pagina - 1) * tamanho_pagina + 1
+    st.caption(f"Exibindo {inicio}–{min(inicio + tamanho_pagina - 1, total)} de {total}.")
+
+lista_ausentes(direc, municipio, inep)
@@ -0,0 +1,55 @@
+# Página: escolas com percentual de notas não lançadas muito acima do das escolas vizinhas
+import streamlit as st
+
+import dados_painel
+from anomalias_escolas import MINIMO_REFERENCIA, escolas_atipicas
+from consultas import BIMESTRES
+from envio import tabela_compacta
+
+st.title("🚩 Escolas atípicas")
+
+st.markdown(f"""
+            Escolas cujo percentual de notas não lançadas está acima do das **demais escolas do
+            município** (ou da DIREC, e por fim do estado, quando as demais escolas têm menos de
+            {MINIMO_REFERENCIA} registros), mesmo considerando o tamanho da escola: o **Excesso** é
+            quanto o limite inferior do intervalo de confiança de 95% do percentual da escola passa do
+            limite da referência (o seu percentual, ou o limite superior do seu intervalo quando nem o
+            estado tem {MINIMO_REFERENCIA} registros). Escolas com poucos registros têm intervalos
+            largos e só aparecem com uma diferença grande.
+            """)
+
+direc, municipio, escola = dados_painel.filtros_aplicados()
+
+col_bimestre, col_todas = st.columns([3, 1])
+with col_bimestre:
+    n_bimestre = st.selectbox("Bimestre:", options=range(1, len(BIMESTRES) + 1), index=1,
+                              format_func=lambda n: f"{n}º Bimestre", key='atipicas_bimestre')
+with col_todas:
+    st.write("")
+    todas = st.checkbox("Mostrar todas as escolas", key='atipicas_todas')
+
+# A pontuação de todas as escolas é calculada uma vez por versão dos dados, na publicação
+# (publicacao_dados.py); aqui só se filtra o recorte
+df_atipicas = escolas_atipicas(dados_painel.conjunto().anomalias, BIMESTRES[n_bimestre - 1], direc, municipio,
+                               dados_painel.inep_da_escola(escola), somente_atipicas=not todas)
+
+if df_atipicas.empty:
+    st.success("Nenhuma escola atípica nesse bimestre no recorte selecionado.")
+    st.stop()
+
+if not todas:
+    st.caption(f"{len(df_atipicas)} escola(s) atípica(s), da maior para a menor pontuação.")
+
+st.dataframe(
+    tabela_compacta(df_atipicas.drop(columns=['INEP ESCOLA', 'BIMESTRE'])),
+    width='stretch',
+    hide_index=True,
+    column_config={
+        '% Não Lançadas': st.column_config.NumberColumn(format='%.1f %%'),
+        'IC 95% Mín.': st.column_config.NumberColumn(format='%.1f %%'),
+        'IC 95% Máx.': st.column_config.NumberColumn(format='%.1f %%'),
+        '% Referência': st.column_config.NumberColumn(format='%.1f %%'),
+        'Limite da Referência': st.column_config.NumberColumn(format='%.1f %%'),
+        'Excesso (p.p.)': st.column_config.NumberColumn(format='%.1f'),
+        'Notas Acima do Esperado': st.column_config.NumberColumn(format='%.0f'),
+    })
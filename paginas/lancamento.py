@@ -0,0 +1,391 @@
+# Página: lançamento de notas
+import streamlit as st
+import pandas as pd
+import os
+import dados_painel
+from consultas import ESTADO, aplicar_filtros, comparar_entidades, percentuais_direc, ranking_escolas, tabela_direc
+from envio import tabela_compacta
+from exportacao import FORMATOS, exportar, nome_arquivo
+from historico import carregar_historico, evolucao, listar_extracoes, preparar_evolucao
+from imagens import caminho_cabecalho
+from armazenamento_alunos import ARQUIVO_BASE, ARQUIVO_INDICE, COLUNAS_NOTAS, resumir_por_turma
+
+# Dados, backend e filtros vêm da camada compartilhada entre as páginas (dados_painel.py): a
+# base já está em memória e os filtros são os do menu lateral, desenhados pelo Página_Inicial.py.
+# A versão dos dados (data de modificação do arquivo) faz parte das chaves de cache dos downloads.
+conjunto = dados_painel.conjunto()
+versao_dados = conjunto.versao
+df = conjunto.df
+backend, fonte = dados_painel.backend_consultas()
+
+selected_direc, selected_municipio, selected_escola_formatada = dados_painel.filtros_aplicados()
+
+# APLICAR TODOS OS FILTROS DE UMA VEZ
+df_filtered = aplicar_filtros(df, selected_direc, selected_municipio, selected_escola_formatada)
+filtros = (selected_direc, selected_municipio, selected_escola_formatada)
+
+
+# DOWNLOADS DAS TABELAS
+# Os arquivos só são gerados quando o usuário clica no botão (em segundo plano, sem recarregar a
+# página) e ficam em cache por versão dos dados, tabela, filtro e formato: a exportação de uma
+# DIREC muito procurada é montada uma única vez e servida a todos os usuários.
+def tabela_direc_exportacao(filtros, bimestre):
+    return tabela_direc(percentuais_direc(backend.totais_por_direc(fonte, *filtros, bimestre=bimestre)))
+
+def tabela_ranking_exportacao(filtros, ordenacao):
+    return ranking_escolas(backend.totais_por_escola(fonte, *filtros), ordenar_por=ordenacao)
+
+@st.cache_data(show_spinner=False, ttl=None, max_entries=200)
+def gerar_download(versao_dados, tabela, parametro, filtros, formato):
+    if tabela == 'direc':
+        df_exportacao = tabela_direc_exportacao(filtros, parametro)
+    else:
+        df_exportacao = tabela_ranking_exportacao(filtros, parametro)
+    return exportar(df_exportacao, formato)
+
+def nome_arquivo_download(nome, filtros):
+    # Nome do arquivo com os filtros aplicados
+    return nome_arquivo(nome, *[f for f in filtros if f not in ('Todas', 'Todos')])
+
+def botoes_download(tabela, parametro, nome):
+    colunas_botoes = st.columns(len(FORMATOS) + 3)
+    for coluna_botao, (formato, (mime, extensao)) in zip(colunas_botoes, FORMATOS.items()):
+        coluna_botao.download_button(
+            f"⬇️ {formato.upper()}",
+            data=lambda formato=formato: gerar_download(versao_dados, tabela, parametro, filtros, formato),
+            file_name=nome_arquivo_download(nome, filtros) + extensao,
+            mime=mime,
+            on_click='ignore',
+            key=f"download_{tabela}_{parametro}_{formato}")
+
+# CABEÇALHO
+# Imagem do cabeçalho: cópia já reduzida e comprimida do logotipo, lida uma vez por processo
+# (o logotipo original tem 6539 px e era redimensionado a cada abertura de página)
+@st.cache_resource(show_spinner=False)
+def imagem_cabecalho():
+    with open(caminho_cabecalho(), 'rb') as f:
+        return f.read()
+
+st.image(imagem_cabecalho(), width=1700)
+
+st.write("")
+
+st.title("📈 Lançamento de Notas")
+
+st.markdown("""
+            Os dados apresentados nessa aplicação são dos estudantes dos **Anos Finais do Ensino Fundamental e do Ensino Médio**, somente para os **componentes curriculares que fazem parte da Base Nacional Comum Curricular (BNCC)**.
+            """)
+
+st.write("")
+
+# Data da última extração: a partição mais recente do histórico (se houver)
+extracoes = listar_extracoes()
+data_ultima_extracao = pd.Timestamp(extracoes[-1]).strftime('%d/%m/%Y') if extracoes else "26/01/2026"
+
+st.markdown(f"""
+            **⏱️ Última atualização**:  dados extraídos do SIGEduc em {data_ultima_extracao}.
+            """)
+
+st.write("")
+
+st.markdown("Utilize os filtros no menu lateral para selecionar DIREC, Município e Escola específicos.")
+
+
+st.write("")
+
+# Análise de Lançamento de Notas
+# Os totais do recorte (resumo por bimestre, tabelas por DIREC e totais por escola) vêm do cache
+# de visões do processo, pré-aquecido em segundo plano para o estado e as DIRECs (ver
+# preaquecimento.py); um recorte que ainda não está no cache é calculado aqui mesmo.
+visao = dados_painel.visao_lancamento(filtros)
+df_resumo = visao.resumo
+
+# NOTAS NÃO LANÇADAS
+# Mostrar métricas detalhadas de notas não lançadas
+st.markdown("**❌ Notas Não Lançadas:**")
+for coluna, linha in zip(st.columns(4), df_resumo.to_dict('records')):
+    with coluna:
+        st.metric(
+            linha['Bimestre'],
+            f"{linha['Notas Não Lançadas']:,}",
+            f"{linha['% Não Lançadas']}% faltantes",
+            delta_color="inverse"
+        )
+
+# Os gráficos só são importados aqui, depois de o cabeçalho e as métricas já terem sido enviados
+# ao navegador (a importação do plotly é a parte mais lenta da primeira abertura da página)
+import plotly.express as px
+from graficos import CORES_LANCADAS, CORES_NAO_LANCADAS, grafico_bimestres, grafico_direc
+
+# Gráfico de notas não lançadas por bimestre (modelos de gráfico em graficos.py)
+st.plotly_chart(
+    grafico_bimestres(df_resumo, 'Notas Não Lançadas', '❌ Quantidade de Notas Não Lançadas por Bimestre',
+                      'Quantidade de Notas Faltantes', CORES_NAO_LANCADAS),
+    width='stretch')
+
+
+# NOTAS LANÇADAS
+st.write("")
+
+# Mostrar métricas detalhadas de notas lançadas
+st.markdown("**✅ Notas Lançadas:**")
+for coluna, linha in zip(st.columns(4), df_resumo.to_dict('records')):
+    with coluna:
+        st.metric(
+            linha['Bimestre'],
+            f"{linha['Notas Lançadas']:,}",
+            f"{linha['% Lançadas']}% lançadas",
+        )
+
+# Gráfico de notas lançadas por bimestre
+st.plotly_chart(
+    grafico_bimestres(df_resumo, 'Notas Lançadas', '✅ Quantidade de Notas Lançadas por Bimestre',
+                      'Quantidade de Notas Lançadas', CORES_LANCADAS),
+    width='stretch')
+
+
+# EVOLUÇÃO DO LANÇAMENTO ENTRE AS EXTRAÇÕES
+# (a lista de extrações é o parâmetro do cache: uma nova extração recalcula as diferenças uma única vez)
+@st.cache_data(show_spinner=False, ttl=None)
+def carregar_evolucao(extracoes):
+    return preparar_evolucao(carregar_historico())
+
+if len(extracoes) >= 2:
+    st.write("")
+    st.markdown(
+        "<p style='font-size:24px; font-weight:bold;'>Evolução do lançamento de notas</p>",
+        unsafe_allow_html=True)
+
+    df_evolucao = evolucao(carregar_evolucao(tuple(extracoes)), *filtros, datas=extracoes)
+    colunas_evolucao = [f'% Lançadas - {n}º Bimestre' for n in range(1, 5)]
+
+    fig_evolucao = px.line(
+        df_evolucao,
+        x='DATA_EXTRACAO',
+        y=colunas_evolucao,
+        markers=True,
+        title='📅 Percentual de Notas Lançadas por Extração do SIGEduc',
+        color_discrete_sequence=['#1b5e20', '#388e3c', '#66bb6a', '#a5d6a7']
+    )
+    fig_evolucao.update_layout(
+        xaxis_title='Data da extração',
+        yaxis_title='Percentual de Notas Lançadas (%)',
+        height=450,
+        yaxis=dict(range=[0, 100])
+    )
+    st.plotly_chart(fig_evolucao, width='stretch')
+
+st.write("")
+st.write("")
+
+# PERCENTUAL DE NOTAS LANÇADAS E NÃO LANÇADAS POR DIREC:
+st.markdown(
+    "<p style='font-size:24px; font-weight:bold;'>Percentual de Notas Lançadas e Não Lançadas por DIREC</p>",
+    unsafe_allow_html=True)
+
+# Um gráfico e uma tabela por bimestre (totais e percentuais por DIREC, em ordem alfabética de
+# DIREC, já calculados na visão do recorte)
+for n, (bimestre, icone) in enumerate(zip(['1B', '2B', '3B', '4B'], ['1️⃣', '2️⃣', '3️⃣', '4️⃣']), start=1):
+    if n > 1:
+        st.write("")
+    st.markdown(f"{icone} _{n}º Bimestre:_")
+
+    df_direc = visao.direc[bimestre]
+    st.plotly_chart(
+        grafico_direc(df_direc, f'{n}º Bimestre: Percentual de Notas Lançadas vs Não Lançadas por DIREC'),
+        width='stretch', key=f"grafico_direc_{bimestre}")
+
+    # Tabela com os dados detalhados (percentuais numéricos, formatados na exibição)
+    with st.expander("📋 Ver Dados Detalhados por DIREC"):
+        st.dataframe(
+            tabela_compacta(tabela_direc(df_direc)),
+            width='stretch',
+            hide_index=True,
+            column_config={
+                'Total de Registros': st.column_config.NumberColumn(format='%d'),
+                'Notas Lançadas': st.column_config.NumberColumn(format='%d'),
+                'Notas Não Lançadas': st.column_config.NumberColumn(format='%d'),
+                '% Lançadas': st.column_config.NumberColumn(format='%.1f %%'),
+                '% Não Lançadas': st.column_config.NumberColumn(format='%.1f %%')
+            })
+
+        # Baixar a tabela completa (gerada só no clique)
+        botoes_download('direc', bimestre, f'notas_por_direc_{n}bim')
+
+
+st.write("")
+st.write("")
+
+# ESCOLAS COM MAIORES PERCENTUAIS DE NOTAS NÃO LANÇADAS
+st.markdown(
+    "<p style='font-size:24px; font-weight:bold;'>Escolas com maiores percentuais de notas não lançadas</p>",
+    unsafe_allow_html=True)
+
+
+# Calcular de forma incremental para evitar sobrecarga
+try:
+    # Totais de notas não lançadas por escola, calculados de uma vez para todas as escolas
+    df_totais_escolas = visao.totais_escolas
+    
+    # Criar duas colunas para os controles
+    col_ordenacao, col_paginacao = st.columns([3, 1])  # 3/4 para ordenação, 1/4 para paginação
+    
+    with col_ordenacao:
+        # Ordenação interativa
+        col_ordenacao = st.selectbox(
+            "Ordenar por:",
+            options=[
+                '% Notas Não Lançadas - 1º Bimestre',
+                '% Notas Não Lançadas - 2º Bimestre', 
+                '% Notas Não Lançadas - 3º Bimestre',
+                '% Notas Não Lançadas - 4º Bimestre'
+            ],
+            index=1
+        )
+
+    with col_paginacao:
+        # Paginação
+        itens_por_pagina = 10
+        total_itens = len(df_totais_escolas)
+        total_paginas = max(1, (total_itens + itens_por_pagina - 1) // itens_por_pagina)
+        
+        # Seletor de página
+        pagina_atual = st.number_input(
+            f'Página (1 a {total_paginas})', 
+            min_value=1, 
+            max_value=total_paginas, 
+            value=1
+        )
+
+    # Calcular índices para paginação
+    inicio_idx = (pagina_atual - 1) * itens_por_pagina
+    fim_idx = min(inicio_idx + itens_por_pagina, total_itens)
+
+    # Só as escolas até o fim da página atual são selecionadas na ordenação (top-k)
+    df_pagina_atual = ranking_escolas(df_totais_escolas, ordenar_por=col_ordenacao, top_k=fim_idx).iloc[inicio_idx:]
+    
+    st.write(f"Mostrando escolas {inicio_idx + 1} a {fim_idx} de {total_itens}")
+    
+    # Mostrar tabela
+    st.dataframe(
+        tabela_compacta(df_pagina_atual),
+        width='stretch',
+        hide_index=True,
+        column_config={col: st.column_config.NumberColumn(format='%.1f %%')
+                       for col in df_pagina_atual.columns if col.startswith('% ')}
+    )
+
+    # Baixar o ranking completo (todas as páginas), na ordenação escolhida
+    st.write(f"Baixar as {total_itens} escolas:")
+    botoes_download('ranking', col_ordenacao, 'ranking_escolas')
+
+except Exception as e:
+    st.error(f"Erro crítico: {e}")
+    st.info("Tente usar filtros mais restritivos para reduzir a quantidade de dados.")
+
+
+# COMPARAÇÃO ENTRE DIRECs, MUNICÍPIOS E ESCOLAS
+# Os totais de cada entidade são calculados uma vez por versão dos dados, na camada compartilhada
+# (no backend pandas, já junto com a publicação da versão); comparar mais uma entidade é só uma
+# consulta pelo índice. A seção é um fragmento: mudar a seleção não recalcula o restante da página.
+def entidades_padrao():
+    # Recorte aplicado nos filtros, comparado com o nível acima (escola x município, etc.)
+    if selected_escola_formatada != 'Todas':
+        return [('Escola', selected_escola_formatada), ('Município', str(df_filtered['MUNICÍPIO'].iloc[0])),
+                ('DIREC', selected_direc if selected_direc != 'Todas' else str(df_filtered['DIREC'].iloc[0]))]
+    if selected_municipio != 'Todos':
+        return [('Município', selected_municipio), ('DIREC', str(df_filtered['DIREC'].iloc[0]))]
+    if selected_direc != 'Todas':
+        return [('DIREC', selected_direc), ESTADO]
+    return [ESTADO]
+
+@st.fragment
+def secao_comparacao():
+    st.markdown(
+        "<p style='font-size:24px; font-weight:bold;'>Comparação entre DIRECs, municípios e escolas</p>",
+        unsafe_allow_html=True)
+
+    vetores = dados_painel.vetores_entidades()
+    rotulos = {f"{nivel}: {entidade}": (nivel, entidade) for nivel, entidade in vetores.index}
+    padrao = [f"{nivel}: {entidade}" for nivel, entidade in entidades_padrao() if (nivel, entidade) in vetores.index]
+
+    selecionadas = st.multiselect(
+        "Entidades comparadas (digite para buscar uma DIREC, município ou escola):",
+        options=list(rotulos),
+        default=padrao,
+        key=f"comparacao_{filtros}")
+
+    if not selecionadas:
+        st.info("Selecione ao menos uma entidade para comparar.")
+        return
+
+    df_comparacao = comparar_entidades(vetores, [rotulos[r] for r in selecionadas])
+    df_comparacao['Entidade'] = selecionadas
+    colunas_perc = [f'% Lançadas - {n}º Bimestre' for n in range(1, 5)]
+
+    df_grafico = df_comparacao.melt(id_vars='Entidade', value_vars=colunas_perc,
+                                    var_name='Bimestre', value_name='% Lançadas')
+    df_grafico['Bimestre'] = df_grafico['Bimestre'].str.replace('% Lançadas - ', '', regex=False)
+
+    fig_comparacao = px.bar(
+        df_grafico,
+        x='Bimestre',
+        y='% Lançadas',
+        color='Entidade',
+        barmode='group',
+        title='⚖️ Percentual de Notas Lançadas por Bimestre'
+    )
+    fig_comparacao.update_traces(texttemplate='%{y}%', textposition='outside')
+    fig_comparacao.update_layout(
+        xaxis_title='',
+        yaxis_title='Percentual de Notas Lançadas (%)',
+        yaxis=dict(range=[0, 110]),
+        legend=dict(orientation='h', yanchor='top', y=-0.15, xanchor='left', x=0),
+        height=500
+    )
+    st.plotly_chart(fig_comparacao, width='stretch')
+
+    st.dataframe(
+        tabela_compacta(df_comparacao.drop(columns='Nível')),
+        width='stretch',
+        hide_index=True,
+        column_config={
+            'Total de Registros': st.column_config.NumberColumn(format='%d'),
+            **{col: st.column_config.NumberColumn(format='%.1f %%') for col in colunas_perc}
+        })
+
+st.write("")
+secao_comparacao()
+
+
+# DETALHAMENTO DA ESCOLA POR TURMA E COMPONENTE
+# (lê da base de estudantes somente a faixa de linhas da escola selecionada, via memory-map)
+
+if selected_escola_formatada != 'Todas' and os.path.exists(ARQUIVO_BASE) and os.path.exists(ARQUIVO_INDICE):
+    st.write("")
+    st.markdown(
+        "<p style='font-size:24px; font-weight:bold;'>Detalhamento da escola por turma e componente curricular</p>",
+        unsafe_allow_html=True)
+
+    bimestre_detalhe = st.selectbox(
+        "Bimestre:",
+        options=COLUNAS_NOTAS,
+        index=1,
+        format_func=lambda coluna: coluna.replace('NOTA ', '').title()
+    )
+
+    inep_selecionado = df_filtered['INEP ESCOLA'].iloc[0]
+    df_alunos_escola = dados_painel.carregar_alunos_escola(inep_selecionado)
+    df_turmas = resumir_por_turma(df_alunos_escola, bimestre_detalhe)
+
+    if df_turmas.empty:
+        st.success("Não há notas pendentes nesse bimestre para a escola selecionada.")
+    else:
+        st.write(f"Turmas e componentes com notas não lançadas: {len(df_turmas)}")
+        st.dataframe(
+            tabela_compacta(df_turmas),
+            width='stretch',
+            hide_index=True,
+            column_config={
+                '% Não Lançadas': st.column_config.NumberColumn(format='%.1f %%')
+            })
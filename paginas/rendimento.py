@@ -0,0 +1,95 @@
+# Página: rendimento (distribuição das notas lançadas) do recorte selecionado
+import streamlit as st
+
+import dados_painel
+from armazenamento_alunos import COLUNAS_NOTAS
+from distribuicao_notas import (COLUNAS_FAIXAS, MEDIA_MINIMA, combinar, estatisticas, faixa_inicial, filtrar,
+                                rotulo_faixa)
+from envio import tabela_compacta
+from graficos import grafico_distribuicao
+
+st.title("📊 Rendimento")
+
+st.markdown(f"""
+            Distribuição das notas já lançadas (média, mediana, quartis e percentual de notas abaixo de
+            **{MEDIA_MINIMA:g}**), por série e componente curricular da BNCC. A mediana e os quartis são
+            estimados a partir das notas agrupadas em faixas de meio ponto.
+            """)
+
+direc, municipio, escola = dados_painel.filtros_aplicados()
+
+df_distribuicao = dados_painel.distribuicao_notas()
+if df_distribuicao is None:
+    st.info("A distribuição das notas ainda não foi gerada. Ela é gravada pelo processamento dos dados "
+            "(`processamento_local.py`), na etapa `export`.")
+    st.stop()
+
+if escola != 'Todas':
+    st.subheader(escola)
+elif municipio != 'Todos':
+    st.subheader(f"{municipio} ({direc})")
+elif direc != 'Todas':
+    st.subheader(direc)
+else:
+    st.subheader("Rio Grande do Norte")
+
+bimestre = st.selectbox(
+    "Bimestre:",
+    options=COLUNAS_NOTAS,
+    format_func=lambda coluna: coluna.replace('NOTA ', '').title(),
+    key='rendimento_bimestre'
+)
+
+# Os histogramas das escolas do recorte são somados: o custo não depende do tamanho do recorte
+df_recorte = filtrar(df_distribuicao, direc, municipio, dados_painel.inep_da_escola(escola), bimestre)
+
+if df_recorte.empty:
+    st.warning("Ainda não há notas lançadas nesse bimestre no recorte selecionado.")
+    st.stop()
+
+formatos = {
+    'Média': st.column_config.NumberColumn(format='%.1f'),
+    '1º Quartil': st.column_config.NumberColumn(format='%.1f'),
+    'Mediana': st.column_config.NumberColumn(format='%.1f'),
+    '3º Quartil': st.column_config.NumberColumn(format='%.1f'),
+    '% Abaixo da Média': st.column_config.NumberColumn(format='%.1f %%')
+}
+
+# Resumo do recorte
+df_total = combinar(df_recorte, ['BIMESTRE'])
+resumo = estatisticas(df_total, MEDIA_MINIMA).iloc[0]
+for coluna, (rotulo, valor) in zip(st.columns(4), [
+        ('📝 Notas Lançadas', f"{resumo['Notas Lançadas']:,}".replace(',', '.')),
+        ('➗ Média', f"{resumo['Média']:.1f}".replace('.', ',')),
+        ('📍 Mediana', f"{resumo['Mediana']:.1f}".replace('.', ',')),
+        (f'🔻 Abaixo de {MEDIA_MINIMA:g}', f"{resumo['% Abaixo da Média']:.1f}%".replace('.', ','))]):
+    with coluna:
+        st.metric(label=rotulo, value=valor)
+
+st.plotly_chart(
+    grafico_distribuicao(df_total[COLUNAS_FAIXAS].iloc[0], [rotulo_faixa(i) for i in range(len(COLUNAS_FAIXAS))],
+                         faixa_inicial(MEDIA_MINIMA), "Distribuição das Notas Lançadas"),
+    width='stretch'
+)
+
+st.subheader("Por série e componente curricular")
+st.dataframe(
+    tabela_compacta(estatisticas(combinar(df_recorte, ['SÉRIE', 'COMPONENTE CURRICULAR']), MEDIA_MINIMA)),
+    width='stretch',
+    hide_index=True,
+    column_config=formatos)
+
+# Sem uma escola selecionada, a comparação entre as unidades do nível seguinte
+if escola == 'Todas':
+    if municipio != 'Todos':
+        titulo, colunas = "Por escola", ['ESCOLA', 'INEP ESCOLA']
+    elif direc != 'Todas':
+        titulo, colunas = "Por município", ['MUNICÍPIO']
+    else:
+        titulo, colunas = "Por DIREC", ['DIREC']
+    st.subheader(titulo)
+    st.dataframe(
+        tabela_compacta(estatisticas(combinar(df_recorte, colunas), MEDIA_MINIMA)),
+        width='stretch',
+        hide_index=True,
+        column_config=formatos)
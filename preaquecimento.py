@@ -0,0 +1,306 @@
+# Cache das visões da página de lançamento, pré-aquecido em segundo plano
+#
+# A "visão" de um recorte (DIREC, município, escola) são os totais que a página de lançamento
+# calcula a cada abertura: o resumo por bimestre, as tabelas por DIREC dos quatro bimestres e os
+# totais por escola do ranking. O cache guarda as visões já calculadas (uma vez por processo,
+# compartilhadas por todas as sessões), com limite de memória e descarte das menos usadas.
+#
+# Ao iniciar o servidor e a cada nova versão publicada dos dados, uma thread em segundo plano
+# calcula as visões mais procuradas: o estado, cada DIREC e, opcionalmente, os municípios, na
+# ordem das estatísticas de acesso (gravadas em disco, para valerem também depois de reiniciar o
+# servidor). O pré-aquecimento para ao atingir o orçamento de tempo ou de memória e nunca bloqueia
+# as sessões: uma visão que ainda não está no cache é calculada pela própria sessão, como antes.
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from consultas import BIMESTRES, percentuais_direc, resumo_lancamento
+
+ARQUIVO_ACESSOS = os.path.join('dados_tratados', 'acessos_visoes.json')
+LIMITE_MEMORIA_CACHE = 256 * 1024**2  # bytes, para todas as visões em cache
+ORCAMENTO_TEMPO = 60.0                # segundos por pré-aquecimento
+ORCAMENTO_MEMORIA = 64 * 1024**2      # bytes ocupados pelas visões pré-aquecidas
+OCUPACAO = 0.25                       # fração do tempo calculando (o resto é pausa, para as sessões)
+INTERVALO_GRAVACAO = 300.0            # segundos entre as gravações das estatísticas de acesso
+
+logger = logging.getLogger(__name__)
+
+# Visão de um recorte: resumo por bimestre, percentuais por DIREC (dict bimestre -> DataFrame)
+# e totais por escola
+VisaoLancamento = namedtuple('VisaoLancamento', ['resumo', 'direc', 'totais_escolas'])
+
+
+def calcular_visao(backend, fonte, filtros):
+    """
+    Calcula a visão de um recorte com um dos backends de consultas.
+
+    Parameters
+    ----------
+    backend : module
+        consultas ou consultas_sql.
+    fonte : pandas.DataFrame or consultas_sql.FonteSQL
+        df_escola (pandas) ou conexão e cópia da versão (SQL).
+    filtros : tuple of str
+        (DIREC, município, escola), com 'Todas' / 'Todos' para não filtrar.
+    """
+    return VisaoLancamento(
+        resumo=resumo_lancamento(backend.totais_bimestres(fonte, *filtros)),
+        direc={b: percentuais_direc(backend.totais_por_direc(fonte, *filtros, bimestre=b)) for b in BIMESTRES},
+        totais_escolas=backend.totais_por_escola(fonte, *filtros))
+
+
+def tamanho_visao(visao):
+    """Memória ocupada pela visão (bytes)."""
+    tabelas = [visao.resumo, visao.totais_escolas, *visao.direc.values()]
+    return int(sum(tabela.memory_usage(deep=True).sum() for tabela in tabelas))
+
+
+class CacheVisoes:
+    """
+    Visões calculadas, por versão dos dados e recorte, com limite de memória.
+
+    Quando o limite é atingido, as visões usadas há mais tempo são descartadas. O cache também
+    conta os acessos de cada recorte, que definem a ordem do pré-aquecimento dos municípios.
+
+    Parameters
+    ----------
+    limite_memoria : int
+        Memória máxima (bytes) ocupada pelas visões.
+    arquivo_acessos : str, optional
+        JSON com as contagens de acesso por recorte, lido ao criar o cache e regravado pelo
+        PreAquecedor (a cada pré-aquecimento, periodicamente e ao encerrar). Sem ele, as contagens
+        valem só enquanto o processo estiver no ar.
+    """
+
+    def __init__(self, limite_memoria=LIMITE_MEMORIA_CACHE, arquivo_acessos=None):
+        self.limite_memoria = limite_memoria
+        self.arquivo_acessos = arquivo_acessos
+        self.memoria = 0
+        self._visoes = OrderedDict()  # (versao, filtros) -> (visao, tamanho), da menos à mais recente
+        self._lock = threading.Lock()
+        self.acessos = Counter()
+        if arquivo_acessos and os.path.exists(arquivo_acessos):
+            try:
+                with open(arquivo_acessos, encoding='utf8') as f:
+                    self.acessos.update({tuple(filtros): n for filtros, n in json.load(f)})
+            except (OSError, ValueError, TypeError) as erro:
+                logger.warning("Estatísticas de acesso em %s ignoradas: %s", arquivo_acessos, erro)
+
+    def __len__(self):
+        return len(self._visoes)
+
+    def __contains__(self, chave):
+        return chave in self._visoes
+
+    def obter(self, versao, filtros, calcular):
+        """
+        Visão do recorte nesta versão, calculada com `calcular(filtros)` se ainda não estiver no cache.
+
+        O cálculo acontece fora do lock: as demais sessões continuam lendo o cache enquanto isso.
+        """
+        chave = (versao, tuple(filtros))
+        with self._lock:
+            self.acessos[chave[1]] += 1
+            if chave in self._visoes:
+                self._visoes.move_to_end(chave)
+                return self._visoes[chave][0]
+        visao = calcular(chave[1])
+        self.guardar(versao, filtros, visao)
+        return visao
+
+    def guardar(self, versao, filtros, visao):
+        """Guarda uma visão, descartando as menos usadas se o limite de memória for ultrapassado."""
+        chave = (versao, tuple(filtros))
+        tamanho = tamanho_visao(visao)
+        with self._lock:
+            if chave in self._visoes:
+                self.memoria -= self._visoes.pop(chave)[1]
+            self._visoes[chave] = (visao, tamanho)
+            self.memoria += tamanho
+            while self.memoria > self.limite_memoria and len(self._visoes) > 1:
+                self.memoria -= self._visoes.popitem(last=False)[1][1]
+
+    def descartar_versoes_antigas(self, versao):
+        """Remove as visões de outras versões dos dados."""
+        with self._lock:
+            for chave in [chave for chave in self._visoes if chave[0] != versao]:
+                self.memoria -= self._visoes.pop(chave)[1]
+
+    def copiar_acessos(self):
+        """Cópia das contagens de acesso (as sessões continuam contando enquanto ela é usada)."""
+        with self._lock:
+            return Counter(self.acessos)
+
+    def gravar_acessos(self):
+        """Grava as contagens de acesso em `arquivo_acessos` (se houver)."""
+        if not self.arquivo_acessos:
+            return
+        acessos = [[list(filtros), n] for filtros, n in self.copiar_acessos().most_common()]
+        temporario = self.arquivo_acessos + '.tmp'
+        try:
+            with open(temporario, 'w', encoding='utf8') as f:
+                json.dump(acessos, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo_acessos)
+        except OSError as erro:
+            logger.warning("Não foi possível gravar as estatísticas de acesso em %s: %s", self.arquivo_acessos, erro)
+
+
+def recortes_para_preaquecer(df, acessos, incluir_municipios=True):
+    """
+    Recortes na ordem do pré-aquecimento: o estado, as DIRECs (das mais às menos acessadas) e,
+    opcionalmente, os municípios (idem). Os demais recortes já acessados vêm por último.
+
+    `acessos` (Counter) não pode mudar durante a chamada: passar uma cópia, como a de
+    `CacheVisoes.copiar_acessos`.
+    """
+    direcs = sorted(df['DIREC'].dropna().astype(str).unique())
+    recortes = [('Todas', 'Todos', 'Todas')]
+    recortes += sorted(((d, 'Todos', 'Todas') for d in direcs), key=lambda r: -acessos[r])
+    if incluir_municipios:
+        pares = df[['DIREC', 'MUNICÍPIO']].dropna().astype(str).drop_duplicates()
+        municipios = [(d, m, 'Todas') for d, m in sorted(zip(pares['DIREC'], pares['MUNICÍPIO']))]
+        recortes += sorted(municipios, key=lambda r: -acessos[r])
+    vistos = set(recortes)
+    recortes += [r for r, _ in acessos.most_common() if r not in vistos]
+    return recortes
+
+
+def preaquecer(cache, versao, df, calcular, orcamento_tempo=ORCAMENTO_TEMPO,
+               orcamento_memoria=ORCAMENTO_MEMORIA, incluir_municipios=True, ocupacao=OCUPACAO, parar=None):
+    """
+    Calcula e guarda no cache as visões mais procuradas de uma versão dos dados.
+
+    Parameters
+    ----------
+    cache : CacheVisoes
+    versao : int
+        Versão dos dados (ver `publicacao_dados.ConjuntoDados`).
+    df : pandas.DataFrame
+        df_escola da versão, de onde vêm as DIRECs e os municípios.
+    calcular : callable
+        `calcular(filtros)` devolve a VisaoLancamento do recorte.
+    orcamento_tempo : float
+        Tempo máximo (s); a visão em cálculo quando o tempo acaba ainda é guardada.
+    orcamento_memoria : int
+        Memória (bytes) das visões pré-aquecidas a partir da qual o pré-aquecimento para.
+    incluir_municipios : bool
+        Pré-aquecer também os municípios (senão, só o estado e as DIRECs).
+    ocupacao : float
+        Fração do tempo (0 a 1] gasta calculando. Depois de cada visão há uma pausa proporcional
+        ao tempo do cálculo, para que as sessões em andamento não disputem o processador (e o GIL)
+        com o pré-aquecimento.
+    parar : threading.Event, optional
+        Interrompe o pré-aquecimento (ex.: ao publicar outra versão no meio dele).
+
+    Returns
+    -------
+    dict
+        Visões calculadas, já em cache, memória ocupada (bytes), tempo (s) e se o orçamento acabou.
+    """
+    inicio = time.perf_counter()
+    parar = parar or threading.Event()
+    cache.descartar_versoes_antigas(versao)
+    resultado = {'calculadas': 0, 'em_cache': 0, 'memoria': 0, 'tempo': 0.0, 'orcamento_esgotado': False}
+
+    for filtros in recortes_para_preaquecer(df, cache.copiar_acessos(), incluir_municipios):
+        if parar.is_set():
+            break
+        if (time.perf_counter() - inicio > orcamento_tempo
+                or resultado['memoria'] >= min(orcamento_memoria, cache.limite_memoria)):
+            resultado['orcamento_esgotado'] = True
+            break
+        if (versao, filtros) in cache:
+            resultado['em_cache'] += 1
+            continue
+        inicio_visao = time.perf_counter()
+        visao = calcular(filtros)
+        cache.guardar(versao, filtros, visao)
+        resultado['calculadas'] += 1
+        resultado['memoria'] += tamanho_visao(visao)
+        parar.wait((time.perf_counter() - inicio_visao) * (1 - ocupacao) / ocupacao)
+
+    resultado['tempo'] = time.perf_counter() - inicio
+    return resultado
+
+
+class PreAquecedor:
+    """
+    Thread em segundo plano que pré-aquece o cache a cada versão dos dados solicitada.
+
+    A mesma thread grava as estatísticas de acesso do cache depois de cada pré-aquecimento, a cada
+    `intervalo_gravacao` segundos e ao ser encerrada (`parar`).
+
+    Parameters
+    ----------
+    cache : CacheVisoes
+    calculadora : callable
+        `calculadora(conjunto)` devolve a função `calcular(filtros)` para aquela versão dos dados
+        (com o backend de consultas em uso).
+    orcamento_tempo, orcamento_memoria, incluir_municipios, ocupacao
+        Ver `preaquecer`.
+    intervalo_gravacao : float
+        Segundos entre as gravações periódicas das estatísticas de acesso.
+    """
+
+    def __init__(self, cache, calculadora, orcamento_tempo=ORCAMENTO_TEMPO,
+                 orcamento_memoria=ORCAMENTO_MEMORIA, incluir_municipios=True, ocupacao=OCUPACAO,
+                 intervalo_gravacao=INTERVALO_GRAVACAO):
+        self.cache = cache
+        self.calculadora = calculadora
+        self.orcamento_tempo = orcamento_tempo
+        self.orcamento_memoria = orcamento_memoria
+        self.incluir_municipios = incluir_municipios
+        self.ocupacao = ocupacao
+        self.intervalo_gravacao = intervalo_gravacao
+        self.ultimo_resultado = None
+        self._pendente = None
+        self._novo = threading.Event()     # há uma versão esperando o pré-aquecimento
+        self._parar = threading.Event()    # interrompe o pré-aquecimento em andamento
+        self._encerrar = False
+        self._thread = None
+
+    def solicitar(self, conjunto):
+        """Agenda o pré-aquecimento de uma versão (interrompendo o de uma versão anterior)."""
+        self._pendente = conjunto
+        self._parar.set()
+        self._novo.set()
+
+    def _executar(self):
+        while True:
+            if not self._novo.wait(self.intervalo_gravacao):
+                self.cache.gravar_acessos()
+                continue
+            if self._encerrar:
+                return
+            self._novo.clear()
+            self._parar.clear()
+            conjunto = self._pendente
+            try:
+                self.ultimo_resultado = preaquecer(
+                    self.cache, conjunto.versao, conjunto.df, self.calculadora(conjunto),
+                    self.orcamento_tempo, self.orcamento_memoria, self.incluir_municipios, self.ocupacao,
+                    self._parar)
+                logger.info("Pré-aquecimento da versão %s: %s", conjunto.versao, self.ultimo_resultado)
+            except Exception:
+                logger.exception("Falha no pré-aquecimento da versão %s", conjunto.versao)
+            self.cache.gravar_acessos()
+
+    def iniciar(self):
+        """Inicia a thread de pré-aquecimento (daemon)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='preaquecimento', daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        """Interrompe o pré-aquecimento, encerra a thread e grava as estatísticas de acesso."""
+        self._encerrar = True
+        self._parar.set()
+        self._novo.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.cache.gravar_acessos()
@@ -1,67 +1,209 @@
 # Importação das bibliotecas
 import pandas as pd
+import argparse
 import glob
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from tqdm import tqdm  # Para barra de progresso
 import numpy as np
-import warnings
-warnings.filterwarnings('ignore')
+from armazenamento_alunos import COLUNAS_NOTAS as COLUNAS_BIMESTRES, salvar_base_alunos
+from ausentes_censo import salvar_ausentes
+from distribuicao_notas import histogramas, salvar_distribuicao
+from deduplicacao import Deduplicador
+from exportacao import FORMATOS, gravar
+from historico import registrar_extracao
+from instrumentacao import MedicaoEtapa, RelatorioExecucao, ignorar_avisos_conhecidos, medir_etapa
+from validacao import COLUNAS_NOTAS, SERIES_RECONHECIDAS, contagens, salvar_validacao, validar
+
+# Só os avisos conhecidos (como o do openpyxl, emitido para toda planilha exportada pelo SIGEduc)
+# são silenciados; os demais ficam registrados no relatório de execução
+ignorar_avisos_conhecidos()
+
+# Caminhos padrão (podem ser trocados pela linha de comando)
+PASTA_NOTAS_PADRAO = r"C:\Users\hugob\Downloads\Notas"
+ARQUIVO_CENSO_PADRAO = r"C:\Users\hugob\Downloads\DADOS EDUCACENSO FINAL_RETIFICADO.xlsx"
+PASTA_SAIDA_PADRAO = "dados_tratados"
+
+# Etapas do processamento, na ordem em que são executadas.
+# Cada etapa grava um checkpoint; uma nova execução pula as etapas já concluídas cujas entradas
+# não mudaram (ou as que ficaram fora de --from-stage/--only) e lê o resultado do checkpoint.
+ETAPAS = ['ingest', 'clean', 'censo-join', 'aggregate', 'export']
+
+# Aumentar quando a lógica de alguma etapa mudar, para invalidar os checkpoints antigos
+VERSAO_CHECKPOINTS = 5
+
+COLUNAS_EXCLUIDAS = ['ID DIREC', 'ID MUNICÍPIO', 'ID ESCOLA', 'ID ETAPA ENSINO', 'PERIODICIDADE ETAPA ENSINO', 'ID SÉRIE', 'ID TURMA', 'TURNO', 'ID PESSOA (PROFESSOR)', 'MATRICULA (PROFESSOR)', 'VÍNCULO', 'NOME DO PROFESSOR', 'DATA INÍCIO ALOCAÇÃO', 'DATA FIM ALOCAÇÃO', 'ID COMPONENTE CURRICULAR', 'PERIODICIDADE COMPONENTE CURRICULAR', 'ID PESSOA', 'MATRÍCULA ESTUDANTE', 'RESULTADO FINAL', 'APROVEITAMENTO DE ESTUDO']
+
+
+# Otimizar o DataFrame para reduzir uso de memória
+# Função otimizada para reduzir o uso de memória, com tratamento de erros
+def otimizar_tipos(df):
+    """
+    Função para otimizar tipos de colunas de um DataFrame.
+    
+    Procura por colunas de tipo inteiro e float, e as converte para tipos mais eficientes.
+    
+    Também procura por colunas de tipo string e as converte para tipo category, se houver
+    pelo menos 50% de valores únicos.
+    
+    Caso encontre algum erro durante a conversão, mantém o tipo original da coluna.
+    
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame a ser otimizado.
+    
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame com tipos de colunas otimizados.
+    """
+    df_otimizado = df.copy()
+    
+    # Inteiros - com verificações extras
+    int_cols = df.select_dtypes(include=['int']).columns
+    for col in int_cols:
+        try:
+            if df[col].min() >= 0:  # Só positivos
+                if df[col].max() < 256:  # 0-255
+                    df_otimizado[col] = df[col].astype('uint8')
+                elif df[col].max() < 65536:  # 0-65535
+                    df_otimizado[col] = df[col].astype('uint16')
+                elif df[col].max() < 4294967296:  # 0-4294967295
+                    df_otimizado[col] = df[col].astype('uint32')
+                else:
+                    df_otimizado[col] = df[col].astype('uint64')  # Para valores muito grandes
+            else:  # Com negativos
+                if df[col].min() >= -128 and df[col].max() < 128:
+                    df_otimizado[col] = df[col].astype('int8')
+                elif df[col].min() >= -32768 and df[col].max() < 32768:
+                    df_otimizado[col] = df[col].astype('int16')
+                elif df[col].min() >= -2147483648 and df[col].max() < 2147483648:
+                    df_otimizado[col] = df[col].astype('int32')
+                else:
+                    df_otimizado[col] = df[col].astype('int64')  # Mantém original
+                    
+        except (ValueError, TypeError) as e:
+            print(f"⚠️  Erro na coluna {col}: {e}. Mantendo tipo original.")
+            df_otimizado[col] = df[col]  # Mantém original em caso de erro
+    
+    # Floats (seguro)
+    float_cols = df.select_dtypes(include=['float']).columns
+    for col in float_cols:
+        df_otimizado[col] = df[col].astype('float32')
+    
+    # Strings → categoria (com threshold ajustável)
+    string_cols = df.select_dtypes(include=['object']).columns
+    for col in string_cols:
+        if df[col].nunique() / len(df) < 0.5:  # Mais conservador: 50% únicos
+            try:
+                df_otimizado[col] = df[col].astype('category')
+            except Exception as e:
+                print(f"⚠️  Erro convertendo {col} para category: {e}")
+    
+    return df_otimizado
 
-def processar_dados_brutos():
-    # caminho da pasta onde estão os arquivos
-    pasta = r"C:\Users\hugob\Downloads\Notas"
 
-    # lista todos os arquivos .xlsx da pasta
-    arquivos = glob.glob(os.path.join(pasta, "*.xlsx"))
+def texto_misto_para_str(df):
+    """
+    Converte para texto as colunas com valores de tipos misturados (ex.: números e textos na
+    mesma coluna do Excel), mantendo os valores vazios.
 
-    # lista para armazenar os dataframes
-    dfs = []
+    Assim o DataFrame pode ser gravado em .parquet (checkpoint), e o resultado das etapas é o
+    mesmo lendo do checkpoint ou direto da memória.
+    """
+    for col in df.select_dtypes(include=['object']).columns:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
 
-    for arquivo in tqdm(arquivos, desc="Processando arquivos"):
-        # lê cada arquivo, pulando as 2 primeiras linhas
-        df_unico = pd.read_excel(arquivo, skiprows=2)
-        dfs.append(df_unico)
+
+def ler_arquivo(arquivo):
+    # lê cada arquivo, pulando as 2 primeiras linhas
+    return pd.read_excel(arquivo, skiprows=2)
+
+
+def etapa_ingest(arquivos, workers=1, medicao=None):
+    """
+    Lê os arquivos .xlsx exportados do SIGEduc (em paralelo se workers > 1), removendo os registros
+    repetidos entre exportações sobrepostas, e concatena o resultado.
+
+    Os arquivos são lidos do mais recente para o mais antigo (data de modificação), e de cada
+    registro estudante × componente é mantida a versão do arquivo mais recente.
+    """
+    medicao = medicao or MedicaoEtapa('ingest')
+    medicao.leitura(arquivos)
+
+    # do mais recente para o mais antigo
+    arquivos = sorted(arquivos, key=os.path.getmtime, reverse=True)
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        leituras = executor.map(ler_arquivo, arquivos)
+    else:
+        executor = None
+        leituras = map(ler_arquivo, arquivos)
+
+    # Deduplicar cada arquivo assim que é lido, antes de concatenar
+    deduplicador = Deduplicador()
+    dfs = []
+    try:
+        for arquivo, df_unico in tqdm(zip(arquivos, leituras), total=len(arquivos), desc="Processando arquivos"):
+            medicao.entrada(len(df_unico))
+            dfs.append(deduplicador.filtrar(df_unico, os.path.basename(arquivo)))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    medicao.descarte('duplicados', sum(deduplicador.duplicados_por_arquivo.values()))
+    medicao.detalhe('duplicados_por_arquivo', deduplicador.duplicados_por_arquivo)
+    medicao.detalhe('sem_cpf_mantidos', sum(deduplicador.sem_cpf_por_arquivo.values()))
+    medicao.detalhe('hashes_deduplicacao_mb', round(deduplicador.vistos.nbytes / 1024 ** 2, 2))
 
     # concatena todos em um único dataframe
     df = pd.concat(dfs, ignore_index=True)
+    medicao.saida(len(df))
+    return {'df': texto_misto_para_str(df)}
+
 
+def etapa_clean(df, medicao=None, caminho_validacao=None):
+    """
+    Converte as notas, filtra séries e componentes da BNCC e cria as colunas derivadas.
+
+    Na mesma passada, valida a base lida (regras em validacao.py) e, se `caminho_validacao` for
+    informado, grava nele as violações encontradas.
+    """
+    medicao = medicao or MedicaoEtapa('clean')
+    medicao.entrada(len(df))
 
     # Excluir colunas que não são de interesse
-    df = df.drop(columns=['ID DIREC', 'ID MUNICÍPIO', 'ID ESCOLA', 'ID ETAPA ENSINO', 'PERIODICIDADE ETAPA ENSINO', 'ID SÉRIE', 'ID TURMA', 'TURMA', 'TURNO', 'ID PESSOA (PROFESSOR)', 'MATRICULA (PROFESSOR)', 'VÍNCULO', 'NOME DO PROFESSOR', 'DATA INÍCIO ALOCAÇÃO', 'DATA FIM ALOCAÇÃO', 'ID COMPONENTE CURRICULAR', 'PERIODICIDADE COMPONENTE CURRICULAR', 'ID PESSOA', 'MATRÍCULA ESTUDANTE', 'RESULTADO FINAL', 'APROVEITAMENTO DE ESTUDO'])
+    # (a TURMA é mantida para o detalhamento por escola no dashboard)
+    df = df.drop(columns=COLUNAS_EXCLUIDAS, errors='ignore')
 
     # Substituir vírgula por ponto para reconhecimento das notas como números:
-    colunas_para_converter = [
-        "NOTA 1º BIMESTRE",
-        "NOTA 2º BIMESTRE",
-        "NOTA 3º BIMESTRE",
-        "NOTA 4º BIMESTRE",
-        "MÉDIA ANUAL",
-        "EXAME FINAL",
-        "AVALIAÇÃO ESPECIAL",
-        "MÉDIA FINAL"
-    ] 
+    colunas_para_converter = COLUNAS_NOTAS
 
+    convertidas = {}
     for col in colunas_para_converter:
         if col in df.columns:  # só executa se a coluna estiver no DataFrame
-            # Substitui vírgula por ponto
-            df[col] = df[col].str.replace(",", ".")
-            # Converte para float, erros viram NaN
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+            # Substitui vírgula por ponto e converte para float, erros viram NaN
+            convertidas[col] = pd.to_numeric(df[col].str.replace(",", "."), errors="coerce")
+
+    # Validar a base como foi lida, aproveitando as notas já convertidas (sem reler os arquivos)
+    validacao = validar(df, convertidas)
+    medicao.detalhe('validacao', contagens(validacao))
+    if caminho_validacao:
+        salvar_validacao(validacao, caminho_validacao)
+
+    df = df.assign(**convertidas)
 
     # Manter só Anos Finais e Ensino Médio:
-    valores_desejados = ['1ª SÉRIE',
-                        '2ª SÉRIE',
-                        '3ª SÉRIE',
-                        '6º Ano',
-                        '7º Ano',
-                        '8º Ano',
-                        '9º Ano',
-                        '6º ANO',
-                        '7º ANO',
-                        '8º ANO',
-                        '9º ANO']
+    valores_desejados = SERIES_RECONHECIDAS
 
     df_EF_EM = df[df['SÉRIE'].isin(valores_desejados)]
+    medicao.descarte('série', len(df) - len(df_EF_EM))
 
     # substituição das séries e manter padronização
     mapeamento = {
@@ -90,6 +232,7 @@ def processar_dados_brutos():
             'Ciências']
     
     df_EF_EM_bncc = df_EF_EM[df_EF_EM['COMPONENTE CURRICULAR'].isin(bncc)]
+    medicao.descarte('bncc', len(df_EF_EM) - len(df_EF_EM_bncc))
 
     # Criar coluna de "ETAPA_RESUMIDA" para indicar Anos Finais ou Ensino Médio, de acordo com a série
     # (São 46 etapas de ensino na base já filtrada pelas séries dos Anos Finais e Ensino Médio e pelos componentes da BNCC)
@@ -128,98 +271,51 @@ def processar_dados_brutos():
         )
     )
 
-    # Otimizar o DataFrame para reduzir uso de memória
-    # Função otimizada para reduzir o uso de memória, com tratamento de erros
-    def otimizar_tipos(df):
-        """
-        Função para otimizar tipos de colunas de um DataFrame.
-        
-        Procura por colunas de tipo inteiro e float, e as converte para tipos mais eficientes.
-        
-        Também procura por colunas de tipo string e as converte para tipo category, se houver
-        pelo menos 50% de valores únicos.
-        
-        Caso encontre algum erro durante a conversão, mantém o tipo original da coluna.
-        
-        Parameters
-        ----------
-        df : pandas.DataFrame
-            DataFrame a ser otimizado.
-        
-        Returns
-        -------
-        pandas.DataFrame
-            DataFrame com tipos de colunas otimizados.
-        """
-        df_otimizado = df.copy()
-        
-        # Inteiros - com verificações extras
-        int_cols = df.select_dtypes(include=['int']).columns
-        for col in int_cols:
-            try:
-                if df[col].min() >= 0:  # Só positivos
-                    if df[col].max() < 256:  # 0-255
-                        df_otimizado[col] = df[col].astype('uint8')
-                    elif df[col].max() < 65536:  # 0-65535
-                        df_otimizado[col] = df[col].astype('uint16')
-                    elif df[col].max() < 4294967296:  # 0-4294967295
-                        df_otimizado[col] = df[col].astype('uint32')
-                    else:
-                        df_otimizado[col] = df[col].astype('uint64')  # Para valores muito grandes
-                else:  # Com negativos
-                    if df[col].min() >= -128 and df[col].max() < 128:
-                        df_otimizado[col] = df[col].astype('int8')
-                    elif df[col].min() >= -32768 and df[col].max() < 32768:
-                        df_otimizado[col] = df[col].astype('int16')
-                    elif df[col].min() >= -2147483648 and df[col].max() < 2147483648:
-                        df_otimizado[col] = df[col].astype('int32')
-                    else:
-                        df_otimizado[col] = df[col].astype('int64')  # Mantém original
-                        
-            except (ValueError, TypeError) as e:
-                print(f"⚠️  Erro na coluna {col}: {e}. Mantendo tipo original.")
-                df_otimizado[col] = df[col]  # Mantém original em caso de erro
-        
-        # Floats (seguro)
-        float_cols = df.select_dtypes(include=['float']).columns
-        for col in float_cols:
-            df_otimizado[col] = df[col].astype('float32')
-        
-        # Strings → categoria (com threshold ajustável)
-        string_cols = df.select_dtypes(include=['object']).columns
-        for col in string_cols:
-            if df[col].nunique() / len(df) < 0.5:  # Mais conservador: 50% únicos
-                try:
-                    df_otimizado[col] = df[col].astype('category')
-                except Exception as e:
-                    print(f"⚠️  Erro convertendo {col} para category: {e}")
-        
-        return df_otimizado
-
     # Executar a função de otimização
     df_EF_EM_bncc = otimizar_tipos(df_EF_EM_bncc)
 
+    medicao.saida(len(df_EF_EM_bncc))
+    return {'df_EF_EM_bncc': df_EF_EM_bncc}
+
+
+def etapa_censo_join(df_EF_EM_bncc, arquivo_censo, medicao=None):
+    """Cruza a base com o Censo Escolar: mantém só os CPFs do Censo e lista os ausentes do SIGEduc."""
+    medicao = medicao or MedicaoEtapa('censo-join')
+    medicao.entrada(len(df_EF_EM_bncc))
+    medicao.leitura(arquivo_censo)
 
     # Filtrar linhas somente com os CPFs na base dados que foi enviada para o Censo Escolar no dia 28/05
     # Ler o arquivo enviado para o Censo Escolar em 28/05 (em Excel)
-    df_censo = pd.read_excel(r"C:\Users\hugob\Downloads\DADOS EDUCACENSO FINAL_RETIFICADO.xlsx")
+    df_censo = pd.read_excel(arquivo_censo)
 
     # Criar uma lista dos CPFs do Excel (Censo Escolar Retificado) (garantindo que sejam strings e sem espaços)
     cpf_lista = df_censo["CPF"].astype(str).str.strip().unique()
 
     # Filtrar o df_EF_EM_bncc mantendo apenas linhas cujo CPF PESSOA esteja na lista
     df_EF_EM_bncc_censo = df_EF_EM_bncc[df_EF_EM_bncc["CPF PESSOA"].astype(str).isin(cpf_lista)]
+    medicao.descarte('censo', len(df_EF_EM_bncc) - len(df_EF_EM_bncc_censo))
 
     # Criar um dataframe só com os CPFs que estavam na base do Censo Escolar e não estão no SigEduc atualmente
     # Garantir que os CPFs sejam strings e padronizados (sem pontos ou traços)
     df_censo["CPF"] = df_censo["CPF"].astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
-    df_EF_EM_bncc["CPF PESSOA"] = df_EF_EM_bncc["CPF PESSOA"].astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
+    cpf_sigeduc = df_EF_EM_bncc["CPF PESSOA"].astype(str).str.replace(r'\D', '', regex=True).str.zfill(11)
 
     # Criar o novo DataFrame apenas com CPFs AUSENTES
-    df_censo_ausentes = df_censo[~df_censo["CPF"].isin(df_EF_EM_bncc["CPF PESSOA"])]
+    df_censo_ausentes = df_censo[~df_censo["CPF"].isin(cpf_sigeduc)]
 
-    # Salvar em Excel o DataFrame de CPFs ausentes do SigEduc atualmente
-    df_censo_ausentes.to_excel("dados_tratados/df_censo_ausentes.xlsx", index=False)
+    medicao.saida(len(df_EF_EM_bncc_censo))
+
+    return {'df_EF_EM_bncc_censo': df_EF_EM_bncc_censo,
+            'df_censo_ausentes': texto_misto_para_str(df_censo_ausentes.copy())}
+
+
+def etapa_aggregate(df_EF_EM_bncc_censo, medicao=None):
+    """
+    Agrupa por escola e série, contando notas lançadas e não lançadas de cada bimestre, e monta
+    os histogramas das notas por escola, série, componente e bimestre (distribuicao_notas.py).
+    """
+    medicao = medicao or MedicaoEtapa('aggregate')
+    medicao.entrada(len(df_EF_EM_bncc_censo))
 
     # Fazer dataframe por escola para economizar espaço e processamento. Df agrupado por série e escola
     colunas_agrupamento = ['DIREC', 'MUNICÍPIO', 'ESCOLA', 'INEP ESCOLA', 'ETAPA_RESUMIDA', 'SÉRIE']
@@ -262,12 +358,300 @@ def processar_dados_brutos():
     # Criar o dataframe final
     df_escola = pd.DataFrame(resultados)
 
-    # Salvar em .parquet o DataFrame de CPFs ausentes do SigEduc atualmente
-    df_escola.to_parquet("dados_tratados/df_escola.parquet", index=False)
+    # Histogramas das notas (somáveis: o dashboard agrega por município, DIREC ou estado sem
+    # voltar às linhas dos estudantes)
+    df_distribuicao = histogramas(df_EF_EM_bncc_censo, COLUNAS_BIMESTRES)
+    medicao.detalhe('grupos_distribuicao', len(df_distribuicao))
+
+    medicao.saida(len(df_escola))
+    return {'df_escola': df_escola, 'df_distribuicao': df_distribuicao}
+
+
+def arquivos_saida(pasta_saida, formatos_ausentes=('xlsx',)):
+    """Arquivos gravados pela etapa export."""
+    ausentes = [f"df_censo_ausentes{FORMATOS[formato][1]}" for formato in formatos_ausentes]
+    return {nome: os.path.join(pasta_saida, nome) for nome in
+            ausentes + ["ausentes_censo.parquet", "df_alunos.arrow", "df_alunos_indice.parquet",
+                        "distribuicao_notas.parquet", "df_escola.parquet"]}
+
+
+def etapa_export(df_escola, df_censo_ausentes, df_EF_EM_bncc_censo, pasta_saida, data_extracao,
+                 medicao=None, formatos_ausentes=('xlsx',), df_distribuicao=None):
+    """Grava os arquivos usados pelo dashboard e acrescenta a extração ao histórico."""
+    medicao = medicao or MedicaoEtapa('export')
+    medicao.entrada(len(df_escola))
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    saidas = arquivos_saida(pasta_saida, formatos_ausentes)
+
+    # Salvar o DataFrame de CPFs ausentes do SigEduc atualmente, em cada formato pedido
+    # (gravação em blocos; o .xlsx em modo write-only, sem montar a planilha em memória)
+    for formato in formatos_ausentes:
+        gravar(df_censo_ausentes, saidas[f"df_censo_ausentes{FORMATOS[formato][1]}"], formato)
+
+    # Salvar a lista de ausentes para a página do dashboard: ordenada por DIREC, município e INEP
+    # (consultas filtradas leem só os blocos do recorte) e com o CPF mascarado
+    salvar_ausentes(df_censo_ausentes, df_escola, caminho=saidas["ausentes_censo.parquet"])
+
+    # Salvar a base anonimizada de estudantes por componente (CPF em hash), ordenada e indexada
+    # por INEP ESCOLA, para o detalhamento por escola no dashboard
+    salvar_base_alunos(df_EF_EM_bncc_censo,
+                       caminho_base=saidas["df_alunos.arrow"],
+                       caminho_indice=saidas["df_alunos_indice.parquet"])
+
+    # Salvar os histogramas das notas por escola, série, componente e bimestre
+    if df_distribuicao is not None:
+        salvar_distribuicao(df_distribuicao, caminho=saidas["distribuicao_notas.parquet"])
+
+    # Salvar em .parquet o DataFrame agregado por escola e série. O arquivo é gravado ao lado e
+    # trocado de uma vez (os.replace), para que o dashboard em execução nunca leia uma gravação
+    # pela metade: ele passa da versão anterior direto para a nova.
+    temporario = saidas["df_escola.parquet"] + ".tmp"
+    df_escola.to_parquet(temporario, index=False)
+    os.replace(temporario, saidas["df_escola.parquet"])
+
+    # Acrescentar ao histórico só as linhas que mudaram desde a extração anterior
+    linhas_delta = registrar_extracao(df_escola, data_extracao, pasta=os.path.join(pasta_saida, "historico"))
+    medicao.detalhe('linhas_alteradas_no_historico', linhas_delta)
+
+    medicao.saida(len(df_escola))
+    return {}
+
+
+# CHECKPOINTS
+def impressao_digital(*partes):
+    """Hash curto que identifica as entradas de uma etapa (arquivos, parâmetros e etapas anteriores)."""
+    conteudo = json.dumps([VERSAO_CHECKPOINTS, *partes], sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode('utf8')).hexdigest()[:16]
+
+
+def data_dos_arquivos(arquivos):
+    """
+    Data (AAAA-MM-DD) do arquivo modificado por último, usada como data da extração.
+
+    Vem das próprias entradas: reprocessar os mesmos arquivos em outro dia dá a mesma data (e a
+    mesma impressão digital da etapa export). Sem arquivos, vale a data de hoje.
+    """
+    if not arquivos:
+        return datetime.now().strftime('%Y-%m-%d')
+    return datetime.fromtimestamp(max(os.stat(arquivo).st_mtime for arquivo in arquivos)).strftime('%Y-%m-%d')
+
+
+def descrever_arquivos(arquivos):
+    """Nome, tamanho e data de modificação de cada arquivo (muda se algum arquivo for trocado)."""
+    descricao = []
+    for arquivo in sorted(arquivos):
+        info = os.stat(arquivo)
+        descricao.append([os.path.basename(arquivo), info.st_size, info.st_mtime_ns])
+    return descricao
+
+
+class Checkpoints:
+    """
+    Guarda o resultado de cada etapa em arquivos .parquet e um manifesto (manifesto.json) com a
+    impressão digital das entradas usadas em cada uma.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.caminho_manifesto = os.path.join(pasta, "manifesto.json")
+        os.makedirs(pasta, exist_ok=True)
+        if os.path.exists(self.caminho_manifesto):
+            with open(self.caminho_manifesto, encoding='utf8') as f:
+                self.manifesto = json.load(f)
+        else:
+            self.manifesto = {}
+
+    def _arquivo(self, etapa, nome):
+        return os.path.join(self.pasta, f"{etapa}__{nome}.parquet")
+
+    def impressao(self, etapa):
+        return self.manifesto.get(etapa, {}).get('impressao')
+
+    def valido(self, etapa, impressao):
+        registro = self.manifesto.get(etapa)
+        if registro is None or registro['impressao'] != impressao:
+            return False
+        return (all(os.path.exists(self._arquivo(etapa, nome)) for nome in registro['saidas'])
+                and all(os.path.exists(arquivo) for arquivo in registro.get('arquivos', [])))
+
+    def salvar(self, etapa, impressao, resultados, arquivos=()):
+        for nome, df in resultados.items():
+            df.to_parquet(self._arquivo(etapa, nome), index=False)
+
+        self.manifesto[etapa] = {
+            'impressao': impressao,
+            'saidas': list(resultados),
+            'arquivos': list(arquivos),
+            'concluida_em': datetime.now().isoformat(timespec='seconds')
+        }
+        # Gravar o manifesto de forma atômica, para não corrompê-lo se o processo for interrompido
+        temporario = self.caminho_manifesto + ".tmp"
+        with open(temporario, 'w', encoding='utf8') as f:
+            json.dump(self.manifesto, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.caminho_manifesto)
+
+    def arquivos(self, etapa):
+        """Arquivos de checkpoint de uma etapa."""
+        return [self._arquivo(etapa, nome) for nome in self.manifesto.get(etapa, {}).get('saidas', [])]
+
+    def carregar(self, etapa):
+        if etapa not in self.manifesto:
+            raise FileNotFoundError(
+                f"Não há checkpoint da etapa '{etapa}' em {self.pasta}. Execute essa etapa antes.")
+        return {nome: pd.read_parquet(self._arquivo(etapa, nome)) for nome in self.manifesto[etapa]['saidas']}
+
+
+def processar_dados_brutos(pasta=PASTA_NOTAS_PADRAO, arquivo_censo=ARQUIVO_CENSO_PADRAO,
+                           pasta_saida=PASTA_SAIDA_PADRAO, workers=1, pasta_checkpoints=None,
+                           a_partir_de=None, somente=None, data_extracao=None, formatos_ausentes=('xlsx',)):
+    """
+    Executa o processamento completo, etapa por etapa, com checkpoints.
+
+    Parameters
+    ----------
+    pasta : str
+        Pasta com os arquivos .xlsx exportados do SIGEduc.
+    arquivo_censo : str
+        Arquivo .xlsx enviado ao Censo Escolar.
+    pasta_saida : str
+        Pasta onde são gravados os arquivos usados pelo dashboard.
+    workers : int
+        Quantidade de processos usados na leitura dos arquivos.
+    pasta_checkpoints : str, optional
+        Pasta dos checkpoints (padrão: `<pasta_saida>/checkpoints`).
+    a_partir_de : str, optional
+        Reexecuta a partir desta etapa; as anteriores são lidas dos checkpoints.
+    somente : list of str, optional
+        Reexecuta só estas etapas; as demais são lidas dos checkpoints.
+    data_extracao : str, optional
+        Data da extração do SIGEduc (AAAA-MM-DD), usada no histórico (padrão: a data do arquivo
+        de notas modificado por último, ver `data_dos_arquivos`).
+    formatos_ausentes : sequence of str
+        Formatos em que a lista de ausentes do Censo é gravada ('xlsx', 'csv' e/ou 'parquet').
+
+    Sem `a_partir_de` e sem `somente`, todas as etapas são consideradas, e as que já foram
+    concluídas com as mesmas entradas são puladas.
+    """
+    checkpoints = Checkpoints(pasta_checkpoints or os.path.join(pasta_saida, "checkpoints"))
+
+    if somente:
+        forcadas = set(somente)
+    elif a_partir_de:
+        forcadas = set(ETAPAS[ETAPAS.index(a_partir_de):])
+    else:
+        forcadas = set()
+    incremental = not forcadas
 
-# Executar o código acima se rodado diretamente e não como importação em outro módulo
-if __name__ == "__main__":
-    processar_dados_brutos()
+    # lista todos os arquivos .xlsx da pasta
+    arquivos = glob.glob(os.path.join(pasta, "*.xlsx"))
+    data_extracao = data_extracao or data_dos_arquivos(arquivos)
+
+    # Arquivos gravados fora dos checkpoints por cada etapa (se faltarem, a etapa é refeita)
+    caminho_validacao = os.path.join(pasta_saida, "validacao.json")
+    arquivos_gravados = {'clean': [caminho_validacao], 'export': list(arquivos_saida(pasta_saida, formatos_ausentes).values())}
+
+    entradas = {
+        'ingest': lambda: [descrever_arquivos(arquivos)],
+        'clean': lambda: [impressoes['ingest'], os.path.abspath(pasta_saida)],
+        'censo-join': lambda: [impressoes['clean'], descrever_arquivos([arquivo_censo])],
+        'aggregate': lambda: [impressoes['censo-join']],
+        'export': lambda: [impressoes['aggregate'], impressoes['censo-join'], os.path.abspath(pasta_saida),
+                           data_extracao, sorted(formatos_ausentes)],
+    }
+    executar = {
+        'ingest': lambda m: etapa_ingest(arquivos, workers, m),
+        'clean': lambda m: etapa_clean(obter('ingest', m)['df'], m, caminho_validacao),
+        'censo-join': lambda m: etapa_censo_join(obter('clean', m)['df_EF_EM_bncc'], arquivo_censo, m),
+        'aggregate': lambda m: etapa_aggregate(obter('censo-join', m)['df_EF_EM_bncc_censo'], m),
+        'export': lambda m: etapa_export(obter('aggregate', m)['df_escola'],
+                                         obter('censo-join', m)['df_censo_ausentes'],
+                                         obter('censo-join', m)['df_EF_EM_bncc_censo'],
+                                         pasta_saida, data_extracao, m, formatos_ausentes,
+                                         obter('aggregate', m)['df_distribuicao']),
+    }
 
+    resultados = {}
+    impressoes = {}
+
+    def obter(etapa, medicao):
+        # Resultado de uma etapa: da memória, se ela rodou agora, ou do checkpoint
+        if etapa not in resultados:
+            medicao.leitura(checkpoints.arquivos(etapa))
+            resultados[etapa] = checkpoints.carregar(etapa)
+        return resultados[etapa]
+
+    relatorio = RelatorioExecucao(parametros={
+        'pasta': pasta, 'arquivo_censo': arquivo_censo, 'pasta_saida': pasta_saida,
+        'workers': workers, 'a_partir_de': a_partir_de, 'somente': somente, 'arquivos': len(arquivos),
+        'data_extracao': data_extracao, 'formatos_ausentes': list(formatos_ausentes)
+    })
+
+    try:
+        for etapa in ETAPAS:
+            if incremental or etapa in forcadas:
+                impressoes[etapa] = impressao_digital(etapa, *entradas[etapa]())
+            else:
+                # Fora da seleção: vale o checkpoint existente, com a impressão com que foi gravado
+                impressoes[etapa] = checkpoints.impressao(etapa)
+                print(f"⏭️  {etapa}: fora da seleção, usando checkpoint")
+                relatorio.pular(etapa, 'fora da seleção')
+                continue
+
+            if incremental and checkpoints.valido(etapa, impressoes[etapa]):
+                print(f"⏭️  {etapa}: sem mudanças desde a última execução, usando checkpoint")
+                relatorio.pular(etapa, 'checkpoint')
+                continue
+
+            print(f"▶️  {etapa}")
+            with medir_etapa(relatorio, etapa) as medicao:
+                resultados[etapa] = executar[etapa](medicao)
+                checkpoints.salvar(etapa, impressoes[etapa], resultados[etapa],
+                                   arquivos=arquivos_gravados.get(etapa, ()))
+            print(f"   {medicao.linhas_entrada:,} → {medicao.linhas_saida:,} linhas em {medicao.tempo_s:.1f} s "
+                  f"(pico de memória: {medicao.pico_rss / 1024 ** 2:,.0f} MB)")
+
+        relatorio.status = 'concluído'
+    except BaseException:
+        relatorio.status = 'falhou'
+        raise
+    finally:
+        # Relatório de execução (JSON) ao lado das saídas, inclusive quando alguma etapa falha
+        relatorio.salvar(os.path.join(pasta_saida, "relatorio_execucao.json"))
+
+    return relatorio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Processa as exportações de notas do SIGEduc e gera os dados do dashboard.")
+    parser.add_argument('--notas', default=PASTA_NOTAS_PADRAO,
+                        help="Pasta com os arquivos .xlsx exportados do SIGEduc.")
+    parser.add_argument('--censo', default=ARQUIVO_CENSO_PADRAO,
+                        help="Arquivo .xlsx enviado ao Censo Escolar.")
+    parser.add_argument('--saida', default=PASTA_SAIDA_PADRAO,
+                        help="Pasta de saída dos arquivos do dashboard.")
+    parser.add_argument('--checkpoints', default=None,
+                        help="Pasta dos checkpoints das etapas (padrão: <saida>/checkpoints).")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Quantidade de processos para ler os arquivos em paralelo.")
+    parser.add_argument('--data-extracao', default=None,
+                        help="Data da extração do SIGEduc (AAAA-MM-DD), usada no histórico "
+                             "(padrão: a data do arquivo de notas modificado por último).")
+    parser.add_argument('--formato-ausentes', choices=list(FORMATOS), action='append', default=None,
+                        help="Formato da lista de ausentes do Censo (pode ser repetido; padrão: xlsx).")
+    selecao = parser.add_mutually_exclusive_group()
+    selecao.add_argument('--from-stage', choices=ETAPAS, default=None,
+                         help="Reexecuta a partir desta etapa, lendo as anteriores dos checkpoints.")
+    selecao.add_argument('--only', choices=ETAPAS, action='append', default=None,
+                         help="Reexecuta só esta etapa (pode ser repetido).")
+    args = parser.parse_args(argv)
+
+    processar_dados_brutos(pasta=args.notas, arquivo_censo=args.censo, pasta_saida=args.saida,
+                           workers=args.workers, pasta_checkpoints=args.checkpoints,
+                           a_partir_de=args.from_stage, somente=args.only, data_extracao=args.data_extracao,
+                           formatos_ausentes=args.formato_ausentes or ['xlsx'])
 
 
+# Executar o código acima se rodado diretamente e não como importação em outro módulo
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Publicação de novas versões dos dados para o dashboard em execução
+#
+# Um monitor em segundo plano acompanha o dados_tratados/df_escola.parquet. Quando uma nova
+# versão é publicada, ela é lida, validada e tem as estruturas derivadas (índice de busca das
+# escolas, totais por entidade e pontuação das escolas atípicas) montadas fora das sessões; só
+# então o ponteiro do processo passa a apontar para o novo conjunto. Cada execução do app pega o
+# conjunto atual uma vez, no início: as execuções em andamento terminam com a versão antiga e as
+# seguintes já usam a nova, sem reiniciar o servidor nem limpar caches.
+#
+# Uma versão inválida (ilegível, sem as colunas esperadas ou com contagens negativas) é
+# descartada e o dashboard continua com a versão anterior.
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from anomalias_escolas import pontuar_escolas
+from busca_escolas import IndiceEscolas
+from consultas import COLUNAS_CONTAGEM, totais_por_entidade
+
+ARQUIVO_ESCOLA = os.path.join('dados_tratados', 'df_escola.parquet')
+COLUNAS_OBRIGATORIAS = ['DIREC', 'MUNICÍPIO', 'ESCOLA', 'INEP ESCOLA'] + COLUNAS_CONTAGEM
+INTERVALO_VERIFICACAO = 10.0  # segundos
+
+logger = logging.getLogger(__name__)
+
+# Conjunto de dados publicado: a base e tudo o que é derivado dela
+ConjuntoDados = namedtuple('ConjuntoDados', ['versao', 'df', 'indice', 'vetores', 'anomalias'])
+
+
+def assinatura(caminho):
+    """Identifica a versão do arquivo (data de modificação em ns e tamanho), ou None se não existir."""
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+def ler_df_escola(caminho=ARQUIVO_ESCOLA):
+    """Lê o df_escola com as normalizações usadas no dashboard (INEP e nome sem espaços nas pontas)."""
+    df = pd.read_parquet(caminho)
+    df['INEP ESCOLA'] = df['INEP ESCOLA'].astype(str).str.strip()
+    df['ESCOLA'] = df['ESCOLA'].astype(str).str.strip()
+    df['ESCOLA_FORMATADA'] = df['ESCOLA'] + " (cód. Inep: " + df['INEP ESCOLA'] + ")"
+    return df
+
+
+def validar_base(df):
+    """Verifica se a base pode ser publicada; levanta ValueError com o motivo, se não puder."""
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"colunas ausentes: {', '.join(faltando)}")
+    if df.empty:
+        raise ValueError("base vazia")
+    negativas = [coluna for coluna in COLUNAS_CONTAGEM if (df[coluna] < 0).any()]
+    if negativas:
+        raise ValueError(f"contagens negativas em: {', '.join(negativas)}")
+
+
+def preparar_conjunto(caminho=ARQUIVO_ESCOLA):
+    """
+    Lê, valida e monta as estruturas derivadas de uma versão do df_escola.
+
+    Returns
+    -------
+    ConjuntoDados
+        `versao` é a data de modificação do arquivo (ns), usada nas chaves de cache do app.
+
+    Raises
+    ------
+    ValueError
+        Se a base for inválida ou se o arquivo mudar durante a leitura.
+    """
+    antes = assinatura(caminho)
+    df = ler_df_escola(caminho)
+    if assinatura(caminho) != antes:
+        raise ValueError("o arquivo mudou durante a leitura")
+    validar_base(df)
+    return ConjuntoDados(versao=antes[0], df=df, indice=IndiceEscolas(df), vetores=totais_por_entidade(df),
+                         anomalias=pontuar_escolas(df))
+
+
+class MonitorDados:
+    """
+    Mantém o conjunto de dados atual do processo e o troca quando uma nova versão é publicada.
+
+    Parameters
+    ----------
+    caminho : str
+        Arquivo monitorado.
+    intervalo : float
+        Intervalo (s) entre as verificações do arquivo.
+    """
+
+    def __init__(self, caminho=ARQUIVO_ESCOLA, intervalo=INTERVALO_VERIFICACAO):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._assinatura = assinatura(caminho)
+        self._atual = preparar_conjunto(caminho)
+        self._candidata = None   # assinatura nova vista na última verificação
+        self._rejeitada = None   # última assinatura que falhou na validação
+        self._parar = threading.Event()
+        self._thread = None
+        self._inscritos = []
+
+    @property
+    def atual(self):
+        """Conjunto de dados publicado (a troca do ponteiro é uma atribuição, atômica)."""
+        return self._atual
+
+    def inscrever(self, funcao):
+        """Chama `funcao(conjunto)` a cada nova versão publicada (na thread do monitor)."""
+        self._inscritos.append(funcao)
+        return self
+
+    def verificar(self):
+        """
+        Verifica o arquivo uma vez e publica a nova versão, se houver.
+
+        Uma versão nova só é carregada quando a assinatura se repete em duas verificações
+        seguidas, para não ler um arquivo que ainda está sendo copiado.
+
+        Returns
+        -------
+        bool
+            True se uma nova versão foi publicada.
+        """
+        nova = assinatura(self.caminho)
+        if nova is None or nova == self._assinatura or nova == self._rejeitada:
+            self._candidata = None
+            return False
+        if nova != self._candidata:
+            self._candidata = nova
+            return False
+
+        inicio = time.perf_counter()
+        try:
+            conjunto = preparar_conjunto(self.caminho)
+        except Exception as erro:
+            # Versão inválida ou ilegível: continua com a anterior até a próxima publicação
+            logger.warning("Nova versão de %s descartada: %s", self.caminho, erro)
+            self._rejeitada = nova
+            self._candidata = None
+            return False
+
+        self._atual = conjunto
+        self._assinatura = nova
+        self._candidata = None
+        logger.info("Nova versão de %s publicada (%d linhas, preparada em %.1f s)",
+                    self.caminho, len(conjunto.df), time.perf_counter() - inicio)
+        for funcao in self._inscritos:
+            try:
+                funcao(conjunto)
+            except Exception:
+                logger.exception("Falha ao avisar da nova versão de %s", self.caminho)
+        return True
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self.verificar()
+
+    def iniciar(self):
+        """Inicia a verificação periódica em uma thread em segundo plano (daemon)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='monitor-dados', daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        """Interrompe a verificação periódica."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
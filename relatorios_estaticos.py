@@ -0,0 +1,304 @@
+# Relatórios estáticos da página de lançamento, por DIREC (execução sem o dashboard)
+#
+# A cada bimestre, cada DIREC recebe um retrato da sua página de lançamento. Este módulo gera, de
+# uma vez, um arquivo HTML por DIREC (e, com --municipios, por município) com os mesmos gráficos
+# e tabelas do dashboard (resumo por bimestre, percentuais por DIREC e ranking das escolas), que
+# abre no navegador sem o servidor e sem internet.
+#
+#   - A biblioteca de gráficos (plotly.js, alguns MB) é gravada uma única vez na pasta de
+#     saída e compartilhada pelos relatórios, que só carregam os dados dos seus gráficos. Por
+#     isso um relatório sozinho NÃO é autossuficiente: sem o plotly.min.js ao lado, abre sem os
+#     gráficos. A pasta inteira (com o index.html) é o que se envia ou publica.
+#   - A base é agregada uma única vez, por DIREC, município e escola (`agregar`); os totais de
+#     cada relatório saem dessa agregação, sem percorrer a base de novo a cada recorte.
+#   - Os relatórios são montados em paralelo, em processos separados (--workers).
+#   - O manifesto.json guarda o hash dos totais de cada relatório: uma nova execução só refaz os
+#     relatórios cujos totais mudaram (ou todos, com --forcar ou se o modelo do relatório mudou).
+#
+# Uso:
+#     python relatorios_estaticos.py --workers 4
+#     python relatorios_estaticos.py --municipios --saida /tmp/relatorios
+import argparse
+import hashlib
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from consultas import (BIMESTRES, COLUNAS_CONTAGEM, COLUNAS_ESCOLA, percentuais_direc, ranking_escolas,
+                       resumo_lancamento, tabela_direc)
+from exportacao import nome_arquivo
+from preaquecimento import VisaoLancamento
+from publicacao_dados import ARQUIVO_ESCOLA, preparar_conjunto
+
+PASTA_SAIDA_PADRAO = os.path.join('dados_tratados', 'relatorios')
+ARQUIVO_MANIFESTO = 'manifesto.json'
+ARQUIVO_PLOTLY = 'plotly.min.js'
+
+# Aumentar quando o conteúdo ou a aparência dos relatórios mudar, para refazer todos
+VERSAO_RELATORIO = 1
+
+ORDENACAO_ESCOLAS = '% Notas Não Lançadas - 2º Bimestre'  # a mesma ordenação padrão do dashboard
+
+ESTILO = """
+body { font-family: sans-serif; max-width: 1100px; margin: 0 auto; padding: 1em; color: #262730; }
+h1 { font-size: 1.8em; } h2 { font-size: 1.3em; margin-top: 2em; }
+table { border-collapse: collapse; font-size: 0.9em; margin: 0.5em 0 1.5em; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; } th { background: #f0f2f6; text-align: left; }
+td { text-align: right; } td:first-child { text-align: left; }
+.rodape { color: #777; font-size: 0.8em; margin-top: 3em; }
+"""
+
+
+def recortes(df, incluir_municipios=False):
+    """Filtros (DIREC, município, escola) de cada relatório: cada DIREC e, opcionalmente, cada município."""
+    lista = [(direc, 'Todos', 'Todas') for direc in sorted(df['DIREC'].dropna().unique())]
+    if incluir_municipios:
+        pares = df[['DIREC', 'MUNICÍPIO']].dropna().drop_duplicates().sort_values(['DIREC', 'MUNICÍPIO'])
+        lista += [(direc, municipio, 'Todas') for direc, municipio in pares.itertuples(index=False)]
+    return lista
+
+
+def agregar(df):
+    """
+    Totais de cada escola (COLUNAS_CONTAGEM), com a DIREC e o município, calculados uma vez.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Índice (DIREC, MUNICÍPIO, INEP ESCOLA); o atributo `escolas` guarda as combinações
+        únicas de COLUNAS_ESCOLA, na ordem da base (a ordem do ranking do dashboard).
+    """
+    somas = df.groupby(['DIREC', 'MUNICÍPIO', 'INEP ESCOLA'], observed=True)[COLUNAS_CONTAGEM].sum()
+    somas.attrs['escolas'] = df[COLUNAS_ESCOLA].drop_duplicates().reset_index(drop=True)
+    return somas
+
+
+def visao_recorte(somas, filtros):
+    """
+    Visão de um recorte (DIREC ou município) a partir de `agregar`.
+
+    Dá os mesmos totais de `preaquecimento.calcular_visao` sobre a base inteira, mas só soma as
+    linhas já agregadas das escolas do recorte.
+    """
+    direc, municipio, _ = filtros
+    no_recorte = somas.index.get_level_values('DIREC') == direc
+    if municipio != 'Todos':
+        no_recorte &= somas.index.get_level_values('MUNICÍPIO') == municipio
+    recorte = somas[no_recorte]
+
+    por_direc = recorte.groupby(level='DIREC', observed=True).sum()
+    tabelas_direc = {}
+    for b in BIMESTRES:
+        tabelas_direc[b] = percentuais_direc(pd.DataFrame({
+            'DIREC': por_direc.index,
+            'Lançadas': por_direc[f'{b}_Notas Lancadas'].to_numpy(),
+            'Não_Lançadas': por_direc[f'{b}_Notas Nao Lancadas'].to_numpy(),
+        }))
+
+    por_escola = recorte.groupby(level='INEP ESCOLA', observed=True).sum()
+    totais = pd.DataFrame(index=por_escola.index)
+    for b in BIMESTRES:
+        totais[f'{b}_Nao Lancadas'] = por_escola[f'{b}_Notas Nao Lancadas']
+        totais[f'{b}_Total'] = por_escola[f'{b}_Notas Lancadas'] + por_escola[f'{b}_Notas Nao Lancadas']
+    escolas = somas.attrs['escolas']
+    escolas = escolas[(escolas['DIREC'] == direc) & ((escolas['MUNICÍPIO'] == municipio) | (municipio == 'Todos'))]
+
+    return VisaoLancamento(
+        resumo=resumo_lancamento(recorte.sum()),
+        direc=tabelas_direc,
+        totais_escolas=escolas.merge(totais, left_on='INEP ESCOLA', right_index=True, how='left')
+                              .reset_index(drop=True))
+
+
+def nome_relatorio(filtros):
+    """Arquivo do relatório do recorte (ex.: '01a_DIREC_NATAL.html')."""
+    return nome_arquivo(*[f for f in filtros if f not in ('Todas', 'Todos')]) + '.html'
+
+
+def hash_visao(visao):
+    """Hash dos totais do relatório (muda só quando algum número do relatório muda)."""
+    h = hashlib.sha1(str(VERSAO_RELATORIO).encode())
+    for tabela in [visao.resumo, *[visao.direc[b] for b in BIMESTRES], visao.totais_escolas]:
+        h.update(','.join(map(str, tabela.columns)).encode('utf8'))
+        h.update(pd.util.hash_pandas_object(tabela, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _tabela_html(df):
+    return df.to_html(index=False, border=0, float_format=lambda v: f'{v:.1f}'.replace('.', ','))
+
+
+def _grafico_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={'displaylogo': False})
+
+
+def renderizar(filtros, visao, data_dados):
+    """
+    HTML do relatório de um recorte, com os gráficos e as tabelas da página de lançamento.
+
+    Parameters
+    ----------
+    filtros : tuple of str
+        (DIREC, município, escola) do recorte.
+    visao : VisaoLancamento
+        Totais do recorte (`preaquecimento.calcular_visao`).
+    data_dados : str
+        Data dos dados, exibida no relatório.
+    """
+    # importado aqui: só os processos que montam relatórios carregam o plotly
+    from graficos import CORES_LANCADAS, CORES_NAO_LANCADAS, grafico_bimestres, grafico_direc
+
+    direc, municipio, _ = filtros
+    titulo = direc if municipio == 'Todos' else f"{municipio} ({direc})"
+    partes = [
+        f"<h1>Lançamento de notas: {html.escape(titulo)}</h1>",
+        f"<p>Dados de {html.escape(data_dados)}.</p>",
+        "<h2>Resumo por bimestre</h2>",
+        _tabela_html(visao.resumo),
+        _grafico_html(grafico_bimestres(visao.resumo, 'Notas Não Lançadas',
+                                        '❌ Quantidade de Notas Não Lançadas por Bimestre',
+                                        'Quantidade de Notas Faltantes', CORES_NAO_LANCADAS)),
+        _grafico_html(grafico_bimestres(visao.resumo, 'Notas Lançadas',
+                                        '✅ Quantidade de Notas Lançadas por Bimestre',
+                                        'Quantidade de Notas Lançadas', CORES_LANCADAS)),
+    ]
+    for n, bimestre in enumerate(BIMESTRES, start=1):
+        partes += [
+            f"<h2>{n}º Bimestre</h2>",
+            _grafico_html(grafico_direc(visao.direc[bimestre],
+                                        f'{n}º Bimestre: Percentual de Notas Lançadas vs Não Lançadas por DIREC')),
+            _tabela_html(tabela_direc(visao.direc[bimestre])),
+        ]
+    partes += [
+        "<h2>Escolas com maiores percentuais de notas não lançadas</h2>",
+        _tabela_html(ranking_escolas(visao.totais_escolas, ordenar_por=ORDENACAO_ESCOLAS)),
+        f"<p class='rodape'>Gerado em {datetime.now():%d/%m/%Y %H:%M}.</p>",
+    ]
+    return _pagina(titulo, partes)
+
+
+def _pagina(titulo, partes):
+    return (f"<!DOCTYPE html>\n<html lang='pt-BR'>\n<head>\n<meta charset='utf-8'>\n"
+            f"<title>{html.escape(titulo)}</title>\n<style>{ESTILO}</style>\n"
+            f"<script src='{ARQUIVO_PLOTLY}'></script>\n</head>\n<body>\n"
+            + '\n'.join(partes) + "\n</body>\n</html>\n")
+
+
+def _gravar(caminho, texto):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf8') as f:
+        f.write(texto)
+    os.replace(temporario, caminho)
+
+
+def gerar_relatorio(tarefa):
+    """Monta e grava o relatório de um recorte (executado nos processos do pool)."""
+    filtros, visao, data_dados, caminho = tarefa
+    _gravar(caminho, renderizar(filtros, visao, data_dados))
+    return caminho
+
+
+def ler_manifesto(pasta_saida):
+    try:
+        with open(os.path.join(pasta_saida, ARQUIVO_MANIFESTO), encoding='utf8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def gerar_relatorios(caminho_dados=ARQUIVO_ESCOLA, pasta_saida=PASTA_SAIDA_PADRAO, incluir_municipios=False,
+                     workers=1, forcar=False):
+    """
+    Gera os relatórios que mudaram desde a última execução.
+
+    Os totais de todos os recortes são calculados aqui, a partir de uma única agregação da base
+    (`agregar`); só os relatórios com totais diferentes dos do manifesto são montados, em paralelo
+    se workers > 1, e cada processo recebe apenas os totais do seu recorte. Relatórios de recortes
+    que deixaram de existir são apagados.
+
+    Returns
+    -------
+    dict
+        Quantidade de relatórios gerados, inalterados e removidos.
+    """
+    import plotly
+    from plotly.offline import get_plotlyjs
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    conjunto = preparar_conjunto(caminho_dados)
+    data_dados = f"{datetime.fromtimestamp(conjunto.versao / 1e9):%d/%m/%Y %H:%M}"
+
+    manifesto = ler_manifesto(pasta_saida)
+    anteriores = manifesto.get('relatorios', {})
+    if forcar or manifesto.get('plotly') != plotly.__version__:
+        anteriores = {}
+
+    # Biblioteca de gráficos compartilhada pelos relatórios (gravada uma vez por versão do plotly)
+    caminho_plotly = os.path.join(pasta_saida, ARQUIVO_PLOTLY)
+    if not anteriores or not os.path.exists(caminho_plotly):
+        _gravar(caminho_plotly, get_plotlyjs())
+
+    somas = agregar(conjunto.df)
+    atuais, tarefas = {}, []
+    for filtros in recortes(conjunto.df, incluir_municipios):
+        visao = visao_recorte(somas, filtros)
+        arquivo = nome_relatorio(filtros)
+        atuais[arquivo] = {'recorte': list(filtros[:2]), 'hash': hash_visao(visao)}
+        caminho = os.path.join(pasta_saida, arquivo)
+        if anteriores.get(arquivo, {}).get('hash') != atuais[arquivo]['hash'] or not os.path.exists(caminho):
+            tarefas.append((filtros, visao, data_dados, caminho))
+
+    if workers > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tarefas))) as executor:
+            list(executor.map(gerar_relatorio, tarefas))
+    else:
+        list(map(gerar_relatorio, tarefas))
+
+    removidos = [arquivo for arquivo in anteriores if arquivo not in atuais]
+    for arquivo in removidos:
+        if os.path.exists(os.path.join(pasta_saida, arquivo)):
+            os.remove(os.path.join(pasta_saida, arquivo))
+
+    _gravar(os.path.join(pasta_saida, 'index.html'), _indice(atuais, data_dados))
+    _gravar(os.path.join(pasta_saida, ARQUIVO_MANIFESTO),
+            json.dumps({'plotly': plotly.__version__, 'versao_dados': conjunto.versao, 'relatorios': atuais},
+                       ensure_ascii=False, indent=1))
+    return {'gerados': len(tarefas), 'inalterados': len(atuais) - len(tarefas), 'removidos': len(removidos)}
+
+
+def _indice(relatorios, data_dados):
+    itens = []
+    for arquivo, info in relatorios.items():
+        direc, municipio = info['recorte']
+        rotulo = direc if municipio == 'Todos' else f"{municipio} ({direc})"
+        itens.append(f"<li><a href='{html.escape(arquivo)}'>{html.escape(rotulo)}</a></li>")
+    return _pagina("Relatórios de lançamento de notas", [
+        "<h1>Relatórios de lançamento de notas</h1>",
+        f"<p>Dados de {html.escape(data_dados)}.</p>",
+        "<ul>", *itens, "</ul>"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Gera um relatório HTML estático da página de lançamento por DIREC (e por município).")
+    parser.add_argument('--dados', default=ARQUIVO_ESCOLA, help="Arquivo df_escola.parquet.")
+    parser.add_argument('--saida', default=PASTA_SAIDA_PADRAO, help="Pasta dos relatórios.")
+    parser.add_argument('--municipios', action='store_true', help="Gera também um relatório por município.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Quantidade de processos que montam os relatórios em paralelo.")
+    parser.add_argument('--forcar', action='store_true', help="Refaz todos os relatórios, mesmo os inalterados.")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultado = gerar_relatorios(args.dados, args.saida, args.municipios, args.workers, args.forcar)
+    print(f"{resultado['gerados']} relatórios gerados, {resultado['inalterados']} inalterados, "
+          f"{resultado['removidos']} removidos; em {args.saida} ({time.perf_counter() - inicio:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
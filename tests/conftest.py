@@ -0,0 +1,40 @@
+# Dados pequenos, montados em memória, usados pelos testes
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from consultas import BIMESTRES  # noqa: E402
+
+
+def linha_escola(direc, municipio, escola, inep, lancadas, nao_lancadas):
+    """Uma linha do df_escola, com as mesmas contagens em todos os bimestres se forem números."""
+    if not isinstance(lancadas, (list, tuple)):
+        lancadas = [lancadas] * len(BIMESTRES)
+    if not isinstance(nao_lancadas, (list, tuple)):
+        nao_lancadas = [nao_lancadas] * len(BIMESTRES)
+    linha = {'DIREC': direc, 'MUNICÍPIO': municipio, 'ESCOLA': escola, 'INEP ESCOLA': inep}
+    for b, lanc, nao in zip(BIMESTRES, lancadas, nao_lancadas):
+        linha[f'{b}_Notas Lancadas'] = lanc
+        linha[f'{b}_Notas Nao Lancadas'] = nao
+    return linha
+
+
+@pytest.fixture
+def df_escola():
+    """
+    df_escola com 2 DIRECs, 3 municípios e 4 escolas (a EE A tem duas linhas, uma por série).
+
+    A EE B e a EE C empatam no 1º bimestre (50% não lançadas); a EE D não tem registros no 4º.
+    """
+    return pd.DataFrame([
+        linha_escola('01ª DIREC - NATAL', 'NATAL', 'EE A', '24000001', 8, 2),
+        linha_escola('01ª DIREC - NATAL', 'NATAL', 'EE A', '24000001', 10, 0),
+        linha_escola('01ª DIREC - NATAL', 'NATAL', 'EE B', '24000002', 5, 5),
+        linha_escola('01ª DIREC - NATAL', 'EXTREMOZ', 'EE C', '24000003', [3, 6, 6, 6], [3, 0, 0, 0]),
+        linha_escola('02ª DIREC - PARNAMIRIM', 'PARNAMIRIM', 'EE D', '24000004',
+                     [1, 2, 3, 0], [9, 8, 7, 0]),
+    ])
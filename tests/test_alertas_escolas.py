@@ -0,0 +1,88 @@
+import json
+
+import pandas as pd
+import pytest
+
+from alertas_escolas import gravar_relatorios, limites_por_escola, main, sinalizar_escolas
+
+# NATAL: 1º = 40 (bimestre), 2º = 5 (DIREC no bimestre), 3º e 4º = 60 (padrão)
+# PARNAMIRIM: 3º = 65 (DIREC no bimestre), demais = 75 (padrão da DIREC)
+CONFIG = {'padrao': 60,
+          'bimestres': {'1': 40},
+          'direcs': {'01ª DIREC - NATAL': {'bimestres': {'2': 5}},
+                     '02ª DIREC - PARNAMIRIM': {'padrao': 75, 'bimestres': {'3': 65}}}}
+
+
+def nomes(escolas):
+    # 'EE A (cód. Inep: 24000001)' -> 'EE A'
+    return escolas.str.replace(r' \(cód\. Inep: \d+\)$', '', regex=True).tolist()
+
+
+def sinalizadas(tabela):
+    acima = tabela[tabela['Acima do limite']]
+    return dict(zip(nomes(acima['Escola']), acima['Bimestres acima do limite']))
+
+
+def test_limites_por_escola_prioridade():
+    tabela = pd.DataFrame({'DIREC': ['01ª DIREC - NATAL', '02ª DIREC - PARNAMIRIM', '03ª DIREC - NOVA CRUZ']})
+    assert [limites_por_escola(tabela, CONFIG, n).tolist() for n in (1, 2, 3, 4)] == [
+        [40, 75, 40], [5, 75, 60], [60, 65, 60], [60, 75, 60]]
+    assert limites_por_escola(tabela, {}, 1).tolist() == [10, 10, 10]
+
+
+def test_sinalizar_escolas_com_limites_por_bimestre_e_direc(df_escola):
+    # EE A: 10% em todos; EE B: 50% em todos; EE C: 50% só no 1º; EE D: 90/80/70% e nada no 4º
+    tabela = sinalizar_escolas(df_escola, CONFIG)
+    assert sinalizadas(tabela) == {'EE A': '2º', 'EE B': '1º, 2º', 'EE C': '1º', 'EE D': '1º, 2º, 3º'}
+    maior = dict(zip(nomes(tabela['Escola']), tabela['Maior % acima do limite']))
+    assert maior == {'EE A': 10, 'EE B': 50, 'EE C': 50, 'EE D': 90}
+
+
+def test_limite_igual_ao_percentual_nao_sinaliza(df_escola):
+    # com o limite padrão de 10%, a EE A (10%) não passa do limite
+    tabela = sinalizar_escolas(df_escola, {})
+    assert sinalizadas(tabela) == {'EE B': '1º, 2º, 3º, 4º', 'EE C': '1º', 'EE D': '1º, 2º, 3º'}
+    maior = dict(zip(nomes(tabela['Escola']), tabela['Maior % acima do limite']))
+    assert pd.isna(maior['EE A'])
+
+
+def test_so_os_bimestres_escolhidos(df_escola):
+    tabela = sinalizar_escolas(df_escola, CONFIG, bimestres=(3, 4))
+    assert sinalizadas(tabela) == {'EE D': '3º'}
+    assert '% Notas Não Lançadas - 3º Bimestre' in tabela.columns
+
+
+def test_gravar_relatorios_por_direc(df_escola, tmp_path):
+    tabela = sinalizar_escolas(df_escola, CONFIG, bimestres=(3, 4))
+    resumo = gravar_relatorios(tabela, str(tmp_path), 'csv', bimestres=(3, 4))
+    assert resumo.to_dict('records') == [
+        {'DIREC': '01ª DIREC - NATAL', 'Escolas': 3, 'Escolas acima do limite': 0,
+         'Arquivo': 'alertas_01a_DIREC_NATAL.csv'},
+        {'DIREC': '02ª DIREC - PARNAMIRIM', 'Escolas': 1, 'Escolas acima do limite': 1,
+         'Arquivo': 'alertas_02a_DIREC_PARNAMIRIM.csv'}]
+    # a DIREC sem escolas acima do limite também recebe o arquivo (vazio)
+    natal = pd.read_csv(tmp_path / 'alertas_01a_DIREC_NATAL.csv', sep=';', decimal=',', encoding='utf-8-sig')
+    assert natal.empty and list(natal.columns)[:3] == ['Posição', 'Município', 'Escola']
+    assert (tmp_path / 'resumo_alertas.csv').exists()
+
+
+def test_relatorio_ordenado_pelo_maior_percentual(df_escola, tmp_path):
+    gravar_relatorios(sinalizar_escolas(df_escola, CONFIG), str(tmp_path), 'csv')
+    natal = pd.read_csv(tmp_path / 'alertas_01a_DIREC_NATAL.csv', sep=';', decimal=',', encoding='utf-8-sig')
+    # EE B e EE C empatam em 50% (desempate pelo nome)
+    assert natal['Posição'].tolist() == [1, 2, 3]
+    assert nomes(natal['Escola']) == ['EE B', 'EE C', 'EE A']
+
+
+def test_main_com_config_e_limite(df_escola, tmp_path, capsys):
+    # --limite substitui só o padrão; os limites por bimestre e por DIREC do arquivo continuam valendo
+    dados = tmp_path / 'df_escola.parquet'
+    df_escola.to_parquet(dados, index=False)
+    config = tmp_path / 'limites.json'
+    config.write_text(json.dumps(CONFIG), encoding='utf8')
+    saida = tmp_path / 'alertas'
+    main(['--dados', str(dados), '--saida', str(saida), '--config', str(config), '--limite', '45',
+          '--bimestres', '3', '4'])
+    assert '2 de 4 escolas acima do limite' in capsys.readouterr().out
+    natal = pd.read_csv(saida / 'alertas_01a_DIREC_NATAL.csv', sep=';', decimal=',', encoding='utf-8-sig')
+    assert nomes(natal['Escola']) == ['EE B']
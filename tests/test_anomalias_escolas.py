@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomalias_escolas import MINIMO_REFERENCIA, escolas_atipicas, intervalo_wilson, pontuar_escolas
+from conftest import linha_escola
+
+
+def escola(direc, municipio, nome, inep, nao_lancadas, total):
+    return linha_escola(direc, municipio, nome, inep, total - nao_lancadas, nao_lancadas)
+
+
+@pytest.fixture
+def df_referencias():
+    """
+    DIREC A: município GRANDE (3 escolas a 30%, uma escola de 1 registro e uma grande a 40%) e
+    município PEQUENO (uma escola só); DIREC B: duas escolas pequenas, com menos de
+    MINIMO_REFERENCIA registros na DIREC.
+    """
+    return pd.DataFrame([
+        escola('DIREC A', 'GRANDE', 'R1', '1', 30, 100),
+        escola('DIREC A', 'GRANDE', 'R2', '2', 30, 100),
+        escola('DIREC A', 'GRANDE', 'R3', '3', 30, 100),
+        escola('DIREC A', 'GRANDE', 'MINUSCULA', '4', 1, 1),
+        escola('DIREC A', 'GRANDE', 'GRANDE', '5', 400, 1000),
+        escola('DIREC A', 'PEQUENO', 'UNICA', '6', 50, 100),
+        escola('DIREC B', 'MB', 'Q1', '7', 5, 50),
+        escola('DIREC B', 'MB', 'Q2', '8', 5, 50),
+    ])
+
+
+def pontuacao_1b(df):
+    pontuacao = pontuar_escolas(df)
+    return pontuacao[pontuacao['BIMESTRE'] == '1B'].set_index('INEP ESCOLA')
+
+
+def test_intervalo_wilson():
+    minimo, maximo = intervalo_wilson([0, 5, 1, 0], [10, 10, 1, 0])
+    np.testing.assert_allclose(minimo[:3], [0.0, 0.2366, 0.2065], atol=1e-4)
+    np.testing.assert_allclose(maximo[:3], [0.2775, 0.7634, 1.0], atol=1e-4)
+    assert np.isnan(minimo[3]) and np.isnan(maximo[3])
+
+
+def test_cadeia_de_referencias(df_referencias):
+    assert MINIMO_REFERENCIA == 200
+    pontuacao = pontuacao_1b(df_referencias)
+    assert pontuacao['Referência'].astype(str).to_dict() == {
+        '1': 'Município', '2': 'Município', '3': 'Município', '4': 'Município', '5': 'Município',
+        # município sem outras escolas: as demais da DIREC
+        '6': 'DIREC',
+        # DIREC com menos de MINIMO_REFERENCIA registros nas demais escolas: o estado
+        '7': 'Estado', '8': 'Estado',
+    }
+    # DIREC A sem a UNICA: 491 de 1.301; estado sem a Q1: 546 de 1.451
+    assert pontuacao.loc['6', '% Referência'] == round(491 / 1301 * 100, 1)
+    assert pontuacao.loc['7', '% Referência'] == round(546 / 1451 * 100, 1)
+    # referências grandes: o limite é o próprio percentual
+    assert (pontuacao['Limite da Referência'] == pontuacao['% Referência']).all()
+
+
+def test_escola_pequena_nao_e_atipica(df_referencias):
+    # 1 de 1 nota faltando (100%) não basta; 40% em 1.000 registros, contra 30%, basta
+    pontuacao = pontuacao_1b(df_referencias)
+    assert pontuacao.loc['4', '% Não Lançadas'] == 100.0
+    assert not pontuacao.loc['4', 'Atípica']
+    assert pontuacao.loc['5', 'Atípica']
+    assert pontuacao.loc['6', 'Atípica']
+    assert not pontuacao.loc[['1', '2', '3', '7', '8'], 'Atípica'].any()
+    # ordenado pela pontuação
+    assert pontuacao['Excesso (p.p.)'].is_monotonic_decreasing
+
+
+def test_referencia_pequena_usa_o_seu_limite_superior():
+    # Só duas escolas de 10 registros: a referência da E1 (a E2, 0 de 10) também é incerta
+    df = pd.DataFrame([escola('DIREC A', 'M1', 'E1', '1', 5, 10), escola('DIREC B', 'M2', 'E2', '2', 0, 10)])
+    pontuacao = pontuacao_1b(df)
+    assert pontuacao.loc['1', 'Referência'] == 'Estado'
+    assert pontuacao.loc['1', '% Referência'] == 0.0
+    assert pontuacao.loc['1', 'Limite da Referência'] == 27.8
+    assert pontuacao.loc['1', 'Excesso (p.p.)'] == round(23.66 - 27.75, 1)
+    assert not pontuacao['Atípica'].any()
+
+
+def test_bimestre_sem_registros_fica_de_fora(df_escola):
+    pontuacao = pontuar_escolas(df_escola)
+    assert len(pontuacao[pontuacao['BIMESTRE'] == '4B']) == 3
+    assert '24000004' not in pontuacao.loc[pontuacao['BIMESTRE'] == '4B', 'INEP ESCOLA'].tolist()
+
+
+def test_escolas_atipicas_filtra_o_recorte(df_referencias):
+    pontuacao = pontuar_escolas(df_referencias)
+    assert escolas_atipicas(pontuacao, '2B')['INEP ESCOLA'].tolist() == ['5', '6']
+    assert escolas_atipicas(pontuacao, '2B', municipio='GRANDE')['INEP ESCOLA'].tolist() == ['5']
+    assert escolas_atipicas(pontuacao, '2B', direc='DIREC B').empty
+    assert len(escolas_atipicas(pontuacao, '2B', direc='DIREC B', somente_atipicas=False)) == 2
+    assert escolas_atipicas(pontuacao, '2B', inep='4', somente_atipicas=False)['Escola'].tolist() == [
+        'MINUSCULA (cód. Inep: 4)']
@@ -0,0 +1,164 @@
+import http.client
+import json
+import os
+import threading
+
+import pyarrow.ipc as ipc
+import pytest
+
+import api_dados
+from api_dados import CacheRespostas, Resposta, ServidorApi, TIPO_ARROW, parametros_da_consulta
+from publicacao_dados import MonitorDados
+
+
+def gravar_base(df, caminho, deslocamento=0):
+    df.assign(**{'INEP ESCOLA': df['INEP ESCOLA'].astype('int64')}).to_parquet(caminho, index=False)
+    mtime = 1_700_000_000 + deslocamento  # o monitor compara a data de modificação
+    os.utime(caminho, (mtime, mtime))
+
+
+@pytest.fixture
+def caminho_escola(df_escola, tmp_path):
+    caminho = str(tmp_path / 'df_escola.parquet')
+    gravar_base(df_escola, caminho)
+    return caminho
+
+
+@pytest.fixture
+def servidor(caminho_escola):
+    servidor = ServidorApi(('127.0.0.1', 0), MonitorDados(caminho_escola, intervalo=3600))
+    thread = threading.Thread(target=servidor.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def requisitar(servidor, caminho, metodo='GET', **cabecalhos):
+    conexao = http.client.HTTPConnection(*servidor.server_address[:2], timeout=10)
+    try:
+        conexao.request(metodo, caminho, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        return resposta.status, dict(resposta.getheaders()), resposta.read()
+    finally:
+        conexao.close()
+
+
+def test_resumo_em_json(servidor):
+    status, cabecalhos, corpo = requisitar(servidor, '/resumo?direc=01%C2%AA%20DIREC%20-%20NATAL')
+    assert status == 200 and cabecalhos['Content-Type'] == api_dados.TIPO_JSON
+    assert cabecalhos['X-Versao-Dados'] == str(servidor.monitor.atual.versao)
+    registros = json.loads(corpo)
+    assert len(registros) == 4 and int(cabecalhos['Content-Length']) == len(corpo)
+
+
+def test_ranking_em_arrow(servidor):
+    status, cabecalhos, corpo = requisitar(servidor, '/ranking?ordenar_por=4&top_k=2', Accept=TIPO_ARROW)
+    assert status == 200 and cabecalhos['Content-Type'] == TIPO_ARROW
+    tabela = ipc.open_stream(corpo).read_all().to_pandas()
+    # no 4º bimestre, a EE B (50%) vem à frente das escolas com 0%
+    assert len(tabela) == 2 and tabela['Escola'].iloc[0].startswith('EE B')
+
+
+def test_filtro_por_inep(servidor):
+    _, _, por_inep = requisitar(servidor, '/ranking?inep=24000003')
+    _, _, por_filtros = requisitar(servidor, '/ranking?direc=01%C2%AA%20DIREC%20-%20NATAL&municipio=EXTREMOZ')
+    assert json.loads(por_inep) == json.loads(por_filtros)
+
+
+def test_etag_e_304(servidor):
+    _, cabecalhos, corpo = requisitar(servidor, '/direc?bimestre=2')
+    etag = cabecalhos['ETag']
+    status, cabecalhos_304, corpo_304 = requisitar(servidor, '/direc?bimestre=2', **{'If-None-Match': etag})
+    assert status == 304 and corpo_304 == b''
+    assert cabecalhos_304['ETag'] == etag and 'Content-Length' not in cabecalhos_304
+    # outro ETag (ou uma lista sem o atual) recebe a resposta inteira; '*' vale para qualquer um
+    assert requisitar(servidor, '/direc?bimestre=2', **{'If-None-Match': '"outro"'})[0] == 200
+    assert requisitar(servidor, '/direc?bimestre=2', **{'If-None-Match': f'"outro", {etag}'})[0] == 304
+    assert requisitar(servidor, '/direc?bimestre=2', **{'If-None-Match': '*'})[0] == 304
+
+
+def test_head_sem_corpo(servidor):
+    _, cabecalhos_get, corpo = requisitar(servidor, '/resumo')
+    status, cabecalhos, corpo_head = requisitar(servidor, '/resumo', metodo='HEAD')
+    assert status == 200 and corpo_head == b''
+    assert cabecalhos['ETag'] == cabecalhos_get['ETag'] and int(cabecalhos['Content-Length']) == len(corpo)
+
+
+def test_nova_versao_muda_o_etag_e_descarta_o_cache(servidor, df_escola, caminho_escola):
+    _, antes, _ = requisitar(servidor, '/resumo')
+    assert len(servidor.respostas) == 1
+
+    df_escola.loc[df_escola['ESCOLA'] == 'EE B', '1B_Notas Lancadas'] = 10
+    gravar_base(df_escola, caminho_escola, deslocamento=60)
+    assert not servidor.monitor.verificar()  # a assinatura precisa se repetir
+    assert servidor.monitor.verificar()
+    assert len(servidor.respostas) == 0
+
+    status, depois, _ = requisitar(servidor, '/resumo', **{'If-None-Match': antes['ETag']})
+    assert status == 200
+    assert depois['ETag'] != antes['ETag'] and depois['X-Versao-Dados'] != antes['X-Versao-Dados']
+
+
+@pytest.mark.parametrize('caminho', ['/direc', '/direc?bimestre=1', '/direc?bimestre=1&bimestre=1',
+                                     '/direc?bimestre=1&_=123', '/direc?bimestre=1&formato=json'])
+def test_consultas_equivalentes_usam_a_mesma_resposta(servidor, caminho):
+    requisitar(servidor, '/direc')
+    requisitar(servidor, caminho)
+    assert len(servidor.respostas) == 1
+    assert servidor.respostas.acertos == 1
+
+
+def test_inep_ignora_direc_e_municipio_na_chave(servidor):
+    requisitar(servidor, '/resumo?inep=24000001')
+    requisitar(servidor, '/resumo?inep=%2024000001&direc=01%C2%AA%20DIREC%20-%20NATAL')
+    assert len(servidor.respostas) == 1
+
+
+@pytest.mark.parametrize('caminho, mensagem', [
+    ('/resumo?bimestre=9', 'parâmetro bimestre não se aplica à rota /resumo'),
+    ('/resumo?bimestre=2', 'parâmetro bimestre não se aplica à rota /resumo'),
+    ('/direc?top_k=5', 'parâmetro top_k não se aplica à rota /direc'),
+    ('/direc?bimestre=5', 'bimestre deve ser um número de 1 a 4'),
+    ('/ranking?ordenar_por=0', 'ordenar_por deve ser um número de 1 a 4'),
+    ('/ranking?top_k=0', 'top_k deve ser um inteiro positivo'),
+    ('/ranking?top_k=-3', 'top_k deve ser um inteiro positivo'),
+    ('/resumo?formato=csv', 'formato deve ser json ou arrow'),
+])
+def test_parametros_invalidos_sao_recusados_sem_entrar_no_cache(servidor, caminho, mensagem):
+    status, _, corpo = requisitar(servidor, caminho)
+    assert status == 400 and json.loads(corpo)['erro'] == mensagem
+    assert len(servidor.respostas) == 0
+
+
+@pytest.mark.parametrize('caminho', ['/ranking?inep=99999999', '/resumo?direc=DIREC%20INEXISTENTE',
+                                     '/resumo?municipio=MOSSOR%C3%93', '/inexistente'])
+def test_nao_encontrado(servidor, caminho):
+    status, _, corpo = requisitar(servidor, caminho)
+    assert status == 404 and 'erro' in json.loads(corpo)
+    assert len(servidor.respostas) == 0
+
+
+def test_versao(servidor):
+    status, _, corpo = requisitar(servidor, '/versao/')
+    assert status == 200 and json.loads(corpo)['escolas'] == 4
+
+
+def test_parametros_da_consulta():
+    assert parametros_da_consulta('/ranking', {'top_k': ['5'], 'ordenar_por': ['2'], 'x': ['1']}) == {
+        'direc': 'Todas', 'municipio': 'Todos', 'ordenar_por': 2, 'top_k': 5}
+    assert parametros_da_consulta('/direc', {'inep': [''], 'direc': ['D']}) == {
+        'direc': 'D', 'municipio': 'Todos', 'bimestre': 1}
+    assert set(api_dados.PARAMETROS_ROTA) == set(api_dados.ROTAS)
+
+
+def test_cache_respostas_limite_de_memoria():
+    cache = CacheRespostas(limite_memoria=10)
+    for i in range(3):
+        cache.guardar((1, i), Resposta(b'12345', 'x', str(i), 1))
+    cache.obter((1, 1))
+    cache.guardar((1, 3), Resposta(b'12345', 'x', '3', 1))
+    assert len(cache) == 2 and cache.memoria == 10
+    assert cache.obter((1, 1)) is not None and cache.obter((1, 0)) is None
+    cache.descartar_versoes_antigas(2)
+    assert len(cache) == 0 and cache.memoria == 0
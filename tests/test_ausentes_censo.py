@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from ausentes_censo import (COLUNA_BUSCA, COLUNAS_ESCOLA, NAO_IDENTIFICADA, contar_ausentes, pagina_ausentes,
+                            preparar_ausentes, salvar_ausentes)
+from consultas_sql import conectar
+
+
+@pytest.fixture
+def df_censo():
+    return pd.DataFrame({
+        'INEP': [24000004.0, 24000001.0, 99999999.0],
+        'NOME': ['JOSÉ DA SILVA', 'ANA SOUZA', 'MARIA LIMA'],
+        'CPF': ['123.456.789-01', '98765432100', '11122233344'],
+    })
+
+
+def test_preparar_ausentes(df_censo, df_escola):
+    df = preparar_ausentes(df_censo, df_escola)
+    assert list(df.columns) == COLUNAS_ESCOLA + ['NOME', 'CPF', COLUNA_BUSCA]
+    assert df['INEP ESCOLA'].tolist() == ['24000001', '24000004', '99999999']
+    assert df['DIREC'].tolist() == ['01ª DIREC - NATAL', '02ª DIREC - PARNAMIRIM', NAO_IDENTIFICADA]
+    assert df['MUNICÍPIO'].tolist() == ['NATAL', 'PARNAMIRIM', NAO_IDENTIFICADA]
+    assert df['ESCOLA'].tolist() == ['EE A', 'EE D', '']
+    assert df['CPF'].tolist() == ['***.654.321-**', '***.456.789-**', '***.222.333-**']
+    assert df[COLUNA_BUSCA].iloc[1] == 'JOSE DA SILVA EE D 24000004'
+
+
+@pytest.mark.parametrize('colunas_censo', [
+    {'MUNICÍPIO': ['Parnamirim', 'Natal', 'Mossoró'], 'ESCOLA': ['E. E. D', 'E. E. A', 'E. E. X']},
+    {'DIREC': ['2', '1', '12'], 'MUNICÍPIO': ['Parnamirim', 'Natal', 'Mossoró'],
+     'ESCOLA': ['E. E. D', 'E. E. A', 'E. E. X']},
+])
+def test_preparar_ausentes_censo_com_colunas_de_escola(df_censo, df_escola, colunas_censo):
+    # As colunas de escola do Censo não duplicam (_x / _y) as do df_escola: valem as do df_escola
+    df = preparar_ausentes(df_censo.assign(**colunas_censo), df_escola)
+    assert list(df.columns) == COLUNAS_ESCOLA + ['NOME', 'CPF', COLUNA_BUSCA]
+    assert df['DIREC'].tolist() == ['01ª DIREC - NATAL', '02ª DIREC - PARNAMIRIM', NAO_IDENTIFICADA]
+    assert df['MUNICÍPIO'].tolist() == ['NATAL', 'PARNAMIRIM', NAO_IDENTIFICADA]
+    assert df['ESCOLA'].tolist() == ['EE A', 'EE D', '']
+
+
+def test_preparar_ausentes_inep_com_o_nome_do_df_escola(df_censo, df_escola):
+    df_censo = df_censo.drop(columns='INEP').assign(**{'INEP ESCOLA': ['24000001', '24000004', '24000002']})
+    df = preparar_ausentes(df_censo, df_escola)
+    assert list(df.columns) == COLUNAS_ESCOLA + ['NOME', 'CPF', COLUNA_BUSCA]
+    assert df['INEP ESCOLA'].tolist() == ['24000001', '24000002', '24000004']
+    assert df['ESCOLA'].tolist() == ['EE A', 'EE B', 'EE D']
+
+
+@pytest.fixture
+def caminho_ausentes(df_escola, tmp_path):
+    # 1.000 ausentes distribuídos pelas escolas do df_escola (em vários blocos do .parquet)
+    n = 1000
+    df_censo = pd.DataFrame({
+        'INEP': [24000001, 24000002, 24000003, 24000004] * (n // 4),
+        'NOME': [f'ESTUDANTE {i:04d}' for i in range(n)],
+        'CPF': [f'{i:011d}' for i in range(n)],
+    })
+    caminho = str(tmp_path / 'ausentes.parquet')
+    salvar_ausentes(df_censo, df_escola, caminho)
+    return caminho
+
+
+def test_paginas_cobrem_o_recorte(caminho_ausentes):
+    con = conectar(threads=2)
+    total = contar_ausentes(con, direc='01ª DIREC - NATAL', caminho=caminho_ausentes)
+    paginas = [pagina_ausentes(con, direc='01ª DIREC - NATAL', pagina=p, tamanho_pagina=100, caminho=caminho_ausentes)
+               for p in range(1, 10)]
+    assert total == 750
+    assert [len(p) for p in paginas] == [100] * 7 + [50, 0]
+    assert pd.concat(paginas)['NOME'].is_unique
+    assert contar_ausentes(con, busca='estudante 0042', caminho=caminho_ausentes) == 1
+
+
+def test_paginas_em_paralelo_na_mesma_conexao(caminho_ausentes):
+    # As sessões do painel consultam pela mesma conexão ao mesmo tempo: cada consulta tem o seu
+    # cursor, e nenhuma página recebe o resultado de outra
+    con = conectar(threads=2)
+    pedidos = [(direc, pagina) for direc in ('Todas', '01ª DIREC - NATAL', '02ª DIREC - PARNAMIRIM')
+               for pagina in range(1, 11)] * 4
+    consultar = lambda pedido: (contar_ausentes(con, direc=pedido[0], caminho=caminho_ausentes),
+                                pagina_ausentes(con, direc=pedido[0], pagina=pedido[1], tamanho_pagina=50,
+                                                caminho=caminho_ausentes))
+    esperado = [consultar(pedido) for pedido in pedidos]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        obtido = list(executor.map(consultar, pedidos))
+
+    for (total, pagina), (total_esperado, pagina_esperada) in zip(obtido, esperado):
+        assert total == total_esperado
+        pd.testing.assert_frame_equal(pagina, pagina_esperada)
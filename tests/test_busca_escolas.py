@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from busca_escolas import IndiceEscolas, escola_por_inep, normalizar
+from conftest import linha_escola
+
+
+@pytest.fixture
+def indice():
+    df = pd.DataFrame([
+        linha_escola('01ª DIREC - NATAL', 'NATAL', 'ESCOLA ESTADUAL PROFESSOR JOÃO TIBÚRCIO', '24000001', 1, 0),
+        linha_escola('01ª DIREC - NATAL', 'NATAL', 'ESCOLA ESTADUAL PROFESSOR JOÃO TIBÚRCIO', '24000001', 2, 0),
+        linha_escola('01ª DIREC - NATAL', 'NATAL', 'ESCOLA ESTADUAL JOAQUIM NABUCO', '24000002', 1, 0),
+        linha_escola('01ª DIREC - NATAL', 'EXTREMOZ', 'E.E. Profª. Maria José', '24000003', 1, 0),
+        linha_escola('02ª DIREC - PARNAMIRIM', 'PARNAMIRIM', 'CENTRO ESTADUAL 24000001', '24000004', 1, 0),
+    ])
+    df['ESCOLA_FORMATADA'] = df['ESCOLA'] + " (cód. Inep: " + df['INEP ESCOLA'] + ")"
+    return IndiceEscolas(df)
+
+
+def nomes(resultado):
+    return [escola['ESCOLA'] for escola in resultado]
+
+
+def test_uma_entrada_por_escola(indice):
+    assert len(indice) == 4
+
+
+def test_normalizar():
+    assert normalizar('E.E. Profª. Maria-José') == 'E E  PROFA  MARIA JOSE'
+
+
+def test_busca_por_prefixos(indice):
+    # todas as palavras digitadas precisam ser início de alguma palavra do nome
+    assert nomes(indice.buscar('est prof jo')) == ['ESCOLA ESTADUAL PROFESSOR JOÃO TIBÚRCIO']
+    assert nomes(indice.buscar('jo')) == ['E.E. Profª. Maria José', 'ESCOLA ESTADUAL JOAQUIM NABUCO',
+                                          'ESCOLA ESTADUAL PROFESSOR JOÃO TIBÚRCIO']
+    assert indice.buscar('estadual inexistente') == []
+    assert indice.buscar('  ...  ') == []
+
+
+def test_busca_sem_acentos_e_maiusculas(indice):
+    assert nomes(indice.buscar('joão tiburcio')) == nomes(indice.buscar('JOAO TIBÚRCIO')) == [
+        'ESCOLA ESTADUAL PROFESSOR JOÃO TIBÚRCIO']
+    assert nomes(indice.buscar('profª maria')) == ['E.E. Profª. Maria José']
+
+
+def test_palavras_completas_primeiro(indice):
+    # 'jose' é palavra completa só na escola da Maria José; 'joaquim' e 'joão' só começam com 'jo'
+    assert nomes(indice.buscar('jose'))[0] == 'E.E. Profª. Maria José'
+    assert nomes(indice.buscar('estadual'))[0] == 'CENTRO ESTADUAL 24000001'
+
+
+def test_inep_completo_vem_primeiro(indice):
+    # o código também está no nome de outra escola, mas a escola com esse INEP vem antes
+    resultado = indice.buscar(' 24000001 ')
+    assert [escola['INEP ESCOLA'] for escola in resultado] == ['24000001', '24000004']
+    assert resultado[0]['ESCOLA_FORMATADA'] == 'ESCOLA ESTADUAL PROFESSOR JOÃO TIBÚRCIO (cód. Inep: 24000001)'
+
+
+def test_busca_por_prefixo_do_inep(indice):
+    assert len(indice.buscar('2400000')) == 4
+
+
+def test_limite(indice):
+    assert len(indice.buscar('e', limite=2)) == 2
+    assert [escola['INEP ESCOLA'] for escola in indice.buscar('24000001', limite=1)] == ['24000001']
+
+
+def test_escola_por_inep(indice):
+    assert escola_por_inep(indice, ' 24000003')['MUNICÍPIO'] == 'EXTREMOZ'
+    assert escola_por_inep(indice, 99999999) is None
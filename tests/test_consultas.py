@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from consultas import (aplicar_filtros, percentuais_direc, ranking_escolas, resumo_lancamento, tabela_direc,
+                       totais_bimestres, totais_por_direc, totais_por_escola)
+
+TODOS = ('Todas', 'Todos', 'Todas')
+ORDEM_1B = '% Notas Não Lançadas - 1º Bimestre'
+
+
+# aplicar_filtros
+
+def test_aplicar_filtros_sem_filtro_devolve_todas_as_linhas(df_escola):
+    df_filtrado = aplicar_filtros(df_escola, *TODOS)
+    assert len(df_filtrado) == len(df_escola)
+    assert df_filtrado['ESCOLA_FORMATADA'].iloc[0] == 'EE A (cód. Inep: 24000001)'
+    assert 'ESCOLA_FORMATADA' not in df_escola.columns  # não altera a base recebida
+
+
+@pytest.mark.parametrize('filtros, escolas', [
+    (('01ª DIREC - NATAL', 'Todos', 'Todas'), ['EE A', 'EE A', 'EE B', 'EE C']),
+    (('01ª DIREC - NATAL', 'NATAL', 'Todas'), ['EE A', 'EE A', 'EE B']),
+    (('01ª DIREC - NATAL', 'NATAL', 'EE A (cód. Inep: 24000001)'), ['EE A', 'EE A']),
+    (('Todas', 'EXTREMOZ', 'Todas'), ['EE C']),
+    (('Todas', 'Todos', 'EE D (cód. Inep: 24000004)'), ['EE D']),
+])
+def test_aplicar_filtros_combina_os_filtros(df_escola, filtros, escolas):
+    assert aplicar_filtros(df_escola, *filtros)['ESCOLA'].tolist() == escolas
+
+
+@pytest.mark.parametrize('filtros', [
+    ('02ª DIREC - PARNAMIRIM', 'NATAL', 'Todas'),          # município de outra DIREC
+    ('01ª DIREC - NATAL', 'Todos', 'EE D (cód. Inep: 24000004)'),
+    ('Todas', 'Todos', 'EE A (cód. Inep: 99999999)'),      # INEP de outra escola
+    ('DIREC INEXISTENTE', 'Todos', 'Todas'),
+])
+def test_aplicar_filtros_recorte_vazio(df_escola, filtros):
+    df_filtrado = aplicar_filtros(df_escola, *filtros)
+    assert df_filtrado.empty
+    assert list(df_filtrado.columns) == list(df_escola.columns) + ['ESCOLA_FORMATADA']
+
+
+def test_aplicar_filtros_usa_escola_formatada_existente(df_escola):
+    df = df_escola.assign(ESCOLA_FORMATADA=['X', 'X', 'Y', 'Z', 'W'])
+    assert aplicar_filtros(df, 'Todas', 'Todos', 'X')['ESCOLA'].tolist() == ['EE A', 'EE A']
+
+
+# resumo_lancamento
+
+def test_resumo_lancamento(df_escola):
+    resumo = resumo_lancamento(totais_bimestres(df_escola, *TODOS))
+    assert list(resumo.columns) == ['Bimestre', 'Notas Lançadas', 'Notas Não Lançadas', 'Total de Registros',
+                                    '% Lançadas', '% Não Lançadas']
+    assert resumo['Bimestre'].tolist() == ['1º Bimestre', '2º Bimestre', '3º Bimestre', '4º Bimestre']
+    assert resumo['Notas Lançadas'].tolist() == [27, 31, 32, 29]
+    assert resumo['Notas Não Lançadas'].tolist() == [19, 15, 14, 7]
+    assert resumo['Total de Registros'].tolist() == [46, 46, 46, 36]
+    assert resumo['% Lançadas'].tolist() == [58.7, 67.4, 69.6, 80.6]
+    assert resumo['% Não Lançadas'].tolist() == [41.3, 32.6, 30.4, 19.4]
+
+
+def test_resumo_lancamento_bimestre_sem_registros(df_escola):
+    resumo = resumo_lancamento(totais_bimestres(df_escola, '02ª DIREC - PARNAMIRIM', 'Todos', 'Todas'))
+    assert resumo['Total de Registros'].tolist() == [10, 10, 10, 0]
+    assert resumo['% Não Lançadas'].tolist()[:3] == [90.0, 80.0, 70.0]
+    assert np.isnan(resumo['% Lançadas'].iloc[3]) and np.isnan(resumo['% Não Lançadas'].iloc[3])
+
+
+def test_resumo_lancamento_recorte_vazio(df_escola):
+    resumo = resumo_lancamento(totais_bimestres(df_escola, 'DIREC INEXISTENTE', 'Todos', 'Todas'))
+    assert resumo['Total de Registros'].tolist() == [0, 0, 0, 0]
+    assert resumo['% Lançadas'].isna().all()
+
+
+# tabela_direc
+
+def test_tabela_direc(df_escola):
+    tabela = tabela_direc(percentuais_direc(totais_por_direc(df_escola, *TODOS, bimestre='1B')))
+    esperado = pd.DataFrame({
+        'DIREC': ['01ª DIREC - NATAL', '02ª DIREC - PARNAMIRIM'],
+        'Total de Registros': [36, 10],
+        'Notas Lançadas': [26, 1],
+        'Notas Não Lançadas': [10, 9],
+        '% Lançadas': [72.2, 10.0],
+        '% Não Lançadas': [27.8, 90.0],
+    })
+    pd.testing.assert_frame_equal(tabela, esperado, check_dtype=False)
+
+
+def test_tabela_direc_recorte(df_escola):
+    tabela = tabela_direc(percentuais_direc(totais_por_direc(df_escola, 'Todas', 'EXTREMOZ', 'Todas', '2B')))
+    assert tabela.to_dict('records') == [{
+        'DIREC': '01ª DIREC - NATAL', 'Total de Registros': 6, 'Notas Lançadas': 6, 'Notas Não Lançadas': 0,
+        '% Lançadas': 100.0, '% Não Lançadas': 0.0}]
+
+
+# ranking_escolas
+
+def test_ranking_escolas_sem_ordenacao_mantem_a_ordem(df_escola):
+    ranking = ranking_escolas(totais_por_escola(df_escola, *TODOS))
+    assert list(ranking.columns) == ['DIREC', 'Município', 'Escola'] + [
+        f'% Notas Não Lançadas - {n}º Bimestre' for n in range(1, 5)]
+    assert ranking['Escola'].str[:4].tolist() == ['EE A', 'EE B', 'EE C', 'EE D']
+    assert ranking[ORDEM_1B].tolist() == [10.0, 50.0, 50.0, 90.0]
+    assert ranking['% Notas Não Lançadas - 4º Bimestre'].tolist() == [10.0, 50.0, 0.0, 0.0]  # EE D sem registros
+
+
+def test_ranking_escolas_empates_na_ordem_original(df_escola):
+    ranking = ranking_escolas(totais_por_escola(df_escola, *TODOS), ordenar_por=ORDEM_1B)
+    assert ranking['Escola'].str[:4].tolist() == ['EE D', 'EE B', 'EE C', 'EE A']
+
+
+@pytest.mark.parametrize('top_k, escolas', [
+    (0, []),
+    (1, ['EE D']),
+    (2, ['EE D', 'EE B']),                   # o empate no limite fica com a primeira escola
+    (4, ['EE D', 'EE B', 'EE C', 'EE A']),
+    (10, ['EE D', 'EE B', 'EE C', 'EE A']),  # maior que a quantidade de escolas
+])
+def test_ranking_escolas_top_k(df_escola, top_k, escolas):
+    df_totais = totais_por_escola(df_escola, *TODOS)
+    ranking = ranking_escolas(df_totais, ordenar_por=ORDEM_1B, top_k=top_k)
+    assert ranking['Escola'].str[:4].tolist() == escolas
+    # mesmo resultado que ordenar todas e cortar
+    pd.testing.assert_frame_equal(ranking, ranking_escolas(df_totais, ordenar_por=ORDEM_1B).head(top_k))
+
+
+def test_ranking_escolas_top_k_sem_ordenacao(df_escola):
+    ranking = ranking_escolas(totais_por_escola(df_escola, *TODOS), top_k=3)
+    assert ranking['Escola'].str[:4].tolist() == ['EE A', 'EE B', 'EE C']
+
+
+def test_ranking_escolas_recorte_vazio(df_escola):
+    ranking = ranking_escolas(totais_por_escola(df_escola, 'DIREC INEXISTENTE', 'Todos', 'Todas'),
+                              ordenar_por=ORDEM_1B, top_k=5)
+    assert ranking.empty
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from deduplicacao import ConjuntoHashes, Deduplicador, cpf_identificado, hash_registros
+
+
+def registros(*linhas):
+    # (CPF, INEP, série, componente, nota)
+    return pd.DataFrame(linhas, columns=['CPF PESSOA', 'INEP ESCOLA', 'SÉRIE', 'COMPONENTE CURRICULAR', '1B'])
+
+
+def test_conjunto_hashes_em_varios_blocos():
+    rng = np.random.default_rng(0)
+    valores = rng.permutation(np.unique(rng.integers(0, np.iinfo('uint64').max, 6000, dtype='uint64',
+                                                     endpoint=True)))[:5000]
+    conjunto = ConjuntoHashes()
+    # inserções de tamanhos variados: os blocos são intercalados como um contador binário
+    inicio = 0
+    for tamanho in [1, 7, 100, 3, 500, 1000, 2, 800]:
+        conjunto.adicionar(valores[inicio:inicio + tamanho])
+        inicio += tamanho
+    assert len(conjunto) == inicio
+    assert 1 < len(conjunto._blocos) <= np.log2(inicio) + 1
+    assert all((bloco[1:] > bloco[:-1]).all() for bloco in conjunto._blocos)
+
+    consulta = np.concatenate([valores[inicio:], valores[:inicio]])
+    presente = conjunto.contem(consulta)
+    assert not presente[:len(valores) - inicio].any()
+    assert presente[len(valores) - inicio:].all()
+    assert conjunto.nbytes == 8 * inicio
+
+
+def test_conjunto_hashes_vazio_e_extremos():
+    conjunto = ConjuntoHashes()
+    assert not conjunto.contem([0, 1]).any()
+    conjunto.adicionar([])
+    assert len(conjunto) == 0
+    conjunto.adicionar(np.array([0, np.iinfo('uint64').max], dtype='uint64'))
+    assert conjunto.contem(np.array([np.iinfo('uint64').max, 5, 0], dtype='uint64')).tolist() == [True, False, True]
+
+
+def test_hash_normaliza_a_chave():
+    df = registros(('123.456.789-01', ' 24000001', '1ª série', 'Matemática ', 5.0),
+                   ('12345678901', '24000001', '1ª SÉRIE', 'Matemática', 7.0),
+                   ('2345678901', '24000001', '1ª SÉRIE', 'Matemática', 7.0),
+                   ('02345678901', '24000001', '1ª SÉRIE', 'Matemática', 7.0),
+                   ('12345678901', '24000001', '1ª SÉRIE', 'Biologia', 7.0))
+    hashes = hash_registros(df)
+    assert hashes.dtype == np.uint64
+    assert hashes[0] == hashes[1] and hashes[2] == hashes[3]
+    assert len(set(hashes.tolist())) == 3
+
+
+def test_deduplicador_mantem_o_arquivo_mais_recente():
+    recente = registros(('11111111111', '24000001', '1ª SÉRIE', 'Matemática', 8.0),
+                        ('22222222222', '24000001', '1ª SÉRIE', 'Matemática', 6.0),
+                        ('22222222222', '24000001', '1ª SÉRIE', 'Matemática', 6.5))
+    antigo = registros(('111.111.111-11', '24000001', '1ª série', 'Matemática', 3.0),
+                       ('33333333333', '24000001', '1ª SÉRIE', 'Matemática', 4.0))
+    mais_antigo = registros(('33333333333', '24000001', '1ª SÉRIE', 'Matemática', 1.0),
+                            ('11111111111', '24000002', '1ª SÉRIE', 'Matemática', 2.0))
+
+    deduplicador = Deduplicador()
+    resultado = pd.concat([deduplicador.filtrar(recente, 'recente.csv'),
+                           deduplicador.filtrar(antigo, 'antigo.csv'),
+                           deduplicador.filtrar(mais_antigo, 'mais_antigo.csv')])
+
+    assert resultado['1B'].tolist() == [8.0, 6.0, 4.0, 2.0]
+    assert deduplicador.duplicados_por_arquivo == {'recente.csv': 1, 'antigo.csv': 1, 'mais_antigo.csv': 1}
+    assert len(deduplicador.vistos) == 4
+
+
+@pytest.mark.parametrize('cpf', [np.nan, None, '', '   ', '000.000.000-00'])
+def test_deduplicador_mantem_linhas_sem_cpf(cpf):
+    # Estudantes diferentes sem CPF na mesma escola, série e componente não são o mesmo registro
+    recente = registros((cpf, '24000001', '1ª SÉRIE', 'Matemática', 8.0),
+                        (cpf, '24000001', '1ª SÉRIE', 'Matemática', 6.0),
+                        ('11111111111', '24000001', '1ª SÉRIE', 'Matemática', 5.0))
+    antigo = registros((cpf, '24000001', '1ª SÉRIE', 'Matemática', 4.0),
+                       ('11111111111', '24000001', '1ª SÉRIE', 'Matemática', 3.0))
+
+    deduplicador = Deduplicador()
+    resultado = pd.concat([deduplicador.filtrar(recente, 'recente.csv'), deduplicador.filtrar(antigo, 'antigo.csv')])
+
+    assert resultado['1B'].tolist() == [8.0, 6.0, 5.0, 4.0]
+    assert deduplicador.duplicados_por_arquivo == {'recente.csv': 0, 'antigo.csv': 1}
+    assert deduplicador.sem_cpf_por_arquivo == {'recente.csv': 2, 'antigo.csv': 1}
+    assert len(deduplicador.vistos) == 1
+
+
+def test_cpf_identificado():
+    df = registros(*[(cpf, '24000001', '1ª SÉRIE', 'Matemática', 0.0)
+                     for cpf in [np.nan, None, '', 'nan', '000.000.000-00', '12345678901', 12345678901, '1']])
+    assert cpf_identificado(df).tolist() == [False] * 5 + [True] * 3
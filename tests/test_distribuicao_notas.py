@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from distribuicao_notas import (COLUNAS_FAIXAS, LARGURA_FAIXA, MEDIA_MINIMA, combinar, estatisticas, faixa_inicial,
+                                histogramas, quantis)
+
+NOTAS = ['NOTA 1º BIMESTRE', 'NOTA 2º BIMESTRE']
+
+
+@pytest.fixture
+def base():
+    # 3 DIRECs, 12 escolas e 2 séries; notas múltiplas de 0,25 (somas exatas em ponto flutuante),
+    # com notas não lançadas e fora do intervalo, que ficam de fora dos histogramas
+    rng = np.random.default_rng(7)
+    n = 3000
+    escola = rng.integers(0, 12, n)
+    df = pd.DataFrame({
+        'DIREC': [f'{e % 3 + 1:02d}ª DIREC' for e in escola],
+        'MUNICÍPIO': [f'MUNICÍPIO {e % 5}' for e in escola],
+        'INEP ESCOLA': [str(24000000 + e) for e in escola],
+        'ESCOLA': [f'EE {e}' for e in escola],
+        'SÉRIE': rng.choice(['6º ANO', '1ª SÉRIE'], n),
+        'COMPONENTE CURRICULAR': 'Matemática',
+    })
+    for coluna in NOTAS:
+        notas = rng.integers(0, 41, n) * 0.25
+        notas[rng.random(n) < 0.1] = np.nan
+        notas[rng.random(n) < 0.01] = 10.5
+        df[coluna] = notas
+    return df
+
+
+def direto(df, colunas):
+    """Estatísticas calculadas sobre as notas concatenadas de cada grupo, sem histogramas."""
+    linhas = []
+    for chave, grupo in df.melt(id_vars=colunas, value_vars=NOTAS, var_name='BIMESTRE').groupby(colunas + ['BIMESTRE']):
+        notas = grupo['value'].dropna()
+        notas = notas[notas.between(0, 10)].to_numpy()
+        linhas.append(dict(zip(colunas + ['BIMESTRE'], chave), n=len(notas), media=notas.mean(),
+                           abaixo=(notas < MEDIA_MINIMA).mean() * 100, q=np.quantile(notas, [0.25, 0.5, 0.75])))
+    return pd.DataFrame(linhas)
+
+
+@pytest.mark.parametrize('colunas', [['DIREC'], ['DIREC', 'SÉRIE'], ['SÉRIE']])
+def test_combinar_igual_a_calcular_sobre_os_dados_concatenados(base, colunas):
+    # somar os histogramas das escolas dá o mesmo histograma das notas concatenadas do grupo
+    combinado = combinar(histogramas(base, NOTAS), colunas + ['BIMESTRE']).sort_values(colunas + ['BIMESTRE'])
+    concatenado = histogramas(base, NOTAS, colunas_grupo=colunas).sort_values(colunas + ['BIMESTRE'])
+    pd.testing.assert_frame_equal(combinado.reset_index(drop=True), concatenado.reset_index(drop=True),
+                                  check_dtype=False)
+
+    # e as mesmas estatísticas; quartis iguais aos dos quantis nas notas (a menos da largura da faixa)
+    resultado = estatisticas(combinado)
+    pd.testing.assert_frame_equal(resultado, estatisticas(concatenado))
+    esperado = direto(base, colunas)
+    assert resultado['Notas Lançadas'].tolist() == esperado['n'].tolist()
+    np.testing.assert_allclose(resultado['Média'], esperado['media'].round(1))
+    np.testing.assert_allclose(resultado['% Abaixo da Média'], esperado['abaixo'].round(1))
+    quartis = resultado[['1º Quartil', 'Mediana', '3º Quartil']].to_numpy()
+    assert np.abs(quartis - np.stack(esperado['q'])).max() <= LARGURA_FAIXA + 0.05
+
+
+def test_histogramas_ignoram_notas_fora_do_intervalo():
+    df = pd.DataFrame({'DIREC': ['A'] * 5, 'NOTA': [0.0, 10.0, 10.5, -1.0, np.nan]})
+    hist = histogramas(df, ['NOTA'], colunas_grupo=['DIREC'])
+    assert hist[COLUNAS_FAIXAS].sum(axis=1).tolist() == [2]
+    assert hist['FAIXA_00'].item() == 1 and hist[COLUNAS_FAIXAS[-1]].item() == 1
+    assert hist['SOMA'].item() == 10.0
+
+
+def test_quantis():
+    contagens = np.zeros((2, len(COLUNAS_FAIXAS)))
+    contagens[0, [faixa_inicial(6.0), faixa_inicial(8.0)]] = [2, 2]
+    assert quantis(contagens, 0.5)[0] == pytest.approx(6.5)
+    assert np.isnan(quantis(contagens, 0.5)[1])
+
+
+def test_media_minima_precisa_ser_limite_de_faixa():
+    with pytest.raises(ValueError, match="limite de faixa"):
+        faixa_inicial(6.2)
+    assert faixa_inicial(MEDIA_MINIMA) == int(MEDIA_MINIMA / LARGURA_FAIXA)
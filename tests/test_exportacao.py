@@ -0,0 +1,122 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import exportacao
+from exportacao import FORMATOS, exportar, gravar, gravar_csv, gravar_parquet, gravar_xlsx, nome_arquivo
+
+
+@pytest.fixture
+def tabela():
+    return pd.DataFrame({
+        'DIREC': [f'{i:02d}ª DIREC' for i in range(1, 11)],
+        'ESCOLA': ['EE Ação', 'EE B', None, 'EE D', 'EE E', 'EE F', 'EE G', 'EE H', 'EE I', 'EE J'],
+        'Notas Lançadas': np.arange(10, dtype='int64'),
+        '% Notas Lançadas': [12.5, np.nan, 100.0, 0.0, 33.3, 50.0, 1.25, 99.9, 7.0, 8.0],
+    })
+
+
+def ler_xlsx(conteudo):
+    planilha = load_workbook(io.BytesIO(conteudo), read_only=True)
+    return {aba.title: [list(linha) for linha in aba.iter_rows(values_only=True)] for aba in planilha.worksheets}
+
+
+@pytest.mark.parametrize('linhas_por_bloco', [3, 10, 50_000])
+def test_csv_ida_e_volta(tabela, tmp_path, linhas_por_bloco):
+    caminho = str(tmp_path / 'tabela.csv')
+    gravar_csv(tabela, caminho, linhas_por_bloco=linhas_por_bloco)
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    # BOM, ';' e vírgula decimal (para o Excel em português), cabeçalho só uma vez
+    assert conteudo.startswith('﻿DIREC;ESCOLA'.encode('utf8'))
+    assert conteudo.count(b'DIREC;ESCOLA') == 1
+    lido = pd.read_csv(caminho, sep=';', decimal=',', encoding='utf-8-sig')
+    pd.testing.assert_frame_equal(lido, tabela, check_dtype=False)
+
+
+def test_csv_em_arquivo_aberto_nao_e_fechado(tabela):
+    buffer = io.BytesIO()
+    gravar_csv(tabela, buffer, linhas_por_bloco=4)
+    assert not buffer.closed
+    assert buffer.getvalue() == exportar(tabela, 'csv')
+
+
+@pytest.mark.parametrize('linhas_por_bloco', [3, 50_000])
+def test_parquet_ida_e_volta_em_row_groups(tabela, tmp_path, linhas_por_bloco):
+    import pyarrow.parquet as pq
+
+    caminho = str(tmp_path / 'tabela.parquet')
+    gravar_parquet(tabela, caminho, linhas_por_bloco=linhas_por_bloco)
+    assert pq.ParquetFile(caminho).num_row_groups == -(-len(tabela) // linhas_por_bloco)
+    pd.testing.assert_frame_equal(pd.read_parquet(caminho), tabela, check_dtype=False)
+
+
+def test_parquet_vazio(tabela, tmp_path):
+    caminho = str(tmp_path / 'vazio.parquet')
+    gravar_parquet(tabela.iloc[:0], caminho)
+    lido = pd.read_parquet(caminho)
+    assert lido.empty and list(lido.columns) == list(tabela.columns)
+
+
+@pytest.mark.parametrize('linhas_por_bloco', [3, 50_000])
+def test_xlsx_ida_e_volta(tabela, linhas_por_bloco):
+    buffer = io.BytesIO()
+    gravar_xlsx(tabela, buffer, linhas_por_bloco=linhas_por_bloco)
+    abas = ler_xlsx(buffer.getvalue())
+    assert list(abas) == ['Dados']
+    cabecalho, *linhas = abas['Dados']
+    assert cabecalho == list(tabela.columns)
+    # NaN/None viram células vazias
+    lido = pd.DataFrame(linhas, columns=cabecalho)
+    pd.testing.assert_frame_equal(lido, tabela, check_dtype=False)
+    assert lido.isna().sum().sum() == 2
+
+
+def test_xlsx_divide_em_abas_no_limite_de_linhas(tabela):
+    # com limite de 4 linhas por aba (cabeçalho + 3), as 10 linhas ocupam 4 abas
+    buffer = io.BytesIO()
+    gravar_xlsx(tabela, buffer, nome_planilha='Ranking', linhas_por_bloco=4, limite_linhas=4)
+    abas = ler_xlsx(buffer.getvalue())
+    assert list(abas) == ['Ranking', 'Ranking (2)', 'Ranking (3)', 'Ranking (4)']
+    assert all(len(linhas) <= 4 and linhas[0] == list(tabela.columns) for linhas in abas.values())
+    juntas = [linha for linhas in abas.values() for linha in linhas[1:]]
+    assert [linha[0] for linha in juntas] == tabela['DIREC'].tolist()
+
+
+def test_xlsx_no_limite_exato_nao_cria_aba_vazia(tabela):
+    buffer = io.BytesIO()
+    gravar_xlsx(tabela, buffer, limite_linhas=len(tabela) + 1)
+    assert list(ler_xlsx(buffer.getvalue())) == ['Dados']
+
+
+def test_xlsx_vazio_tem_cabecalho(tabela):
+    assert ler_xlsx(exportar(tabela.iloc[:0], 'xlsx')) == {'Dados': [list(tabela.columns)]}
+
+
+def test_limite_do_excel():
+    assert exportacao.LINHAS_MAXIMAS_XLSX == 2 ** 20
+
+
+@pytest.mark.parametrize('formato', FORMATOS)
+def test_gravar_em_caminho_e_exportar_dao_o_mesmo_conteudo(tabela, tmp_path, formato):
+    caminho = tmp_path / ('tabela' + FORMATOS[formato][1])
+    gravar(tabela, str(caminho), formato)
+    if formato != 'xlsx':  # o xlsx guarda a hora de criação
+        assert caminho.read_bytes() == exportar(tabela, formato)
+
+
+def test_formato_desconhecido(tabela):
+    with pytest.raises(ValueError, match="'ods'"):
+        exportar(tabela, 'ods')
+
+
+@pytest.mark.parametrize('partes, esperado', [
+    (('Ranking', '01ª DIREC - NATAL', 'Todos'), 'Ranking_01a_DIREC_NATAL_Todos'),
+    (('Escolas', 'São Gonçalo do Amarante', 2), 'Escolas_Sao_Goncalo_do_Amarante_2'),
+    (('  ausentes  ', '(cód. Inep: 24000001)'), 'ausentes_cod_Inep_24000001'),
+])
+def test_nome_arquivo(partes, esperado):
+    assert nome_arquivo(*partes) == esperado
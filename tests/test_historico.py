@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+from consultas import COLUNAS_CONTAGEM
+from historico import (COLUNAS_CHAVE, carregar_historico, estado_atual, evolucao, listar_extracoes,
+                       preparar_evolucao, registrar_extracao)
+
+
+@pytest.fixture
+def extracoes(df_escola):
+    """
+    Três extrações em sequência: na segunda, a EE B lança notas e a EE D sai da base; na terceira,
+    a EE D volta e a EE C lança as notas do 1º bimestre.
+    """
+    primeira = df_escola.assign(ETAPA_RESUMIDA='EM', **{'SÉRIE': ['1ª SÉRIE', '2ª SÉRIE', '1ª SÉRIE', '1ª SÉRIE',
+                                                                   '1ª SÉRIE']})
+    segunda = primeira[primeira['ESCOLA'] != 'EE D'].copy()
+    segunda.loc[segunda['ESCOLA'] == 'EE B', ['1B_Notas Lancadas', '1B_Notas Nao Lancadas']] = [10, 0]
+    terceira = pd.concat([segunda, primeira[primeira['ESCOLA'] == 'EE D']], ignore_index=True)
+    terceira.loc[terceira['ESCOLA'] == 'EE C', ['1B_Notas Lancadas', '1B_Notas Nao Lancadas']] = [6, 0]
+    return {'2025-03-01': primeira, '2025-03-08': segunda, '2025-03-15': terceira}
+
+
+def totais(df):
+    return df[COLUNAS_CONTAGEM].sum().astype('int64')
+
+
+def conferir(pasta, extracoes):
+    # O estado reconstruído e a evolução acumulada batem com cada extração
+    historico = carregar_historico(pasta)
+    datas = listar_extracoes(pasta)
+    assert datas == sorted(extracoes)
+    serie = evolucao(preparar_evolucao(historico), 'Todas', 'Todos', 'Todas', datas).set_index('DATA_EXTRACAO')
+    for data, df in extracoes.items():
+        estado = estado_atual(historico[historico['DATA_EXTRACAO'] <= pd.Timestamp(data)])
+        assert len(estado) == len(df)
+        pd.testing.assert_series_equal(totais(estado), totais(df), check_names=False)
+        pd.testing.assert_series_equal(serie.loc[pd.Timestamp(data), COLUNAS_CONTAGEM].astype('int64'),
+                                       totais(df), check_names=False)
+
+
+def test_registrar_extracao_grava_so_o_que_mudou(extracoes, tmp_path):
+    pasta = str(tmp_path)
+    linhas = [registrar_extracao(df, data, pasta=pasta) for data, df in extracoes.items()]
+    # tudo na primeira; EE B alterada e EE D removida; EE C alterada e EE D de volta
+    assert linhas == [5, 2, 2]
+    delta = pd.read_parquet(tmp_path / 'data_extracao=2025-03-08' / 'delta.parquet')
+    removida = delta[delta['REMOVIDO']]
+    assert removida['ESCOLA'].tolist() == ['EE D']
+    assert (removida[COLUNAS_CONTAGEM] == 0).all(axis=None)
+    conferir(pasta, extracoes)
+
+
+def test_registrar_extracao_sem_mudancas(extracoes, tmp_path):
+    registrar_extracao(extracoes['2025-03-01'], '2025-03-01', pasta=str(tmp_path))
+    assert registrar_extracao(extracoes['2025-03-01'], '2025-03-02', pasta=str(tmp_path)) == 0
+
+
+def test_registrar_extracao_fora_de_ordem(extracoes, tmp_path):
+    # A extração do meio chega por último: os deltas das posteriores são refeitos
+    pasta = str(tmp_path)
+    for data in ['2025-03-01', '2025-03-15', '2025-03-08']:
+        registrar_extracao(extracoes[data], data, pasta=pasta)
+    conferir(pasta, extracoes)
+
+    # E uma extração anterior a todas
+    registrar_extracao(extracoes['2025-03-15'], '2025-02-22', pasta=pasta)
+    conferir(pasta, {'2025-02-22': extracoes['2025-03-15'], **extracoes})
+
+
+def test_registrar_extracao_substitui_a_mesma_data(extracoes, tmp_path):
+    pasta = str(tmp_path)
+    for data, df in extracoes.items():
+        registrar_extracao(df, data, pasta=pasta)
+    # a extração do meio é refeita (igual à primeira)
+    corrigidas = {**extracoes, '2025-03-08': extracoes['2025-03-01']}
+    assert registrar_extracao(corrigidas['2025-03-08'], '2025-03-08', pasta=pasta) == 0
+    conferir(pasta, corrigidas)
+
+
+def test_preparar_evolucao_diferencas(extracoes, tmp_path):
+    pasta = str(tmp_path)
+    for data, df in extracoes.items():
+        registrar_extracao(df, data, pasta=pasta)
+    diferencas = preparar_evolucao(carregar_historico(pasta))
+
+    def diferenca(escola, data, coluna):
+        linha = (diferencas['ESCOLA'] == escola) & (diferencas['DATA_EXTRACAO'] == pd.Timestamp(data))
+        return diferencas.loc[linha, coluna].item()
+
+    assert diferenca('EE B', '2025-03-08', '1B_Notas Lancadas') == 5
+    assert diferenca('EE B', '2025-03-08', '1B_Notas Nao Lancadas') == -5
+    # removida e de volta: sai com o total negativo e volta com o total
+    assert diferenca('EE D', '2025-03-08', '1B_Notas Nao Lancadas') == -9
+    assert diferenca('EE D', '2025-03-15', '1B_Notas Nao Lancadas') == 9
+    assert diferenca('EE C', '2025-03-15', 'ESCOLA_FORMATADA') == 'EE C (cód. Inep: 24000003)'
+
+
+def test_evolucao_por_recorte(extracoes, tmp_path):
+    pasta = str(tmp_path)
+    for data, df in extracoes.items():
+        registrar_extracao(df, data, pasta=pasta)
+    serie = evolucao(preparar_evolucao(carregar_historico(pasta)), '01ª DIREC - NATAL', 'NATAL',
+                     'EE B (cód. Inep: 24000002)', listar_extracoes(pasta))
+    assert serie['% Lançadas - 1º Bimestre'].tolist() == [50.0, 100.0, 100.0]
+    assert serie['% Lançadas - 2º Bimestre'].tolist() == [50.0, 50.0, 50.0]
+
+
+def test_historico_vazio(tmp_path):
+    historico = carregar_historico(str(tmp_path))
+    assert historico.empty and listar_extracoes(str(tmp_path)) == []
+    assert 'ESCOLA_FORMATADA' in preparar_evolucao(historico).columns
+    assert list(estado_atual(historico).columns) == COLUNAS_CHAVE + COLUNAS_CONTAGEM
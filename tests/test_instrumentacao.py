@@ -0,0 +1,25 @@
+import warnings
+
+import pytest
+
+from instrumentacao import RelatorioExecucao, medir_etapa
+
+
+def test_medir_etapa_conta_avisos_exceto_os_conhecidos():
+    relatorio = RelatorioExecucao()
+    with medir_etapa(relatorio, 'ingest'):
+        for _ in range(3):
+            warnings.warn("Workbook contains no default style, apply openpyxl's default", UserWarning)
+        warnings.warn("coluna sem dados", RuntimeWarning)
+
+    medicao, = relatorio.etapas
+    assert medicao.status == 'executada'
+    assert dict(medicao.avisos) == {'RuntimeWarning: coluna sem dados': 1}
+
+
+def test_medir_etapa_registra_etapa_que_falhou():
+    relatorio = RelatorioExecucao()
+    with pytest.raises(ValueError):
+        with medir_etapa(relatorio, 'clean'):
+            raise ValueError("planilha ilegível")
+    assert relatorio.etapas[0].status == 'falhou'
@@ -0,0 +1,96 @@
+# Paridade dos backends de consulta: cada consulta de consultas_sql.py devolve o mesmo resultado
+# que a função de mesmo nome de consultas.py
+import inspect
+
+import pandas as pd
+import pytest
+
+import consultas
+import consultas_sql
+from publicacao_dados import ler_df_escola
+
+FILTROS = [
+    ('Todas', 'Todos', 'Todas'),
+    ('01ª DIREC - NATAL', 'Todos', 'Todas'),
+    ('01ª DIREC - NATAL', 'NATAL', 'Todas'),
+    ('Todas', 'EXTREMOZ', 'Todas'),
+    ('01ª DIREC - NATAL', 'NATAL', 'EE A (cód. Inep: 24000001)'),
+    ('02ª DIREC - PARNAMIRIM', 'PARNAMIRIM', 'EE D (cód. Inep: 24000004)'),
+    ('02ª DIREC - PARNAMIRIM', 'NATAL', 'Todas'),
+    ('DIREC INEXISTENTE', 'Todos', 'Todas'),
+]
+
+# Consultas comparadas (as demais funções públicas de consultas_sql são da conexão e das cópias)
+CONSULTAS = ['totais_bimestres', 'totais_por_direc', 'totais_por_escola', 'totais_por_entidade']
+
+
+@pytest.fixture
+def caminho_escola(df_escola, tmp_path):
+    # Gravado como o processamento grava: INEP numérico e nomes que podem vir com espaços
+    df = df_escola.assign(**{'INEP ESCOLA': df_escola['INEP ESCOLA'].astype('int64')})
+    df.loc[df['ESCOLA'] == 'EE B', 'ESCOLA'] = ' EE B  '
+    caminho = str(tmp_path / 'df_escola.parquet')
+    df.to_parquet(caminho, index=False)
+    return caminho
+
+
+@pytest.fixture
+def df_app(caminho_escola):
+    return ler_df_escola(caminho_escola)
+
+
+@pytest.fixture(params=['arquivo', 'copia_versao'])
+def fonte_sql(request, caminho_escola, df_app, tmp_path):
+    # 'arquivo': o .parquet gravado pelo processamento; 'copia_versao': a cópia da versão fixada
+    # na execução, que é o que o dashboard consulta
+    if request.param == 'arquivo':
+        caminho = caminho_escola
+    else:
+        caminho = consultas_sql.gravar_versao(df_app, 1, str(tmp_path))
+    return consultas_sql.FonteSQL(consultas_sql.conectar(threads=2), caminho)
+
+
+def assert_mesmo_resultado(obtido, esperado):
+    if isinstance(esperado, pd.Series):
+        pd.testing.assert_series_equal(obtido.astype('int64'), esperado.astype('int64'), check_names=False)
+    else:
+        pd.testing.assert_frame_equal(obtido.reset_index(drop=True).astype(esperado.dtypes.to_dict()),
+                                      esperado.reset_index(drop=True))
+
+
+def test_todas_as_consultas_sao_comparadas():
+    funcoes = {nome for nome, _ in inspect.getmembers(consultas_sql, inspect.isfunction)
+               if not nome.startswith('_') and inspect.getmodule(_) is consultas_sql}
+    assert funcoes - {'conectar', 'gravar_versao'} == set(CONSULTAS)
+
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_totais_bimestres(fonte_sql, df_app, filtros):
+    assert_mesmo_resultado(consultas_sql.totais_bimestres(fonte_sql, *filtros),
+                           consultas.totais_bimestres(df_app, *filtros))
+
+
+@pytest.mark.parametrize('bimestre', consultas.BIMESTRES)
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_totais_por_direc(fonte_sql, df_app, filtros, bimestre):
+    obtido = consultas_sql.totais_por_direc(fonte_sql, *filtros, bimestre=bimestre)
+    esperado = consultas.totais_por_direc(df_app, *filtros, bimestre=bimestre)
+    assert_mesmo_resultado(obtido, esperado)
+    assert_mesmo_resultado(consultas.percentuais_direc(obtido), consultas.percentuais_direc(esperado))
+
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_totais_por_escola(fonte_sql, df_app, filtros):
+    obtido = consultas_sql.totais_por_escola(fonte_sql, *filtros)
+    esperado = consultas.totais_por_escola(df_app, *filtros)
+    assert_mesmo_resultado(obtido, esperado)
+    ordem = '% Notas Não Lançadas - 1º Bimestre'
+    assert_mesmo_resultado(consultas.ranking_escolas(obtido, ordenar_por=ordem),
+                           consultas.ranking_escolas(esperado, ordenar_por=ordem))
+
+
+def test_totais_por_entidade(fonte_sql, df_app):
+    # o índice (NIVEL, ENTIDADE) também é comparado
+    esperado = consultas.totais_por_entidade(df_app)
+    pd.testing.assert_frame_equal(consultas_sql.totais_por_entidade(fonte_sql).astype(esperado.dtypes.to_dict()),
+                                  esperado)
@@ -0,0 +1,152 @@
+import json
+import time
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+import consultas
+import preaquecimento
+from preaquecimento import (CacheVisoes, PreAquecedor, VisaoLancamento, calcular_visao, preaquecer,
+                            recortes_para_preaquecer, tamanho_visao)
+
+ESTADO = ('Todas', 'Todos', 'Todas')
+NATAL = ('01ª DIREC - NATAL', 'Todos', 'Todas')
+PARNAMIRIM = ('02ª DIREC - PARNAMIRIM', 'Todos', 'Todas')
+
+
+def visao(linhas):
+    # Visão com `linhas` linhas em cada tabela (o tamanho só depende disso)
+    tabela = pd.DataFrame({'valor': range(linhas)})
+    return VisaoLancamento(resumo=tabela, direc={b: tabela for b in consultas.BIMESTRES}, totais_escolas=tabela)
+
+
+def test_recortes_para_preaquecer_ordem(df_escola):
+    acessos = Counter({PARNAMIRIM: 5, NATAL: 2,
+                       ('01ª DIREC - NATAL', 'EXTREMOZ', 'Todas'): 3,
+                       ('01ª DIREC - NATAL', 'NATAL', 'EE A (cód. Inep: 24000001)'): 7})
+    assert recortes_para_preaquecer(df_escola, acessos) == [
+        ESTADO,
+        PARNAMIRIM, NATAL,
+        ('01ª DIREC - NATAL', 'EXTREMOZ', 'Todas'),
+        ('01ª DIREC - NATAL', 'NATAL', 'Todas'),
+        ('02ª DIREC - PARNAMIRIM', 'PARNAMIRIM', 'Todas'),
+        ('01ª DIREC - NATAL', 'NATAL', 'EE A (cód. Inep: 24000001)'),
+    ]
+
+
+def test_recortes_para_preaquecer_sem_municipios_e_sem_acessos(df_escola):
+    # sem acessos, as DIRECs ficam em ordem alfabética
+    assert recortes_para_preaquecer(df_escola, Counter(), incluir_municipios=False) == [ESTADO, NATAL, PARNAMIRIM]
+
+
+def test_cache_descarta_as_menos_usadas():
+    tamanho = tamanho_visao(visao(10))
+    cache = CacheVisoes(limite_memoria=3 * tamanho)
+    for filtros in (ESTADO, NATAL, PARNAMIRIM):
+        cache.guardar(1, filtros, visao(10))
+    # usar o estado o torna o mais recente: quem sai ao passar do limite é NATAL
+    cache.obter(1, ESTADO, calcular=None)
+    cache.guardar(1, ('01ª DIREC - NATAL', 'NATAL', 'Todas'), visao(10))
+
+    assert len(cache) == 3
+    assert (1, NATAL) not in cache
+    assert (1, ESTADO) in cache and (1, PARNAMIRIM) in cache
+    assert cache.memoria == 3 * tamanho
+
+
+def test_cache_guarda_visao_maior_que_o_limite_sozinha():
+    cache = CacheVisoes(limite_memoria=1)
+    cache.guardar(1, ESTADO, visao(10))
+    cache.guardar(1, NATAL, visao(10))
+    assert len(cache) == 1 and (1, NATAL) in cache
+
+
+def test_cache_obter_conta_acessos_e_calcula_uma_vez():
+    cache = CacheVisoes()
+    calculos = []
+    calcular = lambda filtros: calculos.append(filtros) or visao(1)
+    for _ in range(3):
+        cache.obter(1, NATAL, calcular)
+    cache.obter(2, NATAL, calcular)
+    assert calculos == [NATAL, NATAL]
+    assert cache.copiar_acessos() == Counter({NATAL: 4})
+
+
+def test_cache_descartar_versoes_antigas():
+    cache = CacheVisoes()
+    cache.guardar(1, ESTADO, visao(1))
+    cache.guardar(2, ESTADO, visao(1))
+    cache.descartar_versoes_antigas(2)
+    assert len(cache) == 1 and (2, ESTADO) in cache
+    assert cache.memoria == tamanho_visao(visao(1))
+
+
+def test_acessos_gravados_e_lidos(tmp_path):
+    arquivo = str(tmp_path / 'acessos.json')
+    cache = CacheVisoes(arquivo_acessos=arquivo)
+    cache.obter(1, NATAL, lambda filtros: visao(1))
+    cache.obter(1, NATAL, lambda filtros: visao(1))
+    cache.obter(1, ESTADO, lambda filtros: visao(1))
+    cache.gravar_acessos()
+    assert CacheVisoes(arquivo_acessos=arquivo).acessos == Counter({NATAL: 2, ESTADO: 1})
+
+
+def test_acessos_invalidos_sao_ignorados(tmp_path):
+    arquivo = tmp_path / 'acessos.json'
+    arquivo.write_text('{não é json', encoding='utf8')
+    assert CacheVisoes(arquivo_acessos=str(arquivo)).acessos == Counter()
+
+
+def test_preaquecer_ordena_uma_copia_dos_acessos(df_escola, monkeypatch):
+    # As sessões continuam contando acessos (sob o lock do cache) enquanto o pré-aquecimento
+    # ordena os recortes: a ordenação recebe uma cópia, não o Counter do cache
+    cache = CacheVisoes()
+    cache.obter(1, PARNAMIRIM, lambda filtros: visao(1))
+    recebidos = []
+
+    def recortes(df, acessos, incluir_municipios=True):
+        recebidos.append(acessos)
+        cache.obter(1, NATAL, lambda filtros: visao(1))  # acesso de uma sessão no meio da ordenação
+        return recortes_para_preaquecer(df, acessos, incluir_municipios)
+
+    monkeypatch.setattr(preaquecimento, 'recortes_para_preaquecer', recortes)
+    preaquecer(cache, 1, df_escola, lambda filtros: visao(1), incluir_municipios=False, ocupacao=1.0)
+
+    assert recebidos[0] is not cache.acessos
+    assert recebidos[0] == Counter({PARNAMIRIM: 1})
+    assert cache.acessos == Counter({PARNAMIRIM: 1, NATAL: 1})
+
+
+def test_preaquecer_orcamento_de_memoria(df_escola):
+    cache = CacheVisoes()
+    resultado = preaquecer(cache, 1, df_escola, lambda filtros: visao(10),
+                           orcamento_memoria=2 * tamanho_visao(visao(10)), ocupacao=1.0)
+    assert resultado['calculadas'] == 2 and resultado['orcamento_esgotado']
+    assert (1, ESTADO) in cache and (1, NATAL) in cache
+
+
+@pytest.mark.parametrize('filtros', [ESTADO, NATAL, ('01ª DIREC - NATAL', 'NATAL', 'EE A (cód. Inep: 24000001)')])
+def test_calcular_visao(df_escola, filtros):
+    resultado = calcular_visao(consultas, df_escola, filtros)
+    pd.testing.assert_frame_equal(resultado.totais_escolas, consultas.totais_por_escola(df_escola, *filtros))
+    assert set(resultado.direc) == set(consultas.BIMESTRES)
+
+
+def test_preaquecedor_grava_acessos_periodicamente_e_ao_parar(tmp_path):
+    arquivo = tmp_path / 'acessos.json'
+    cache = CacheVisoes(arquivo_acessos=str(arquivo))
+    preaquecedor = PreAquecedor(cache, calculadora=None, intervalo_gravacao=0.05).iniciar()
+    try:
+        cache.obter(1, NATAL, lambda filtros: visao(1))
+        for _ in range(100):
+            if arquivo.exists() and json.loads(arquivo.read_text(encoding='utf8')):
+                break
+            time.sleep(0.05)
+        assert json.loads(arquivo.read_text(encoding='utf8')) == [[list(NATAL), 1]]
+
+        cache.obter(1, ESTADO, lambda filtros: visao(1))
+        preaquecedor.intervalo_gravacao = 3600
+    finally:
+        preaquecedor.parar()
+    assert json.loads(arquivo.read_text(encoding='utf8')) == [[list(NATAL), 1], [list(ESTADO), 1]]
@@ -0,0 +1,87 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from processamento_local import Checkpoints, data_dos_arquivos, descrever_arquivos, impressao_digital
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    return Checkpoints(str(tmp_path / 'checkpoints'))
+
+
+def test_checkpoints_salvar_e_carregar(checkpoints, df_escola):
+    resultados = {'df_escola': df_escola, 'vazio': df_escola.iloc[:0]}
+    checkpoints.salvar('aggregate', 'abc', resultados)
+
+    # o manifesto é relido por uma nova instância (nova execução)
+    novo = Checkpoints(checkpoints.pasta)
+    assert novo.impressao('aggregate') == 'abc'
+    assert novo.valido('aggregate', 'abc')
+    carregados = novo.carregar('aggregate')
+    assert list(carregados) == ['df_escola', 'vazio']
+    pd.testing.assert_frame_equal(carregados['df_escola'], df_escola)
+    assert carregados['vazio'].empty
+    assert novo.arquivos('aggregate') == [os.path.join(checkpoints.pasta, 'aggregate__df_escola.parquet'),
+                                          os.path.join(checkpoints.pasta, 'aggregate__vazio.parquet')]
+
+
+def test_checkpoints_invalidos(checkpoints, df_escola, tmp_path):
+    gravado = tmp_path / 'df_escola.parquet'
+    gravado.write_bytes(b'')
+    checkpoints.salvar('export', 'abc', {'df': df_escola}, arquivos=[str(gravado)])
+    assert checkpoints.valido('export', 'abc')
+
+    # outra impressão digital, etapa sem checkpoint, saída apagada, arquivo gravado apagado
+    assert not checkpoints.valido('export', 'outra')
+    assert not checkpoints.valido('clean', 'abc')
+    assert checkpoints.impressao('clean') is None
+    gravado.unlink()
+    assert not checkpoints.valido('export', 'abc')
+    gravado.write_bytes(b'')
+    os.remove(checkpoints.arquivos('export')[0])
+    assert not checkpoints.valido('export', 'abc')
+
+
+def test_checkpoints_etapa_nao_executada(checkpoints):
+    with pytest.raises(FileNotFoundError, match="ingest"):
+        checkpoints.carregar('ingest')
+    assert checkpoints.arquivos('ingest') == []
+
+
+def test_checkpoints_substitui_a_etapa(checkpoints, df_escola):
+    checkpoints.salvar('clean', 'v1', {'df': df_escola})
+    checkpoints.salvar('clean', 'v2', {'df': df_escola.head(1)})
+    assert not checkpoints.valido('clean', 'v1')
+    assert len(Checkpoints(checkpoints.pasta).carregar('clean')['df']) == 1
+    assert not os.path.exists(checkpoints.caminho_manifesto + '.tmp')
+
+
+def test_impressao_digital():
+    assert impressao_digital('export', [1, 2]) == impressao_digital('export', [1, 2])
+    assert impressao_digital('export', [1, 2]) != impressao_digital('export', [2, 1])
+    assert len(impressao_digital('ingest')) == 16
+
+
+def test_descrever_arquivos_muda_com_o_arquivo(tmp_path):
+    arquivo = tmp_path / 'notas.xlsx'
+    arquivo.write_bytes(b'123')
+    antes = descrever_arquivos([str(arquivo)])
+    assert antes == [['notas.xlsx', 3, os.stat(arquivo).st_mtime_ns]]
+    arquivo.write_bytes(b'1234')
+    assert descrever_arquivos([str(arquivo)]) != antes
+
+
+def test_data_dos_arquivos(tmp_path):
+    # A data da extração vem do arquivo modificado por último, não do dia do processamento
+    caminhos = []
+    for nome, data in [('a.xlsx', datetime(2025, 3, 3, 10)), ('b.xlsx', datetime(2025, 3, 5, 23, 30)),
+                       ('c.xlsx', datetime(2025, 2, 28))]:
+        caminho = tmp_path / nome
+        caminho.write_bytes(b'')
+        os.utime(caminho, (data.timestamp(), data.timestamp()))
+        caminhos.append(str(caminho))
+    assert data_dos_arquivos(caminhos) == '2025-03-05'
+    assert data_dos_arquivos([]) == datetime.now().strftime('%Y-%m-%d')
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+import pytest
+
+import consultas
+import relatorios_estaticos
+from preaquecimento import calcular_visao
+
+
+@pytest.fixture
+def caminho_escola(df_escola, tmp_path):
+    caminho = str(tmp_path / 'df_escola.parquet')
+    df_escola.to_parquet(caminho, index=False)
+    return caminho
+
+
+@pytest.mark.parametrize('filtros', [
+    ('01ª DIREC - NATAL', 'Todos', 'Todas'),
+    ('02ª DIREC - PARNAMIRIM', 'Todos', 'Todas'),
+    ('01ª DIREC - NATAL', 'EXTREMOZ', 'Todas'),
+    ('01ª DIREC - NATAL', 'NATAL', 'Todas'),
+])
+def test_visao_recorte_igual_a_calcular_visao(df_escola, filtros):
+    # a visão montada da agregação única tem os mesmos totais (e o mesmo hash do manifesto)
+    obtida = relatorios_estaticos.visao_recorte(relatorios_estaticos.agregar(df_escola), filtros)
+    esperada = calcular_visao(consultas, df_escola, filtros)
+    pd.testing.assert_frame_equal(obtida.resumo, esperada.resumo)
+    for bimestre in consultas.BIMESTRES:
+        pd.testing.assert_frame_equal(obtida.direc[bimestre], esperada.direc[bimestre])
+    pd.testing.assert_frame_equal(obtida.totais_escolas, esperada.totais_escolas)
+    assert relatorios_estaticos.hash_visao(obtida) == relatorios_estaticos.hash_visao(esperada)
+
+
+def test_relatorios_compartilham_o_plotly(caminho_escola, tmp_path):
+    pasta = str(tmp_path / 'relatorios')
+    resultado = relatorios_estaticos.gerar_relatorios(caminho_escola, pasta, workers=2)
+
+    relatorios = sorted(f for f in os.listdir(pasta) if f.endswith('.html') and f != 'index.html')
+    assert resultado == {'gerados': 2, 'inalterados': 0, 'removidos': 0}
+    assert relatorios == ['01a_DIREC_NATAL.html', '02a_DIREC_PARNAMIRIM.html']
+    assert [f for f in os.listdir(pasta) if f.endswith('.js')] == [relatorios_estaticos.ARQUIVO_PLOTLY]
+
+    caminho_plotly = os.path.join(pasta, relatorios_estaticos.ARQUIVO_PLOTLY)
+    tamanho_plotly = os.path.getsize(caminho_plotly)
+    for relatorio in relatorios:
+        with open(os.path.join(pasta, relatorio), encoding='utf8') as f:
+            texto = f.read()
+        # cada relatório só aponta para a biblioteca ao lado, sem embuti-la
+        assert f"<script src='{relatorios_estaticos.ARQUIVO_PLOTLY}'></script>" in texto
+        assert len(texto) < tamanho_plotly / 10
+
+    # Nova execução com os mesmos dados: nada é regravado, nem a biblioteca
+    modificado = os.stat(caminho_plotly).st_mtime_ns
+    resultado = relatorios_estaticos.gerar_relatorios(caminho_escola, pasta, workers=2)
+    assert resultado == {'gerados': 0, 'inalterados': 2, 'removidos': 0}
+    assert os.stat(caminho_plotly).st_mtime_ns == modificado
@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from validacao import (COLUNAS_NOTAS, REGRAS, contagens, salvar_validacao, validar, _inep_ausente,
+                       _nota_fora_do_intervalo, _nota_nao_numerica, _serie_nao_reconhecida)
+
+
+def converter(notas):
+    # Como a etapa clean converte as notas antes de validar
+    return pd.to_numeric(notas.str.replace(",", "."), errors="coerce")
+
+
+@pytest.fixture
+def base():
+    # Base como é lida do SIGEduc: texto, com células vazias como None
+    return pd.DataFrame({
+        'DIREC': ['01ª DIREC - NATAL'] * 6,
+        'MUNICÍPIO': ['NATAL'] * 6,
+        'ESCOLA': ['EE A', 'EE A', 'EE B', 'EE B', 'EE C', 'EE C'],
+        'INEP ESCOLA': ['24000001', '24000001.0', None, ' ', '2400000', '24000006'],
+        'SÉRIE': ['6º ANO', '1ª Série', '7° ANO', None, '1º Ano Fundamental I', '9º Ano'],
+        'TURMA': ['A'] * 6,
+        'COMPONENTE CURRICULAR': ['MATEMÁTICA'] * 6,
+        'NOME DO ESTUDANTE': ['X'] * 6,
+        'NOTA 1º BIMESTRE': ['7,5', '10', '10,5', '-1', None, ''],
+        'NOTA 2º BIMESTRE': ['abc', '8', None, 'F', '  ', '0'],
+    })
+
+
+def validar_base(base, **kwargs):
+    convertidas = {c: converter(base[c]) for c in COLUNAS_NOTAS if c in base.columns}
+    return validar(base, convertidas, **kwargs)
+
+
+def test_nota_fora_do_intervalo(base):
+    notas = base['NOTA 1º BIMESTRE']
+    assert _nota_fora_do_intervalo(notas, converter(notas)).tolist() == [False, False, True, True, False, False]
+
+
+def test_nota_nao_numerica_ignora_celulas_vazias(base):
+    # None, '' e espaços são notas não lançadas, não notas inválidas
+    notas = base['NOTA 2º BIMESTRE']
+    assert _nota_nao_numerica(notas, converter(notas)).tolist() == [True, False, False, True, False, False]
+
+
+def test_serie_nao_reconhecida(base):
+    # '1ª Série' e '7° ANO' são séries válidas com outra grafia; série vazia e do Fundamental I
+    # ficam de fora (são descartadas pela limpeza sem indicar erro de grafia)
+    series = base['SÉRIE']
+    assert _serie_nao_reconhecida(series, series).tolist() == [False, True, True, False, False, False]
+
+
+def test_inep_ausente(base):
+    # aceita o código lido como número ('24000001.0'); vazio, só espaços e 7 dígitos violam
+    inep = base['INEP ESCOLA']
+    assert _inep_ausente(inep, inep).tolist() == [False, False, True, True, True, False]
+
+
+def test_inep_ausente_em_coluna_numerica():
+    inep = pd.Series([24000001.0, np.nan])
+    assert _inep_ausente(inep, inep).tolist() == [False, True]
+
+
+def test_validar_conta_por_regra_e_coluna(base):
+    resultado = validar_base(base)
+    assert resultado['linhas'] == 6
+    assert list(resultado['regras']) == [regra.nome for regra in REGRAS]
+    assert contagens(resultado) == {'nota_fora_do_intervalo': 2, 'nota_nao_numerica': 2,
+                                    'serie_nao_reconhecida': 2, 'inep_ausente': 3}
+    # só as colunas de nota presentes na base entram na contagem
+    assert resultado['regras']['nota_nao_numerica']['por_coluna'] == {'NOTA 1º BIMESTRE': 0, 'NOTA 2º BIMESTRE': 2}
+
+
+def test_amostra_sem_dados_pessoais(base):
+    amostra = validar_base(base)['regras']['nota_nao_numerica']['amostra']
+    assert [(linha['ESCOLA'], linha['COLUNA'], linha['VALOR']) for linha in amostra] == [
+        ('EE A', 'NOTA 2º BIMESTRE', 'abc'), ('EE B', 'NOTA 2º BIMESTRE', 'F')]
+    assert all('NOME DO ESTUDANTE' not in linha for linha in amostra)
+
+
+def test_amostra_limitada_e_nulos_como_none(base):
+    resultado = validar_base(base, tamanho_amostra=2)
+    amostra = resultado['regras']['inep_ausente']['amostra']
+    assert resultado['regras']['inep_ausente']['violacoes'] == 3
+    assert len(amostra) == 2
+    assert amostra[0]['VALOR'] is None
+
+
+def test_validacao_json(base, tmp_path):
+    caminho = str(tmp_path / 'saida' / 'validacao.json')
+    resultado = validar_base(base)
+    salvar_validacao(resultado, caminho)
+    with open(caminho, encoding='utf8') as f:
+        gravado = json.load(f)
+    assert gravado == resultado
+    assert gravado['regras']['serie_nao_reconhecida']['descricao'] == REGRAS[2].descricao
+    assert not (tmp_path / 'saida' / 'validacao.json.tmp').exists()
@@ -0,0 +1,169 @@
+# Validação da qualidade dos dados exportados do SIGEduc
+#
+# As regras são declaradas em REGRAS: cada uma é uma expressão vetorizada sobre uma coluna que
+# devolve a máscara das linhas que a violam. A validação é feita na etapa `clean`, sobre a base já
+# lida (sem reler os arquivos) e aproveitando as notas já convertidas pela limpeza. O resultado é a
+# contagem de violações por regra (e por coluna) e uma amostra limitada das linhas problemáticas,
+# gravados em validacao.json na pasta de saída.
+import json
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+import pandas as pd
+
+COLUNAS_NOTAS = [
+    "NOTA 1º BIMESTRE",
+    "NOTA 2º BIMESTRE",
+    "NOTA 3º BIMESTRE",
+    "NOTA 4º BIMESTRE",
+    "MÉDIA ANUAL",
+    "EXAME FINAL",
+    "AVALIAÇÃO ESPECIAL",
+    "MÉDIA FINAL"
+]
+
+# Séries dos Anos Finais e do Ensino Médio, nas grafias reconhecidas pela limpeza
+SERIES_RECONHECIDAS = ['1ª SÉRIE',
+                       '2ª SÉRIE',
+                       '3ª SÉRIE',
+                       '6º Ano',
+                       '7º Ano',
+                       '8º Ano',
+                       '9º Ano',
+                       '6º ANO',
+                       '7º ANO',
+                       '8º ANO',
+                       '9º ANO']
+
+# Colunas que identificam a linha na amostra (sem dados pessoais do estudante)
+COLUNAS_AMOSTRA = ['DIREC', 'MUNICÍPIO', 'ESCOLA', 'INEP ESCOLA', 'SÉRIE', 'TURMA', 'COMPONENTE CURRICULAR']
+
+TAMANHO_AMOSTRA = 20
+
+# Regra de validação: `condicao(bruto, convertido)` recebe a coluna como foi lida e, para as notas,
+# já convertida para número (nas demais colunas, `convertido` é a própria coluna), e devolve a
+# máscara booleana das linhas que violam a regra
+Regra = namedtuple('Regra', ['nome', 'descricao', 'colunas', 'condicao'])
+
+
+def _por_valor(serie, funcao):
+    """
+    Aplica `funcao` só aos valores distintos da coluna e devolve a máscara para todas as linhas.
+
+    As colunas validadas têm poucos valores distintos (séries, códigos INEP, notas), então o custo
+    das operações de texto não cresce com o tamanho da base.
+    """
+    valores = pd.Series(serie.unique())
+    invalidos = valores[funcao(valores).to_numpy(dtype=bool)]
+    return serie.isin(invalidos).to_numpy()
+
+
+def _normalizar_serie(valores):
+    # Série vazia vira '' (no dtype de texto do pandas, astype(str) mantém os nulos como NaN)
+    sem_acento = valores.fillna('').astype(str).map(
+        lambda v: unicodedata.normalize('NFKD', v).encode('ascii', 'ignore').decode('ascii'))
+    return sem_acento.str.upper().str.replace(r'[^0-9A-Z]', '', regex=True)
+
+
+_PADRAO_SERIE = re.compile(r'^(?:[6-9][OA]?ANO|[1-3][OA]?SERIE)$')
+
+
+def _serie_nao_reconhecida(bruto, convertido):
+    # Parece uma série dos Anos Finais/Ensino Médio, mas com grafia fora da lista
+    # (ex.: '6° ANO', '1ª Série', ' 7º ANO'), e por isso seria descartada pela limpeza
+    def condicao(valores):
+        return _normalizar_serie(valores).str.match(_PADRAO_SERIE) & ~valores.isin(SERIES_RECONHECIDAS)
+    return _por_valor(bruto, condicao)
+
+
+def _inep_ausente(bruto, convertido):
+    def condicao(valores):
+        return valores.isna() | ~valores.astype(str).str.strip().str.fullmatch(r'\d{8}(?:\.0)?')
+    return _por_valor(bruto, condicao)
+
+
+def _nota_nao_numerica(bruto, convertido):
+    # Texto preenchido que não pôde ser convertido: viraria NaN e contaria como nota não lançada
+    def preenchido(valores):
+        return valores.notna() & (valores.astype(str).str.strip() != '')
+    return _por_valor(bruto, preenchido) & convertido.isna().to_numpy()
+
+
+def _nota_fora_do_intervalo(bruto, convertido):
+    return (convertido.notna() & ~convertido.between(0, 10)).to_numpy()
+
+
+REGRAS = [
+    Regra('nota_fora_do_intervalo', "Nota fora do intervalo de 0 a 10", COLUNAS_NOTAS, _nota_fora_do_intervalo),
+    Regra('nota_nao_numerica', "Nota preenchida que não é um número (contada como não lançada)",
+          COLUNAS_NOTAS, _nota_nao_numerica),
+    Regra('serie_nao_reconhecida', "Série dos Anos Finais/Ensino Médio com grafia não reconhecida",
+          ['SÉRIE'], _serie_nao_reconhecida),
+    Regra('inep_ausente', "Escola sem código INEP (vazio ou fora do formato de 8 dígitos)",
+          ['INEP ESCOLA'], _inep_ausente),
+]
+
+
+def validar(df, convertidas=None, regras=REGRAS, tamanho_amostra=TAMANHO_AMOSTRA):
+    """
+    Avalia as regras de validação sobre a base lida do SIGEduc.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Base como foi lida (antes da conversão das notas).
+    convertidas : dict, optional
+        Colunas já convertidas para número pela limpeza ({coluna: Series}).
+    regras : list of Regra
+        Regras avaliadas (padrão: REGRAS).
+    tamanho_amostra : int
+        Máximo de linhas guardadas na amostra de cada regra.
+
+    Returns
+    -------
+    dict
+        Total de linhas e, para cada regra, a descrição, as violações (total e por coluna) e a
+        amostra de linhas que a violam.
+    """
+    convertidas = convertidas or {}
+    colunas_amostra = [c for c in COLUNAS_AMOSTRA if c in df.columns]
+    resultado = {'linhas': len(df), 'regras': {}}
+
+    for regra in regras:
+        por_coluna = {}
+        amostra = []
+        for col in regra.colunas:
+            if col not in df.columns:
+                continue
+            mascara = regra.condicao(df[col], convertidas.get(col, df[col]))
+            por_coluna[col] = int(mascara.sum())
+
+            # Amostra limitada: as primeiras linhas que violam a regra, até completar o tamanho
+            if por_coluna[col] and len(amostra) < tamanho_amostra:
+                linhas = df.loc[mascara, [c for c in colunas_amostra if c != col] + [col]]
+                linhas = linhas.head(tamanho_amostra - len(amostra))
+                linhas = linhas.rename(columns={col: 'VALOR'}).assign(COLUNA=col)
+                amostra += linhas.astype(object).where(linhas.notna(), None).to_dict('records')
+
+        resultado['regras'][regra.nome] = {
+            'descricao': regra.descricao,
+            'violacoes': sum(por_coluna.values()),
+            'por_coluna': por_coluna,
+            'amostra': amostra,
+        }
+    return resultado
+
+
+def contagens(resultado):
+    """Violações por regra (para o relatório de execução)."""
+    return {nome: r['violacoes'] for nome, r in resultado['regras'].items()}
+
+
+def salvar_validacao(resultado, caminho):
+    """Grava o resultado da validação em JSON (de forma atômica)."""
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    with open(caminho + '.tmp', 'w', encoding='utf8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(caminho + '.tmp', caminho)